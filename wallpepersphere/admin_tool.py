@@ -8,7 +8,7 @@ import boto3
 import sqlite3
 import xml.etree.ElementTree as ET
 import re
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urljoin
 from PIL import Image
 from dotenv import load_dotenv
 from botocore.config import Config
@@ -529,7 +529,18 @@ def main():
             }
             response = requests.post(APP_API_URL, json=final_payload, headers=headers)
             
-            if response.status_code == 200:
+            # The server queues the import (202) and writes it in the background
+            if response.status_code == 202:
+                batch = response.json()
+                status_url = urljoin(APP_API_URL, batch['status_url'])
+                print(f"Queued as batch {batch['batch_id']}. Waiting for import...")
+                while True:
+                    time.sleep(2)
+                    response = requests.get(status_url, headers=headers)
+                    if response.status_code != 200 or response.json().get('status') in ('completed', 'failed'):
+                        break
+
+            if response.status_code == 200 and response.json().get('status') != 'failed':
                 res_json = response.json()
                 print("\nSUCCESS!")
                 print(f"Imported: {res_json.get('imported')}")
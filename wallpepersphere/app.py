@@ -1,17 +1,32 @@
 import os
+import atexit
 import io
 import time
 import uuid
 import sqlite3
 import random
 import json
+import orjson
 import difflib
 import re
 import threading
 import logging
+import logging.handlers
+import queue
 import gc
-from flask import Flask, request, redirect, url_for, render_template, send_from_directory, jsonify, session, g, send_file, Response
-from functools import wraps
+import multiprocessing
+import stat
+import sys
+import hashlib
+import errno
+import ipaddress
+from urllib.request import pathname2url
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from collections import defaultdict, Counter, deque
+from flask import Flask, request, redirect, url_for, render_template, send_from_directory, jsonify, session, g, send_file, Response, stream_with_context
+from functools import wraps, lru_cache
+from contextlib import contextmanager
 from werkzeug.utils import secure_filename
 import requests
 from google_auth_oauthlib.flow import Flow
@@ -20,6 +35,8 @@ from google.auth.transport import requests as google_requests
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+import google_auth_httplib2
+import httplib2
 from werkzeug.datastructures import FileStorage
 from werkzeug.security import generate_password_hash
 from werkzeug.middleware.proxy_fix import ProxyFix
@@ -29,8 +46,10 @@ from visual import VisualRecognizer
 from vertex_generator import VertexGenerator
 from gemini_generator import GeminiGenerator
 from queue_manager import UploadQueueManager
+from db_writer import SQLiteWriter, WriteQueuedError
+from image_processing import WEBP_METHOD_PHOTO, WEBP_METHOD_LOGO, classify_quality, resized_copy, prepare_images_worker
 import boto3
-from botocore.exceptions import NoCredentialsError
+from botocore.exceptions import NoCredentialsError, ClientError
 from botocore.config import Config
 
 # Load environment variables from .env file
@@ -40,6 +59,26 @@ load_dotenv(override=True)
 # Configure Logging to ensure output appears in Render logs
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
+# Request threads only enqueue log records; a listener thread does the actual stream I/O.
+# The queue handler and its listener are always installed together: at import, and again in
+# every forked child (Gunicorn workers), since a fork doesn't copy the listener thread.
+_log_handlers = logging.getLogger().handlers[:]
+_log_listener = None
+
+def start_log_listener():
+    """Routes root logging through a fresh queue and starts the listener thread that drains it."""
+    global _log_listener
+    log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(log_queue, *_log_handlers, respect_handler_level=True)
+    _log_listener.start()
+    logging.getLogger().handlers = [logging.handlers.QueueHandler(log_queue)]
+
+start_log_listener()
+os.register_at_fork(after_in_child=start_log_listener)
+# Drain what is still queued when the process exits
+atexit.register(lambda: _log_listener.stop())
+logger = logging.getLogger(__name__)
+
 def slugify(text):
     """Converts text to a slug (e.g., 'Hello World!' -> 'hello-world')."""
     if not text: return "asset"
@@ -53,6 +92,21 @@ def construct_asset_url(base_url, category, asset_id, name):
     slug = slugify(name)
     return f"{base_url.rstrip('/')}/view/{category}/{asset_id}/{slug}"
 
+def sql_json_response(key, array_json, **extra):
+    """
+    Wraps a JSON array built by SQLite (json_group_array) in the usual success envelope without re-parsing it.
+    `extra` fields (plain values) are added to the envelope too.
+    """
+    extra_json = ''.join(f',"{name}":{orjson.dumps(value).decode()}' for name, value in extra.items())
+    return Response(f'{{"success":true,"{key}":{array_json or "[]"}{extra_json}}}', mimetype='application/json')
+
+def get_bulk_json():
+    """Parses a (possibly large) bulk JSON body with orjson; the raw bytes are not kept on the request. None if invalid."""
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return None
+
 def clean_asset_list(assets):
     """Ensures avatar paths in a list of asset dictionaries are just filenames."""
     for asset in assets:
@@ -83,7 +137,7 @@ print("="*50)
 # Configuration
 UPLOAD_FOLDER = os.path.join(DB_FOLDER, 'uploads')
 TEMP_FOLDER = os.path.join(DB_FOLDER, 'temp_uploads')
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp'})
 
 app = Flask(__name__)
 # Fix: Tell Flask it is behind a Proxy (Cloudflare/Render) so it generates HTTPS links
@@ -146,8 +200,15 @@ REPORT_DB = os.path.join(DB_FOLDER, 'report.db')
 PENDING_DB = os.path.join(DB_FOLDER, 'pending_uploads.db')
 GENERATED_DB = os.path.join(DB_FOLDER, 'generated.db')
 TRACKER_DB = os.path.join(DB_FOLDER, 'tracker.db')
+INDEXING_DB = os.path.join(DB_FOLDER, 'indexing.db')
 AVATAR_STORAGE_FOLDER = os.path.join(DB_FOLDER, 'profile_avatars')
 
+# Shared statements: identical strings let each pooled connection reuse its prepared statement
+SQL_INSERT_IMAGE = 'INSERT INTO uploads (user_id, name, slug, description, color_code, key_word, resolution, quality, category, link_small, link_medium, link_original, link_tiny, upload_date, ai_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+SQL_INSERT_LOGO = 'INSERT INTO uploads (user_id, name, slug, description, color_code, key_word, category, link_small, link_medium, link_original, upload_date, ai_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+SQL_UPDATE_META = "UPDATE uploads SET name=?, slug=?, description=?, key_word=?, color_code=?, category=?, ai_data=? WHERE id=?"
+SQL_UPDATE_META_BY_FILENAME = "UPDATE uploads SET name=?, slug=?, description=?, key_word=?, color_code=?, category=?, ai_data=? WHERE filename = ?"
+
 # Ensure persistent directories exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(TEMP_FOLDER, exist_ok=True)
@@ -190,29 +251,244 @@ except Exception as e:
     exit(1)
 
 
+def r2_content_type(object_name):
+    """Determines the Content-Type stored with an R2 object from its extension."""
+    lower_name = object_name.lower()
+    if lower_name.endswith('.webp'): return 'image/webp'
+    elif lower_name.endswith('.jpg') or lower_name.endswith('.jpeg'): return 'image/jpeg'
+    elif lower_name.endswith('.png'): return 'image/png'
+    elif lower_name.endswith('.svg'): return 'image/svg+xml'
+    return 'application/octet-stream'
+
 def upload_to_r2(file_path, object_name):
     """Uploads a file to R2 and returns True if successful."""
     if not s3_client or not R2_BUCKET_NAME: return False
     try:
-        # Determine content type
-        content_type = 'application/octet-stream'
-        lower_name = object_name.lower()
-        if lower_name.endswith('.webp'): content_type = 'image/webp'
-        elif lower_name.endswith('.jpg') or lower_name.endswith('.jpeg'): content_type = 'image/jpeg'
-        elif lower_name.endswith('.png'): content_type = 'image/png'
-        elif lower_name.endswith('.svg'): content_type = 'image/svg+xml'
-        
-        s3_client.upload_file(file_path, R2_BUCKET_NAME, object_name, ExtraArgs={'ContentType': content_type})
+        s3_client.upload_file(file_path, R2_BUCKET_NAME, object_name, ExtraArgs={'ContentType': r2_content_type(object_name)})
+        return True
+    except Exception as e:
+        print(f"R2 Upload Error: {e}")
+        return False
+
+def upload_fileobj_to_r2(fileobj, object_name):
+    """Uploads an in-memory/stream object (BytesIO, upload stream) to R2 and returns True if successful."""
+    if not s3_client or not R2_BUCKET_NAME: return False
+    try:
+        s3_client.upload_fileobj(fileobj, R2_BUCKET_NAME, object_name, ExtraArgs={'ContentType': r2_content_type(object_name)})
         return True
     except Exception as e:
         print(f"R2 Upload Error: {e}")
         return False
 
+# Presigned GET URLs live 3600s; a signature is reused for one 3000s epoch, so any URL handed
+# out still has at least 10 minutes of validity left
+PRESIGN_EXPIRES = 3600
+PRESIGN_EPOCH_SECONDS = 3000
+
+@lru_cache(maxsize=4096)
+def sign_r2_get(key, disposition, epoch):
+    """SigV4-signs a GET for key; `epoch` is only part of the cache key so entries roll over."""
+    params = {'Bucket': R2_BUCKET_NAME, 'Key': key}
+    if disposition:
+        params['ResponseContentDisposition'] = disposition
+    return s3_client.generate_presigned_url('get_object', Params=params, ExpiresIn=PRESIGN_EXPIRES)
+
+def presigned_r2_url(key, disposition=None):
+    """Cached presigned URL for an R2 object (hot assets skip the HMAC work entirely)."""
+    return sign_r2_get(key, disposition, int(time.time() // PRESIGN_EPOCH_SECONDS))
+
+# Shared threads for concurrent R2 PutObject calls (boto3 clients are thread-safe); threads start on first use
+r2_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='r2-upload')
+
+def upload_all_to_r2(uploads):
+    """
+    Runs (upload_function, source, object_name) uploads concurrently, so the request waits for
+    the slowest PutObject instead of their sum. Returns True when all succeeded.
+    On the first failure the uploads not yet started are cancelled, the running ones are
+    waited for (their sources may be request streams or temp files the caller closes or
+    deletes next), and the objects that did reach R2 are deleted again, then returns False.
+    """
+    futures = {r2_pool.submit(fn, src, object_name): object_name for fn, src, object_name in uploads}
+    for future in as_completed(futures):
+        if not future.result():
+            for f in futures:
+                f.cancel()
+            wait(futures)
+            keys = [{'Key': object_name} for f, object_name in futures.items() if not f.cancelled() and f.result()]
+            if keys:
+                try:
+                    s3_client.delete_objects(Bucket=R2_BUCKET_NAME, Delete={'Objects': keys})
+                except Exception as e:
+                    print(f"Error deleting partial upload from R2: {e}")
+            return False
+    return True
+
+# Page cache (KiB) and mmap window per connection. Each connection has its own cache, and a worker
+# holds up to 4 pooled connections per database/attach combination, so the default stays at
+# SQLite's own 2MB; only the category database pools (the hot read path) get more.
+DEFAULT_CACHE_KB = 2000
+DEFAULT_MMAP_BYTES = 0
+CATEGORY_CACHE_KB = 4000
+CATEGORY_MMAP_BYTES = 32 << 20
+
+def open_db(path, autocommit=True, cache_kb=DEFAULT_CACHE_KB, mmap_bytes=DEFAULT_MMAP_BYTES):
+    """
+    Opens a connection tuned for the request path.
+    journal_mode=WAL is persistent and set once at startup by the init_* functions,
+    so only the per-connection pragmas are applied here.
+    Autocommit mode: multi-statement writes open their own BEGIN IMMEDIATE.
+    autocommit=False keeps sqlite3's implicit transactions for code that calls conn.commit().
+    """
+    conn = sqlite3.connect(path, isolation_level=None if autocommit else '', check_same_thread=False, cached_statements=128)
+    conn.executescript(f"PRAGMA synchronous=NORMAL; PRAGMA busy_timeout=5000; PRAGMA temp_store=MEMORY; PRAGMA cache_size=-{int(cache_kb)}; PRAGMA mmap_size={int(mmap_bytes)};")
+    return conn
+
+@contextmanager
+def transaction(conn):
+    """
+    Explicit BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error) on an open_db() connection.
+    The connection must be in autocommit mode (isolation_level=None) so sqlite3 adds no
+    implicit BEGIN/COMMIT of its own: everything inside is one transaction, one WAL commit.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+class SqlitePool:
+    """
+    Small pool of open_db() connections for one database file, reused across requests.
+    Connections are created lazily (up to `size`) inside each worker process, so a
+    Gunicorn fork never shares a parent's connections.
+    """
+    def __init__(self, path, size=4, attach=None, cache_kb=DEFAULT_CACHE_KB, mmap_bytes=DEFAULT_MMAP_BYTES):
+        self.path = path
+        self.size = size
+        self.attach = attach or {} # {alias: db_path} attached once per connection, kept for its lifetime
+        self.cache_kb = cache_kb
+        self.mmap_bytes = mmap_bytes
+        self._reset_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._created = 0
+        self.q = queue.LifoQueue()
+        # Set last: other threads only see the new pid once the fresh state is in place
+        self._pid = os.getpid()
+
+    @contextmanager
+    def acquire(self):
+        if self._pid != os.getpid():
+            # First use after a fork: only one thread drops the parent's connections
+            with self._reset_lock:
+                if self._pid != os.getpid():
+                    self._reset()
+        try:
+            conn = self.q.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create: self._created += 1
+            if create:
+                try:
+                    conn = open_db(self.path, cache_kb=self.cache_kb, mmap_bytes=self.mmap_bytes)
+                    for alias, db_path in self.attach.items():
+                        conn.execute("ATTACH DATABASE ? AS ?", (db_path, alias))
+                except Exception:
+                    with self._lock: self._created -= 1
+                    raise
+            else:
+                conn = self.q.get()
+        try:
+            yield conn
+        finally:
+            # Hand the connection back clean for the next request
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+            self.q.put(conn)
+
 # Database Configuration for the 3 types
 DB_MAPPING = {
     'image': os.path.join(DB_FOLDER, '1img.sql'),
     'logo': os.path.join(DB_FOLDER, '2logo.sql')
 }
+POOLS = {cat: SqlitePool(path, cache_kb=CATEGORY_CACHE_KB, mmap_bytes=CATEGORY_MMAP_BYTES) for cat, path in DB_MAPPING.items()}
+# Pools for the other databases (users, notifications, ...), keyed by path
+DB_POOLS = {pool.path: pool for pool in POOLS.values()}
+
+def db_pool(path, **attach):
+    """
+    Returns the shared connection pool for a database file, creating it on first use.
+    Keyword arguments (alias=db_path) name databases kept ATTACHed on that pool's connections.
+    """
+    key = (path, tuple(sorted(attach.items()))) if attach else path
+    pool = DB_POOLS.get(key)
+    if pool is None:
+        if path in DB_MAPPING.values():
+            pool = SqlitePool(path, attach=attach, cache_kb=CATEGORY_CACHE_KB, mmap_bytes=CATEGORY_MMAP_BYTES)
+        else:
+            pool = SqlitePool(path, attach=attach)
+        pool = DB_POOLS.setdefault(key, pool)
+    return pool
+
+def category_pool(categories):
+    """
+    Pool for one query over several category databases: the first is 'main', the others are
+    ATTACHed as cat_<category>, and users_db is attached too.
+    Returns (pool, {category: schema name to qualify its uploads table with}).
+    """
+    schemas = {cat: 'main' if n == 0 else f"cat_{cat}" for n, cat in enumerate(categories)}
+    attach = {schemas[cat]: DB_MAPPING[cat] for cat in categories[1:]}
+    return db_pool(DB_MAPPING[categories[0]], users_db=USERS_DB, **attach), schemas
+
+# Rows with no real AI data ('{}' is an empty JSON object). Shared verbatim by the partial
+# index and the admin scan, since SQLite only uses a partial index whose WHERE the query implies.
+UNANALYZED_PREDICATE = "ai_data IS NULL OR ai_data = '' OR ai_data = '{}'"
+
+# Maps the category strings bulk clients send to a DB_MAPPING key
+CAT_MAP = {
+    'image': 'image', 'images': 'image', 'Image': 'image', 'Images': 'image',
+    'wallpaper': 'image', 'wallpapers': 'image', 'photo': 'image', 'photos': 'image',
+    'logo': 'logo', 'logos': 'logo', 'Logo': 'logo', 'Logos': 'logo',
+}
+
+def normalize_db_category(raw):
+    """Resolves a client category to 'image' or 'logo' (anything mentioning 'logo' is a logo)."""
+    category = CAT_MAP.get(raw)
+    if category is None:
+        # Rare path: free-form content categories like "Tech Logo"
+        category = 'logo' if raw and 'logo' in raw.casefold() else 'image'
+    return category
+
+def split_bulk_items(data, required=(), db_category_key=None):
+    """
+    Validates a bulk payload in one pass, before any DB work.
+    `required` holds key names, or tuples of alternative keys (any one of them will do).
+    Returns (valid_items, errors); each error names the offending item's index.
+    """
+    valid, errors = [], []
+    for i, item in enumerate(data):
+        if not isinstance(item, dict):
+            errors.append(f"Item {i}: expected an object")
+            continue
+        missing = ['/'.join(keys) for keys in ((k,) if isinstance(k, str) else k for k in required)
+                   if not any(item.get(key) for key in keys)]
+        if missing:
+            errors.append(f"Item {i}: missing {', '.join(missing)}")
+            continue
+        if not isinstance(item.get('category', ''), str):
+            errors.append(f"Item {i}: category must be a string")
+            continue
+        if db_category_key and item.get(db_category_key) not in DB_MAPPING:
+            errors.append(f"Item {i}: invalid {db_category_key} {item.get(db_category_key)!r}")
+            continue
+        valid.append(item)
+    return valid, errors
 
 # Initialize Visual Recognizer
 # Note: For production, it is safer to store this in an environment variable.
@@ -238,7 +514,38 @@ queue_manager = UploadQueueManager(visual_recognizer, temp_storage_path=QUEUE_ST
 
 # Global Semaphore to limit concurrent image processing (Fix for 512MB RAM limit)
 # Allowing only 1 concurrent heavy image process ensures we don't spike over memory limits.
-processing_sem = threading.Semaphore(1)
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', '1'))
+processing_sem = threading.Semaphore(IMAGE_WORKERS)
+
+# Process pool for Pillow decode/resize/encode (created lazily inside each Gunicorn worker).
+# Children come from a forkserver that only preloads image_processing: forking this worker
+# directly could copy a lock held by one of its threads (queue, writer, logging, R2) into the child.
+# Where forkserver is not available (Windows), children are spawned instead.
+if 'forkserver' in multiprocessing.get_all_start_methods():
+    image_pool_context = multiprocessing.get_context('forkserver')
+    image_pool_context.set_forkserver_preload(['image_processing'])
+else:
+    image_pool_context = multiprocessing.get_context('spawn')
+image_pool = None
+image_pool_pid = None
+image_pool_lock = threading.Lock()
+
+def get_image_pool():
+    """Returns this process's image pool, (re)creating it after a fork or a crash."""
+    global image_pool, image_pool_pid
+    with image_pool_lock:
+        if image_pool is None or image_pool_pid != os.getpid():
+            image_pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=image_pool_context)
+            image_pool_pid = os.getpid()
+        return image_pool
+
+# Single-writer queue for small admin/report writes (avoids SQLITE_BUSY between request threads).
+# Started lazily on first use in each worker process, like the queue manager.
+db_writer = SQLiteWriter(timeout=5.0)
+
+def open_db_readonly(db_path):
+    """Opens a read-only connection; readers never take the write lock."""
+    return sqlite3.connect(f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro", uri=True)
 
 # ===================================================================================
 #                                 I18N (TRANSLATION) ENGINE
@@ -246,10 +553,11 @@ processing_sem = threading.Semaphore(1)
 SUPPORTED_LANGUAGES = ['en', 'fr', 'es', 'de', 'pt']
 DEFAULT_LANGUAGE = 'en'
 TRANSLATIONS = {}
+TRANSLATIONS_FMT = {} # {lang: {key: bound value.format_map}} only for values with placeholders
 
 def load_translations():
     """Loads JSON translation files from the 'static/locales' directory."""
-    global TRANSLATIONS
+    global TRANSLATIONS, TRANSLATIONS_FMT
     messages_dir = os.path.join(os.path.dirname(__file__), 'static', 'locales')
     os.makedirs(messages_dir, exist_ok=True)
     
@@ -267,42 +575,51 @@ def load_translations():
         file_path = os.path.join(messages_dir, filename)
         if os.path.exists(file_path):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    TRANSLATIONS[lang] = json.load(f)
+                # orjson parses straight from bytes; interned keys are shared by every language's dict
+                with open(file_path, 'rb') as f:
+                    TRANSLATIONS[lang] = {sys.intern(k): v for k, v in orjson.loads(f.read()).items()}
             except Exception as e:
                 print(f"Error loading {lang} translations: {e}")
                 TRANSLATIONS[lang] = {}
         else:
             TRANSLATIONS[lang] = {}
 
+        # Bind format_map once per templated string so t() never re-resolves it per call
+        TRANSLATIONS_FMT[lang] = {
+            key: value.format_map
+            for key, value in TRANSLATIONS[lang].items()
+            if isinstance(value, str) and '{' in value
+        }
+
 # Initialize translations on startup
 load_translations()
 
 # Helper function for SSR (extracted from get_assets logic)
+# Changes on every deploy/restart so home page ETags never outlive a template change
+RENDER_VERSION = uuid.uuid4().hex
+
 def get_ssr_assets(category, page=1, limit=20, user_id=0):
     offset = (page - 1) * limit
     try:
-        conn = sqlite3.connect(DB_MAPPING[category])
-        conn.row_factory = sqlite3.Row
-        conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
-        cursor = conn.cursor()
+        with db_pool(DB_MAPPING[category], users_db=USERS_DB).acquire() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
         
-        sql = f'''
-            SELECT t.id, t.user_id, 
-            t.name, t.description, t.color_code, t.key_word, t.link_tiny,
-            t.resolution, t.quality, t.category, t.link_small, t.link_medium, t.link_original, t.upload_date, t.likes, t.views, t.downloads, t.ai_data,
-            '{category}' as category_type, users.username, users.avatar,
-            EXISTS(SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_liked,
-            EXISTS(SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_saved
-            FROM uploads t
-            LEFT JOIN users_db.users users ON t.user_id = users.id 
-            ORDER BY upload_date DESC LIMIT ? OFFSET ?
-        '''
+            sql = '''
+                SELECT t.id, t.user_id, 
+                t.name, t.description, t.color_code, t.key_word, t.link_tiny,
+                t.resolution, t.quality, t.category, t.link_small, t.link_medium, t.link_original, t.upload_date, t.likes, t.views, t.downloads, t.ai_data,
+                ? as category_type, users.username, users.avatar,
+                EXISTS(SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_liked,
+                EXISTS(SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_saved
+                FROM uploads t
+                LEFT JOIN users_db.users users ON t.user_id = users.id 
+                ORDER BY upload_date DESC LIMIT ? OFFSET ?
+            '''
         
-        params = [user_id, category, user_id, category, limit, offset]
-        cursor.execute(sql, params)
-        assets = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+            params = [category, user_id, category, user_id, category, limit, offset]
+            cursor.execute(sql, params)
+            assets = [dict(row) for row in cursor.fetchall()]
         return clean_asset_list(assets)
     except Exception as e:
         print(f"SSR Fetch Error: {e}")
@@ -322,18 +639,25 @@ def start_background_worker():
             logging.info("Flask App: Initializing background worker threads...")
             if not queue_manager.is_alive():
                 queue_manager.start_worker()
+            if not import_queue.is_alive():
+                import_queue.start_worker()
             
-            # Start Maintenance Thread (Runs every 30 minutes)
+            # Start Maintenance Thread (Runs every 5 minutes; the only place temp cleanup runs)
             def maintenance_loop():
                 while True:
-                    time.sleep(1800) # 30 minutes
+                    time.sleep(300) # 5 minutes
                     cleanup_temp_files()
             threading.Thread(target=maintenance_loop, daemon=True).start()
+            threading.Thread(target=search_index_flush_loop, daemon=True).start()
+            threading.Thread(target=download_count_flush_loop, daemon=True).start()
             
             _worker_started = True
         elif not queue_manager.is_alive():
             logging.info("Flask App: Restarting dead queue worker...")
             queue_manager.start_worker()
+        if not import_queue.is_alive():
+            logging.info("Flask App: Restarting dead import worker...")
+            import_queue.start_worker()
 # -----------------------------------------------
 
 def track_visitor():
@@ -436,10 +760,6 @@ def before_request():
     if not request.path.startswith(('/static/', '/uploads/', '/api/admin/')):
         track_visitor()
 
-    # Fix: Clean avatar path in session if it has legacy prefix
-    if 'avatar' in session and session['avatar'] and session['avatar'].startswith('/static/avatars/'):
-        session['avatar'] = session['avatar'].replace('/static/avatars/', '')
-
     if 'lang' in session:
         g.lang = session['lang']
     else:
@@ -455,8 +775,8 @@ def add_performance_headers(response):
     if request.path.startswith('/static/') or (content_type and any(t in content_type for t in ['image/', 'text/css', 'application/javascript', 'font/'])):
         response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
     
-    # 2. No-Cache for Dynamic HTML
-    elif content_type and content_type.startswith('text/html'):
+    # 2. No-Cache for Dynamic HTML (pages with an ETag set their own revalidation policy)
+    elif content_type and content_type.startswith('text/html') and 'ETag' not in response.headers:
         response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
         response.headers['Pragma'] = 'no-cache'
         response.headers['Expires'] = '0'
@@ -466,16 +786,24 @@ def add_performance_headers(response):
 @app.context_processor
 def inject_i18n():
     """Injects the 't' function into all HTML templates."""
+    # Resolve the language once per render instead of once per t() call
+    lang = g.get('lang', DEFAULT_LANGUAGE)
+    lang_data = TRANSLATIONS.get(lang) or TRANSLATIONS.get(DEFAULT_LANGUAGE, {})
+    lang_fmt = TRANSLATIONS_FMT.get(lang) if TRANSLATIONS.get(lang) else TRANSLATIONS_FMT.get(DEFAULT_LANGUAGE, {})
+
     def t(key, default=None, **kwargs):
-        # 1. Get dictionary for current language
-        lang_data = TRANSLATIONS.get(g.get('lang', DEFAULT_LANGUAGE), {})
-        # 2. Use provided default if key is not found, otherwise use key itself.
-        default_value = default if default is not None else key
-        text = lang_data.get(key, default_value)
-        # 3. Format variables (e.g. "Hello {name}")
-        return text.format(**kwargs) if kwargs else text
+        text = lang_data.get(key)
+        if text is None:
+            # Use provided default if key is not found, otherwise use key itself.
+            text = default if default is not None else key
+            return text.format_map(kwargs) if kwargs else text
+        if not kwargs:
+            return text
+        # Format variables (e.g. "Hello {name}") with the pre-bound formatter
+        formatter = lang_fmt.get(key)
+        return formatter(kwargs) if formatter else text
         
-    return dict(t=t, _=t, current_lang=g.get('lang', DEFAULT_LANGUAGE))
+    return dict(t=t, _=t, current_lang=lang)
 
 @app.route('/set-language/<lang_code>')
 def set_language(lang_code):
@@ -485,8 +813,74 @@ def set_language(lang_code):
     return redirect(request.referrer or url_for('index'))
 
 # Rate Limiting Storage
-# Format: { 'ip_address': { 'blocked_until': timestamp, 'history': [(timestamp, count), ...] } }
-rate_limit_store = {}
+# Format: { packed_ip: { 'blocked_until': timestamp, 'history': [(timestamp, count), ...] } }
+class RateLimitStore:
+    """
+    Two-generation map: every `window` seconds `current` becomes `previous` and the old
+    `previous` is dropped whole, so idle IPs expire in O(1) without sweeping every entry.
+    Active IPs are pulled forward from `previous` on lookup. `window` must exceed the
+    longest block so blocked entries survive at least one rotation.
+    """
+    def __init__(self, window=120):
+        self.window = window
+        self.previous = {}
+        self.current = {}
+        self.rotated_at = time.time()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(ip):
+        # 4/16 packed bytes instead of a str per entry; malformed header values are kept as-is
+        try:
+            return ipaddress.ip_address(ip).packed
+        except ValueError:
+            return ip
+
+    def get(self, ip, now):
+        """Returns the client's entry, creating it if unseen in the last two windows."""
+        if now - self.rotated_at > self.window:
+            with self.lock:
+                if now - self.rotated_at > self.window:
+                    self.previous = self.current
+                    self.current = {}
+                    self.rotated_at = now
+        key = self.key(ip)
+        entry = self.current.get(key)
+        if entry is None:
+            # history holds (time, limit) in arrival order; load is their running sum
+            entry = self.previous.pop(key, None) or {'blocked_until': 0, 'history': deque(), 'load': 0}
+            self.current[key] = entry
+        return entry
+
+rate_limit_store = RateLimitStore()
+
+# Bump when any init_* schema function below changes: each database re-runs its (idempotent)
+# schema steps once, then PRAGMA user_version lets every later boot skip them entirely.
+SCHEMA_VERSION = 6
+
+def apply_schema(db_path, *steps):
+    """
+    Runs the schema `steps` (functions taking a cursor) against db_path once per SCHEMA_VERSION.
+    All DDL and ALTER probes share one transaction (one fsync) that also stamps user_version.
+    Returns True if the steps ran.
+    """
+    conn = open_db(db_path)
+    try:
+        # Enable Write-Ahead Logging (WAL) for concurrency (persistent, can't run inside a transaction)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return False
+        cursor = conn.cursor()
+        with transaction(conn):
+            for step in steps:
+                step(cursor)
+            cursor.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return True
+    finally:
+        conn.close()
+
+# uploads columns mirrored into the uploads_fts full-text index
+FTS_COLUMNS = "name, description, key_word, category, color_code"
 
 def init_databases():
     """Initializes the three separate SQLite databases."""
@@ -535,222 +929,264 @@ def init_databases():
         '''
     }
 
+    def uploads_schema(category):
+        def step(cursor):
+            cursor.execute(schemas[category])
+            
+            # Migration: Ensure columns exist for existing databases
+            new_columns = [
+                ("user_id", "INTEGER"),
+                ("description", "TEXT"),
+                ("likes", "INTEGER DEFAULT 0"),
+                ("views", "INTEGER DEFAULT 0"),
+                ("downloads", "INTEGER DEFAULT 0"),
+                ("category", "TEXT"),
+                ("ai_data", "TEXT"),
+                ("link_tiny", "TEXT"),
+                ("slug", "TEXT"),
+                # Basename of link_original, so filename lookups hit an index instead of LIKE '%name%'
+                ("filename", "TEXT GENERATED ALWAYS AS (substr(link_original, length(rtrim(link_original, replace(link_original, '/', ''))) + 1)) VIRTUAL")
+            ]
+            cursor.execute("SELECT name FROM pragma_table_xinfo('uploads')")
+            existing = {row[0] for row in cursor.fetchall()}
+            for col, dtype in new_columns:
+                if col not in existing:
+                    cursor.execute(f"ALTER TABLE uploads ADD COLUMN {col} {dtype}")
+            
+            # Migration: Backfill URL slugs (written at insert/update time from now on)
+            cursor.connection.create_function("slugify", 1, slugify, deterministic=True)
+            cursor.execute("UPDATE uploads SET slug = slugify(name) WHERE slug IS NULL")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_uploads_slug ON uploads(slug)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_uploads_link_original ON uploads(link_original)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_uploads_filename ON uploads(filename)")
+            # Optimization: the unanalyzed scan only visits rows still missing AI data, and the
+            # index carries every column it reads (covering: no table lookups)
+            cursor.execute("DROP INDEX IF EXISTS idx_uploads_unanalyzed")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_uploads_unanalyzed_cover ON uploads(id, link_small, ai_data) WHERE {UNANALYZED_PREDICATE}")
+            # Related assets: WHERE category = ? AND id != ?
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_uploads_category ON uploads(category, id)")
+            # Per-user lookups (profiles, search by username): WHERE user_id = ? ORDER BY upload_date
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_uploads_user ON uploads(user_id, upload_date)")
+            
+            # Full-text index for search. Trigram tokens keep the LIKE '%term%' substring semantics,
+            # but matches come from the index instead of scanning every row. Triggers keep it in sync
+            # (counter updates don't touch it). The trigram tokenizer needs SQLite 3.34+; without it
+            # search keeps using LIKE.
+            cursor.execute("SAVEPOINT fts")
+            try:
+                cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS uploads_fts USING fts5({FTS_COLUMNS}, content='uploads', content_rowid='id', tokenize='trigram')")
+                new_values = ', '.join(f"new.{col}" for col in FTS_COLUMNS.split(', '))
+                old_values = ', '.join(f"old.{col}" for col in FTS_COLUMNS.split(', '))
+                fts_insert = f"INSERT INTO uploads_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {new_values});"
+                fts_delete = f"INSERT INTO uploads_fts(uploads_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.id, {old_values});"
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS uploads_fts_ai AFTER INSERT ON uploads BEGIN {fts_insert} END")
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS uploads_fts_ad AFTER DELETE ON uploads BEGIN {fts_delete} END")
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS uploads_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON uploads BEGIN {fts_delete} {fts_insert} END")
+                cursor.execute("INSERT INTO uploads_fts(uploads_fts) VALUES('rebuild')")
+                cursor.execute("RELEASE fts")
+            except sqlite3.OperationalError as e:
+                cursor.execute("ROLLBACK TO fts")
+                cursor.execute("RELEASE fts")
+                print(f"Full-text search index unavailable for {category}: {e}")
+            
+            # Gather planner statistics once (sqlite_stat1 only exists after the first ANALYZE)
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if not cursor.fetchone():
+                cursor.execute("ANALYZE uploads")
+        return step
+
     for category, db_name in DB_MAPPING.items():
+        if category not in schemas:
+            continue
         try:
-            conn = sqlite3.connect(db_name)
-            # Enable Write-Ahead Logging (WAL) for concurrency
-            # This allows reading (searching) while writing (uploading)
-            conn.execute("PRAGMA journal_mode=WAL;")
-            cursor = conn.cursor()
-            if category in schemas:
-                cursor.executescript(schemas[category])
-                
-                # Migration: Ensure columns exist for existing databases
-                new_columns = [
-                    ("user_id", "INTEGER"),
-                    ("description", "TEXT"),
-                    ("likes", "INTEGER DEFAULT 0"),
-                    ("views", "INTEGER DEFAULT 0"),
-                    ("downloads", "INTEGER DEFAULT 0"),
-                    ("category", "TEXT"),
-                    ("ai_data", "TEXT"),
-                    ("link_tiny", "TEXT")
-                ]
-                for col, dtype in new_columns:
-                    try:
-                        cursor.execute(f"ALTER TABLE uploads ADD COLUMN {col} {dtype}")
-                    except sqlite3.OperationalError:
-                        pass # Column likely exists
-            
-            conn.commit()
-            conn.close()
-            print(f"Database {db_name} initialized successfully.")
+            if apply_schema(db_name, uploads_schema(category)):
+                print(f"Database {db_name} initialized successfully.")
         except Exception as e:
             print(f"Error initializing database {db_name}: {e}")
 
 init_databases()
 
-def init_user_interactions():
-    """Initializes the user interaction tables in users.db."""
+# Categories whose database has the uploads_fts search index
+FTS_CATEGORIES = set()
+for category, db_name in DB_MAPPING.items():
     try:
-        conn = sqlite3.connect(USERS_DB)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_likes (
-                user_id INTEGER,
-                asset_id INTEGER,
-                category TEXT,
-                PRIMARY KEY (user_id, asset_id, category)
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_saves (
-                user_id INTEGER,
-                asset_id INTEGER,
-                category TEXT,
-                PRIMARY KEY (user_id, asset_id, category)
-            )
-        ''')
-        conn.commit()
-        conn.close()
+        with POOLS[category].acquire() as conn:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'uploads_fts'").fetchone():
+                FTS_CATEGORIES.add(category)
     except Exception as e:
-        print(f"Error initializing user interactions: {e}")
+        print(f"Error checking search index for {db_name}: {e}")
 
-init_user_interactions()
+def init_user_interactions(cursor):
+    """Initializes the user interaction tables in users.db."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_likes (
+            user_id INTEGER,
+            asset_id INTEGER,
+            category TEXT,
+            PRIMARY KEY (user_id, asset_id, category)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_saves (
+            user_id INTEGER,
+            asset_id INTEGER,
+            category TEXT,
+            PRIMARY KEY (user_id, asset_id, category)
+        )
+    ''')
 
-def init_notification_db():
+def init_notification_db(cursor):
     """Initializes the notifications database."""
-    try:
-        conn = sqlite3.connect(NOTIF_DB)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                message TEXT,
-                type TEXT,
-                created_at REAL,
-                is_read INTEGER DEFAULT 0
-            )
-        ''')
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Error initializing notifications db: {e}")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            message TEXT,
+            type TEXT,
+            created_at REAL,
+            is_read INTEGER DEFAULT 0
+        )
+    ''')
+    # Partial index: the unread probe on every page load is one seek, and read rows never bloat it
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notif_unread ON notifications(user_id) WHERE is_read = 0")
 
-init_notification_db()
+try:
+    apply_schema(NOTIF_DB, init_notification_db)
+except Exception as e:
+    print(f"Error initializing notifications db: {e}")
 
-def init_preferences_db():
+def init_preferences_db(cursor):
     """Initializes the user preferences table in users.db."""
-    try:
-        conn = sqlite3.connect(USERS_DB)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_preferences (
-                user_id INTEGER PRIMARY KEY,
-                theme_color TEXT,
-                theme_mode TEXT DEFAULT 'light'
-            )
-        ''')
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Error initializing preferences db: {e}")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_preferences (
+            user_id INTEGER PRIMARY KEY,
+            theme_color TEXT,
+            theme_mode TEXT DEFAULT 'light'
+        )
+    ''')
 
     # Migration for existing DBs
-    try:
-        conn = sqlite3.connect(USERS_DB)
-        cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM pragma_table_info('user_preferences') WHERE name = 'theme_mode'")
+    if not cursor.fetchone():
         cursor.execute("ALTER TABLE user_preferences ADD COLUMN theme_mode TEXT DEFAULT 'light'")
-        conn.commit()
-        conn.close()
-    except:
-        pass
-
-init_preferences_db()
 
-def init_tracker_db():
+def init_tracker_db(cursor):
     """Initializes the tracking database."""
-    try:
-        conn = sqlite3.connect(TRACKER_DB)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS visitors (
-                guest_id TEXT PRIMARY KEY,
-                ip_address TEXT,
-                country TEXT,
-                city TEXT,
-                user_agent TEXT,
-                first_visit_date REAL,
-                user_id INTEGER
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                guest_id TEXT,
-                start_time REAL,
-                last_ping REAL,
-                duration_seconds INTEGER DEFAULT 0,
-                FOREIGN KEY(guest_id) REFERENCES visitors(guest_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS downloads_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guest_id TEXT,
-                user_id INTEGER,
-                asset_id INTEGER,
-                category TEXT,
-                timestamp REAL
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS views_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guest_id TEXT,
-                user_id INTEGER,
-                asset_id INTEGER,
-                category TEXT,
-                timestamp REAL
-            )
-        ''')
-        
-        # Optimization: Add indexes to prevent lag on analytics dashboard
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_visitors_date ON visitors(first_visit_date)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_guest_id ON sessions(guest_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_downloads_guest_id ON downloads_log(guest_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_views_guest_id ON views_log(guest_id)")
-        
-        # Migration for user tracking
-        try:
-            cursor.execute("ALTER TABLE visitors ADD COLUMN user_id INTEGER")
-        except sqlite3.OperationalError:
-            pass # Column already exists
-            
-        # Migration for bot tracking
-        try:
-            cursor.execute("ALTER TABLE visitors ADD COLUMN is_bot INTEGER DEFAULT 0")
-        except sqlite3.OperationalError:
-            pass 
-
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Error initializing tracker db: {e}")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS visitors (
+            guest_id TEXT PRIMARY KEY,
+            ip_address TEXT,
+            country TEXT,
+            city TEXT,
+            user_agent TEXT,
+            first_visit_date REAL,
+            user_id INTEGER
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            guest_id TEXT,
+            start_time REAL,
+            last_ping REAL,
+            duration_seconds INTEGER DEFAULT 0,
+            FOREIGN KEY(guest_id) REFERENCES visitors(guest_id)
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS downloads_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guest_id TEXT,
+            user_id INTEGER,
+            asset_id INTEGER,
+            category TEXT,
+            timestamp REAL
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS views_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guest_id TEXT,
+            user_id INTEGER,
+            asset_id INTEGER,
+            category TEXT,
+            timestamp REAL
+        )
+    ''')
+    
+    # Optimization: Add indexes to prevent lag on analytics dashboard
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_visitors_date ON visitors(first_visit_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_guest_id ON sessions(guest_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_downloads_guest_id ON downloads_log(guest_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_views_guest_id ON views_log(guest_id)")
+    
+    # Migrations for user and bot tracking
+    cursor.execute("SELECT name FROM pragma_table_info('visitors')")
+    existing = {row[0] for row in cursor.fetchall()}
+    if 'user_id' not in existing:
+        cursor.execute("ALTER TABLE visitors ADD COLUMN user_id INTEGER")
+    if 'is_bot' not in existing:
+        cursor.execute("ALTER TABLE visitors ADD COLUMN is_bot INTEGER DEFAULT 0")
 
-init_tracker_db()
+try:
+    apply_schema(TRACKER_DB, init_tracker_db)
+except Exception as e:
+    print(f"Error initializing tracker db: {e}")
 
 # --- Indexing History Helper (Moved up for Analytics) ---
+# Legacy JSON store, only read once to seed the SQLite table below.
 INDEXING_HISTORY_FILE = os.path.join(DB_FOLDER, 'indexing_history.json')
 
-# Cache to prevent reading disk on every analytics poll
-indexing_history_cache = {'data': {}, 'last_mtime': 0}
+def init_indexing_db(cursor):
+    """Initializes the Google Indexing submission history table."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS indexing_history (
+            url TEXT PRIMARY KEY,
+            ts REAL
+        )
+    ''')
+    # Quota checks only look at the last 24h
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_indexing_history_ts ON indexing_history(ts)")
 
-def load_indexing_history():
-    """Loads the list of already submitted URLs."""
-    global indexing_history_cache
-    try:
-        if not os.path.exists(INDEXING_HISTORY_FILE):
-            return {}
-            
-        mtime = os.path.getmtime(INDEXING_HISTORY_FILE)
-        if mtime > indexing_history_cache['last_mtime']:
+    # Migration: Import the old JSON history once
+    cursor.execute("SELECT COUNT(*) FROM indexing_history")
+    if cursor.fetchone()[0] == 0 and os.path.exists(INDEXING_HISTORY_FILE):
+        try:
             with open(INDEXING_HISTORY_FILE, 'r') as f:
-                indexing_history_cache['data'] = json.load(f)
-            indexing_history_cache['last_mtime'] = mtime
-            
-        return indexing_history_cache['data']
-    except:
-        return {}
+                legacy = json.load(f)
+            cursor.executemany("INSERT OR REPLACE INTO indexing_history VALUES (?, ?)", list(legacy.items()))
+            print(f"Imported {len(legacy)} URLs from {INDEXING_HISTORY_FILE}")
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"Error importing legacy indexing history: {e}")
+
+try:
+    apply_schema(INDEXING_DB, init_indexing_db)
+except Exception as e:
+    print(f"Error initializing indexing db: {e}")
+
+def count_indexing_history(since=0):
+    """Counts submitted URLs without materializing them."""
+    try:
+        with sqlite3.connect(INDEXING_DB) as conn:
+            return conn.execute("SELECT COUNT(*) FROM indexing_history WHERE ts > ?", (since,)).fetchone()[0]
+    except Exception as e:
+        print(f"Error counting indexing history: {e}")
+        return 0
+
+def save_indexing_history(urls, ts=None):
+    """Records a batch of submitted URLs in a single transaction."""
+    if not urls: return
+    ts = ts or time.time()
+    try:
+        conn = sqlite3.connect(INDEXING_DB)
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO indexing_history VALUES (?, ?)", [(u, ts) for u in urls])
+        conn.close()
+    except Exception as e:
+        print(f"Error saving indexing history: {e}")
 
 @app.route('/api/track/ping', methods=['POST'])
 def track_session_ping():
@@ -815,7 +1251,7 @@ def track_asset_download():
         db_name = DB_MAPPING.get(category)
         if db_name:
             try:
-                main_conn = sqlite3.connect(db_name)
+                main_conn = open_db(db_name, autocommit=False)
                 main_cursor = main_conn.cursor()
                 
                 # Update count
@@ -947,7 +1383,7 @@ def admin_analytics_data():
         # 7. Enrich visitors with Users and AI data
         recent_visitors = []
         gen_conn = sqlite3.connect(GENERATED_DB)
-        users_conn = sqlite3.connect(USERS_DB)
+        users_conn = open_db(USERS_DB, autocommit=False)
         
         for v in recent_visitors_raw:
             v_enriched = dict(v)
@@ -985,9 +1421,7 @@ def admin_analytics_data():
         users_conn.close()
         
         # Fetch Indexing Stats (from admin_tool.py system)
-        # indexing_history = load_indexing_history() # Now defined above
-        indexing_history = load_indexing_history()
-        total_indexed = len(indexing_history)
+        total_indexed = count_indexing_history()
         
         return jsonify({
             "success": True,
@@ -1007,137 +1441,200 @@ def admin_analytics_data():
         print(f"Error fetching analytics data: {e}")
         return jsonify({"success": False, "message": str(e)}), 500
 
-def init_report_db():
+def init_report_db(cursor):
     """Initializes the reports database."""
-    try:
-        conn = sqlite3.connect(REPORT_DB)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS reports (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                asset_id INTEGER,
-                category TEXT,
-                reasons TEXT,
-                message TEXT,
-                created_at REAL,
-                status TEXT DEFAULT 'pending'
-            )
-        ''')
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Error initializing report db: {e}")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            asset_id INTEGER,
+            category TEXT,
+            reasons TEXT,
+            message TEXT,
+            created_at REAL,
+            status TEXT DEFAULT 'pending'
+        )
+    ''')
+    # Optimization: admin_reports sorts by date and joins users on user_id
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reports_created_at ON reports(created_at DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reports_user_id ON reports(user_id)")
+    
+    # Gather planner statistics once (sqlite_stat1 only exists after the first ANALYZE)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+    if not cursor.fetchone():
+        cursor.execute("ANALYZE")
 
-init_report_db()
+try:
+    apply_schema(REPORT_DB, init_report_db)
+except Exception as e:
+    print(f"Error initializing report db: {e}")
 
-def init_pending_db():
+def init_pending_db(cursor):
     """Initializes the pending uploads database for admin persistence."""
-    try:
-        conn = sqlite3.connect(PENDING_DB)
-        conn.execute('''CREATE TABLE IF NOT EXISTS pending (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            filename TEXT UNIQUE,
-            original_name TEXT,
-            r2_data TEXT,
-            created_at REAL
-        )''')
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Error initializing pending db: {e}")
+    cursor.execute('''CREATE TABLE IF NOT EXISTS pending (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filename TEXT UNIQUE,
+        original_name TEXT,
+        r2_data TEXT,
+        created_at REAL
+    )''')
+    # AI analysis results for temp uploads, keyed by temp filename (data is JSON)
+    cursor.execute('''CREATE TABLE IF NOT EXISTS analysis_cache (
+        filename TEXT PRIMARY KEY,
+        data TEXT
+    )''')
+    # Queue copies made by /api/analyze, so publish can delete them without scanning the queue folder
+    cursor.execute('''CREATE TABLE IF NOT EXISTS queue_files (
+        filename TEXT,
+        path TEXT,
+        created_at REAL
+    )''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_queue_files_filename ON queue_files(filename)")
+    # Bulk import batches, so a status poll is answered by whichever worker receives it
+    cursor.execute('''CREATE TABLE IF NOT EXISTS import_batches (
+        id TEXT PRIMARY KEY,
+        status TEXT,
+        item_count INTEGER,
+        imported INTEGER DEFAULT 0,
+        results TEXT,
+        errors TEXT,
+        error TEXT,
+        created_at REAL,
+        updated_at REAL
+    )''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_import_batches_updated ON import_batches(updated_at)")
 
-init_pending_db()
+try:
+    apply_schema(PENDING_DB, init_pending_db)
+except Exception as e:
+    print(f"Error initializing pending db: {e}")
 
-def init_generated_db():
+def init_generated_db(cursor):
     """Initializes the database for saved AI generations."""
-    try:
-        conn = sqlite3.connect(GENERATED_DB)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS user_generations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                filename TEXT,
-                prompt TEXT,
-                r2_key TEXT,
-                created_at REAL
-            )
-        ''')
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS generation_requests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                prompt TEXT,
-                status TEXT,
-                created_at REAL
-            )
-        ''')
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Error initializing generated db: {e}")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_generations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            filename TEXT,
+            prompt TEXT,
+            r2_key TEXT,
+            created_at REAL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS generation_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            prompt TEXT,
+            status TEXT,
+            created_at REAL
+        )
+    ''')
 
-init_generated_db()
+try:
+    apply_schema(GENERATED_DB, init_generated_db)
+except Exception as e:
+    print(f"Error initializing generated db: {e}")
 
-def fix_avatar_paths():
+def fix_avatar_paths(cursor):
     """Migration: Removes '/static/avatars/' prefix from avatars in DB."""
-    try:
-        conn = sqlite3.connect(USERS_DB)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, avatar FROM users WHERE avatar LIKE '/static/avatars/%'")
-        rows = cursor.fetchall()
-        if rows:
-            for row in rows:
-                user_id, avatar = row
-                new_avatar = avatar.replace('/static/avatars/', '')
-                cursor.execute("UPDATE users SET avatar = ? WHERE id = ?", (new_avatar, user_id))
-            conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Error fixing avatars: {e}")
-
-fix_avatar_paths()
+    cursor.execute("UPDATE users SET avatar = replace(avatar, '/static/avatars/', '') WHERE avatar LIKE '/static/avatars/%'")
 
 def create_notification(user_id, message, notif_type):
-    """Helper to create a notification."""
+    """
+    Helper to create a notification. Write-behind: the insert is queued on the shared
+    SQLite writer, which commits bursts (likes, downloads, follows) in one transaction.
+    """
     try:
-        conn = sqlite3.connect(NOTIF_DB)
-        conn.execute("INSERT INTO notifications (user_id, message, type, created_at) VALUES (?, ?, ?, ?)", 
-                     (user_id, message, notif_type, time.time()))
-        conn.commit()
-        conn.close()
+        db_writer.submit(NOTIF_DB, "INSERT INTO notifications (user_id, message, type, created_at) VALUES (?, ?, ?, ?)", 
+                         (user_id, message, notif_type, time.time()))
     except Exception as e:
         print(f"Error creating notification: {e}")
 
-# Initialize User Manager
+# Initialize User Manager (creates the users table the users.db schema steps below rely on)
 user_manager = UserManager(db_name=USERS_DB)
 
+try:
+    apply_schema(USERS_DB, init_user_interactions, init_preferences_db, fix_avatar_paths)
+except Exception as e:
+    print(f"Error initializing users db: {e}")
+
 # Avatar Library Configuration
 AVATAR_LIBRARY = [f'cartoon{i}.jpg' for i in range(1, 18)]  # Assumes cartoon1.jpg to cartoon17.jpg exist in static/avatars/
 
-# Global Cache for Analysis Data
-TEMP_ANALYSIS_FILE = os.path.join(DB_FOLDER, 'analysis_cache.json')
+# Global Cache for Analysis Data (in-memory copy of the analysis_cache table in PENDING_DB)
+TEMP_ANALYSIS_FILE = os.path.join(DB_FOLDER, 'analysis_cache.json') # Legacy store, imported once
 analysis_cache = {}
 
 def load_analysis_cache():
-    """Loads the analysis cache from disk into memory."""
+    """Loads the analysis cache table into memory, importing the legacy JSON file if present."""
     global analysis_cache
-    if os.path.exists(TEMP_ANALYSIS_FILE):
-        try:
-            with open(TEMP_ANALYSIS_FILE, 'r', encoding='utf-8') as f:
-                analysis_cache = json.load(f)
-        except Exception:
-            analysis_cache = {}
+    try:
+        with db_pool(PENDING_DB).acquire() as conn:
+            if os.path.exists(TEMP_ANALYSIS_FILE):
+                with open(TEMP_ANALYSIS_FILE, 'r', encoding='utf-8') as f:
+                    legacy = json.load(f)
+                with transaction(conn):
+                    conn.executemany("INSERT OR IGNORE INTO analysis_cache (filename, data) VALUES (?, ?)",
+                                     [(k, orjson.dumps(v).decode()) for k, v in legacy.items()])
+                os.replace(TEMP_ANALYSIS_FILE, TEMP_ANALYSIS_FILE + '.migrated')
+            rows = conn.execute("SELECT filename, data FROM analysis_cache").fetchall()
+        analysis_cache = {fname: orjson.loads(data) for fname, data in rows}
+    except Exception as e:
+        print(f"Error loading analysis cache: {e}")
 
-def save_analysis_cache():
-    """Saves the memory cache to disk."""
+def refresh_analysis_cache(filenames):
+    """Pulls the latest rows for just these filenames (another worker may have written them)."""
+    filenames = [f for f in filenames if f]
+    if not filenames:
+        return
+    try:
+        with db_pool(PENDING_DB).acquire() as conn:
+            rows = conn.execute("SELECT filename, data FROM analysis_cache WHERE filename IN (SELECT value FROM json_each(?))",
+                                (orjson.dumps(filenames).decode(),)).fetchall()
+        for fname, data in rows:
+            analysis_cache[fname] = orjson.loads(data)
+    except Exception as e:
+        print(f"Error refreshing analysis cache: {e}")
+
+def delete_analysis_cache(filenames):
+    """Drops cache entries in memory and queues one DELETE for all of them."""
+    filenames = list(filenames)
+    if not filenames:
+        return
+    for fname in filenames:
+        analysis_cache.pop(fname, None)
+    db_writer.submit(PENDING_DB, "DELETE FROM analysis_cache WHERE filename IN (SELECT value FROM json_each(?))",
+                     (orjson.dumps(filenames).decode(),))
+
+def record_queue_copy(filename, path):
+    """Remembers the queue storage copy made for a temp file (committed before the request returns)."""
+    try:
+        db_writer.execute(PENDING_DB, "INSERT INTO queue_files (filename, path, created_at) VALUES (?, ?, ?)",
+                          (filename, path, time.time()))
+    except WriteQueuedError as e:
+        # Still queued: the row lands shortly
+        logger.warning("%s", e)
+    except Exception as e:
+        print(f"Error recording queue copy for {filename}: {e}")
+
+def remove_queue_copies(filenames):
+    """Deletes the recorded queue copies of these temp files by exact path and forgets them."""
+    filenames = [f for f in filenames if f]
+    if not filenames:
+        return
+    key = orjson.dumps(filenames).decode()
     try:
-        with open(TEMP_ANALYSIS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(analysis_cache, f)
+        with db_pool(PENDING_DB).acquire() as conn:
+            paths = [row[0] for row in conn.execute("SELECT path FROM queue_files WHERE filename IN (SELECT value FROM json_each(?))", (key,))]
     except Exception as e:
-        print(f"Error saving analysis cache: {e}")
+        print(f"Error reading queue copies: {e}")
+        return
+    for path in paths:
+        try: os.remove(path)
+        except FileNotFoundError: pass
+        except Exception as e: print(f"Error removing queue copy {path}: {e}")
+    db_writer.submit(PENDING_DB, "DELETE FROM queue_files WHERE filename IN (SELECT value FROM json_each(?))", (key,))
 
 # Initialize cache on startup
 load_analysis_cache()
@@ -1150,31 +1647,39 @@ def cleanup_temp_files():
         max_age = 1800  # 30 Minutes (Sensitive cleanup)
 
         # 1. Clean temp_uploads (User Uploads)
-        for filename in os.listdir(TEMP_FOLDER):
-            # Protect the cache file
-            if filename == 'analysis_cache.json':
-                continue
-                
-            file_path = os.path.join(TEMP_FOLDER, filename)
-            if os.path.isfile(file_path) and os.stat(file_path).st_mtime < now - max_age:
-                try: os.remove(file_path)
-                except: pass
+        # scandir's DirEntry carries the file type and caches stat(), so each file costs one stat at most
+        existing_names = set()
+        with os.scandir(TEMP_FOLDER) as entries:
+            for entry in entries:
+                # Protect the cache file
+                if entry.name == 'analysis_cache.json':
+                    continue
+
+                if entry.is_file() and entry.stat().st_mtime < now - max_age:
+                    try:
+                        os.remove(entry.path)
+                        continue
+                    except: pass
+                existing_names.add(entry.name)
         
         # 2. Clean temp_queue_storage (Queue Copies)
         if hasattr(queue_manager, 'temp_storage_path') and os.path.exists(queue_manager.temp_storage_path):
-            for filename in os.listdir(queue_manager.temp_storage_path):
-                file_path = os.path.join(queue_manager.temp_storage_path, filename)
-                if os.path.isfile(file_path) and os.stat(file_path).st_mtime < now - max_age:
-                    try: os.remove(file_path)
-                    except: pass
+            with os.scandir(queue_manager.temp_storage_path) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.stat().st_mtime < now - max_age:
+                        try: os.remove(entry.path)
+                        except: pass
         
-        # 3. Sync cache (remove entries for missing files)
-        keys_to_remove = [k for k in analysis_cache if not os.path.exists(os.path.join(TEMP_FOLDER, k))]
+        # Queue copies past max_age were just deleted; forget their records
+        db_writer.submit(PENDING_DB, "DELETE FROM queue_files WHERE created_at < ?", (now - max_age,))
+        # Finished import batches stay pollable for IMPORT_BATCH_MAX_AGE
+        db_writer.submit(PENDING_DB, "DELETE FROM import_batches WHERE updated_at < ?", (now - IMPORT_BATCH_MAX_AGE,))
+        
+        # 3. Sync cache (remove entries for missing files) against the names seen in the scan above
+        keys_to_remove = [k for k in analysis_cache if k not in existing_names]
         
         if keys_to_remove:
-            for k in keys_to_remove:
-                del analysis_cache[k]
-            save_analysis_cache()
+            delete_analysis_cache(keys_to_remove)
             
         # Force Garbage Collection to clear RAM
         gc.collect()
@@ -1185,8 +1690,8 @@ def cleanup_temp_files():
 
 def allowed_file(filename):
     """Checks if the file's extension is allowed."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in ALLOWED_EXTENSIONS
 
 @app.route('/')
 @app.route('/settings')
@@ -1201,7 +1706,7 @@ def index():
         return redirect(url_for('search_page', **request.args))
 
     if 'username' in session:
-        print(f"DEBUG: User {session['username']} is logged in.")
+        if app.debug: app.logger.debug(f"User {session['username']} is logged in.")
     
     # Pagination Logic
     page = request.args.get('page', 1, type=int)
@@ -1215,38 +1720,28 @@ def index():
 
     if 'user_id' in session:
         try:
-            conn = sqlite3.connect(NOTIF_DB)
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM notifications WHERE user_id = ? AND is_read = 0 LIMIT 1", (session['user_id'],))
-            if cursor.fetchone():
-                has_unread = True
-            conn.close()
-
             # Fetch User Preferences
             if 'theme_color' in session:
                 theme_color = session['theme_color']
             
-            # Always try to fetch fresh prefs to get filters
-            conn = sqlite3.connect(USERS_DB)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Refresh Role and Email from DB
-            cursor.execute("SELECT role, email FROM users WHERE id = ?", (session['user_id'],))
-            role_row = cursor.fetchone()
-            if role_row: 
-                session['role'] = role_row['role']
-                session['email'] = role_row['email']
-
-            cursor.execute("SELECT theme_color, theme_mode FROM user_preferences WHERE user_id = ?", (session['user_id'],))
-            row = cursor.fetchone()
+            # One query: refresh role/email, fresh prefs and the unread flag (notifications DB kept attached)
+            with db_pool(USERS_DB, notif=NOTIF_DB).acquire() as conn:
+                conn.row_factory = sqlite3.Row
+                row = conn.execute('''
+                    SELECT u.role, u.email, p.theme_color, p.theme_mode,
+                           EXISTS(SELECT 1 FROM notif.notifications WHERE user_id = u.id AND is_read = 0) AS has_unread
+                    FROM users u LEFT JOIN user_preferences p ON p.user_id = u.id
+                    WHERE u.id = ?
+                ''', (session['user_id'],)).fetchone()
             if row:
+                session['role'] = row['role']
+                session['email'] = row['email']
+                has_unread = bool(row['has_unread'])
                 if row['theme_color']: 
                     theme_color = row['theme_color']
                     session['theme_color'] = theme_color
                 if row['theme_mode']:
                     theme_mode = row['theme_mode']
-            conn.close()
         except Exception as e:
             print(f"Error checking notifications: {e}")
             
@@ -1281,7 +1776,18 @@ def index():
     if open_settings or open_about:
         user_settings = get_user_settings_data(session.get('user_id'))
 
-    content = render_template('home.html', 
+    # ETag over everything the template reads, so a repeat load with nothing changed skips the render.
+    # The SSR assets query already ran above; hashing its rows is far cheaper than rendering them.
+    etag_source = orjson.dumps([
+        RENDER_VERSION, request.base_url, page, g.get('lang'),
+        session.get('user_id'), session.get('username'), session.get('avatar'), session.get('role'),
+        has_unread, theme_color, theme_mode, user_settings, seo_assets
+    ], default=str)
+    etag = hashlib.blake2b(etag_source, digest_size=8).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(render_template('home.html', 
                            has_unread=has_unread, 
                            theme_color=theme_color, 
                            theme_mode=theme_mode, 
@@ -1293,11 +1799,11 @@ def index():
                            target_tab=target_tab,
                            seo_title=seo_title,
                            seo_description=seo_description,
-                           **user_settings)
-
-    # Debug: Print the size of the HTML to the terminal
-    print(f"DEBUG: Sending home.html - Size: {len(content)} characters")
-    return content
+                           **user_settings), mimetype='text/html')
+    response.set_etag(etag)
+    # Private: the page is per user. no-cache: the browser must revalidate (cheap 304) on every load.
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @app.route('/upload-page')
 def upload_page():
@@ -1310,12 +1816,10 @@ def uploader_template():
     allow_category = False
     if 'user_id' in session:
         try:
-            with sqlite3.connect(USERS_DB) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT email FROM users WHERE id = ?", (session['user_id'],))
-                row = cursor.fetchone()
-                if row and row[0] in ADMIN_EMAILS:
-                    allow_category = True
+            with db_pool(USERS_DB).acquire() as conn:
+                row = conn.execute("SELECT email FROM users WHERE id = ?", (session['user_id'],)).fetchone()
+            if row and row[0] in ADMIN_EMAILS:
+                allow_category = True
         except Exception as e:
             print(f"Error checking user permissions: {e}")
     return render_template('uploader.html', allow_category=allow_category)
@@ -1344,34 +1848,17 @@ def get_user_settings_data(user_id):
     }
     
     if not user_id:
-        return user_data
-
-    try:
-        conn = sqlite3.connect(USERS_DB)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Ensure columns exist (Migration)
-        try:
-            cursor.execute("SELECT bio FROM users LIMIT 1")
-        except sqlite3.OperationalError:
-            cursor.execute("ALTER TABLE users ADD COLUMN bio TEXT")
-            conn.commit()
-
-        try:
-            cursor.execute("SELECT website FROM users LIMIT 1")
-        except sqlite3.OperationalError:
-            cursor.execute("ALTER TABLE users ADD COLUMN website TEXT")
-            cursor.execute("ALTER TABLE users ADD COLUMN instagram TEXT")
-            cursor.execute("ALTER TABLE users ADD COLUMN twitter TEXT")
-            cursor.execute("ALTER TABLE users ADD COLUMN contact_email TEXT")
-            conn.commit()
-            
-        cursor.execute("SELECT username, email, avatar, bio, website, instagram, twitter, contact_email FROM users WHERE id = ?", (user_id,))
-        row = cursor.fetchone()
-        if row:
-            user_data = dict(row)
-        conn.close()
+        return user_data
+
+    try:
+        # The profile columns are added at startup by UserManager.init_db
+        with db_pool(USERS_DB).acquire() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute("SELECT username, email, avatar, bio, website, instagram, twitter, contact_email FROM users WHERE id = ?", (user_id,))
+            row = cursor.fetchone()
+            if row:
+                user_data = dict(row)
     except Exception as e:
         print(f"Error fetching user settings: {e}")
         
@@ -1400,32 +1887,32 @@ def analyze_image():
     file_path = os.path.join(TEMP_FOLDER, filename)
     
     # Fallback: If original file was deleted by /upload (R2 optimization), try the thumbnail
-    if not os.path.exists(file_path):
-        thumb_path = os.path.join(TEMP_FOLDER, f"api_thumb_{filename}")
-        if os.path.exists(thumb_path):
-            file_path = thumb_path
+    st = stat_or_none(file_path)
+    if st is None:
+        file_path = os.path.join(TEMP_FOLDER, f"api_thumb_{filename}")
+        st = stat_or_none(file_path)
 
     # Security check: ensure file is actually in temp folder
-    if not os.path.exists(file_path) or not os.path.isfile(file_path):
+    if st is None or not stat.S_ISREG(st.st_mode):
         return jsonify({'success': False, 'message': 'FILE_NOT_FOUND'}), 404
 
     # Check for cached analysis to save tokens
     if filename in analysis_cache:
         data = analysis_cache[filename]
-        print(f"DEBUG: Cache hit for {filename} - Serving saved analysis (0 Tokens Used)")
+        if app.debug: app.logger.debug(f"Cache hit for {filename} - Serving saved analysis (0 Tokens Used)")
         return jsonify({'success': True, 'data': data})
 
     # Add to Queue instead of processing immediately
     task_id = queue_manager.add_to_queue('analyze', session['user_id'], source_file_path=file_path)
+    task = queue_manager.get_task_status(task_id) if task_id else None
+    if task and task.get('file_path'):
+        record_queue_copy(filename, task['file_path'])
     
     # Check for high traffic (more than 2 items pending)
     response = {'success': True, 'task_id': task_id, 'status': 'queued'}
-    try:
-        if queue_manager.queue.qsize() > 2:
-            response['high_traffic'] = True
-            response['message'] = "HIGH_TRAFFIC_WARNING"
-    except NotImplementedError:
-        pass
+    if queue_manager.pending > 2:
+        response['high_traffic'] = True
+        response['message'] = "HIGH_TRAFFIC_WARNING"
         
     return jsonify(response)
 
@@ -1602,6 +2089,40 @@ def get_pending_tasks():
     tasks = queue_manager.get_tasks_for_user(session['user_id'])
     return jsonify({'success': True, 'tasks': tasks})
 
+def stat_or_none(path):
+    """os.stat that returns None for a missing path, so callers need a single syscall."""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+def remove_file(path):
+    """os.remove that ignores a missing path (one syscall instead of exists() + remove())."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def move_file(src, dst):
+    """
+    Atomic os.replace within one filesystem. Across mounts (EXDEV, e.g. tmpfs temp folder)
+    copies in kernel space with sendfile, then unlinks the source.
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        os.unlink(src)
+
 def process_and_save_image(src_path, dest_folder, filename, mode='image'):
     """
     Helper to process an image: resize, create thumbnails, and move original.
@@ -1620,7 +2141,7 @@ def process_and_save_image(src_path, dest_folder, filename, mode='image'):
         res['link_medium'] = filename
         res['resolution'] = 'Vector'
         res['quality'] = 'SVG'
-        os.rename(src_path, dst_original)
+        move_file(src_path, dst_original)
         return res
 
     try:
@@ -1628,135 +2149,48 @@ def process_and_save_image(src_path, dest_folder, filename, mode='image'):
             res['resolution'] = f"{img.size[0]}x{img.size[1]}"
             
             # Determine Quality
-            long_side = max(img.size)
-            if long_side >= 3840: res['quality'] = '4K'
-            elif long_side >= 2560: res['quality'] = '2K'
-            elif long_side >= 1920: res['quality'] = 'FHD'
-            elif long_side >= 1280: res['quality'] = 'HD'
-            else: res['quality'] = 'SD'
+            res['quality'] = classify_quality(max(img.size))
 
             # Processing based on mode
+            # Both sizes are resampled from the decoded source, not the small one from the medium
             if mode == 'image':
                 rgb_im = img.convert('RGB')
                 # Medium (WebP) - High quality for display
-                rgb_im.thumbnail((2048, 2048))
                 res['link_medium'] = 'medium_' + base_name + '.webp'
-                rgb_im.save(os.path.join(dest_folder, res['link_medium']), 'WEBP', quality=90)
+                resized_copy(rgb_im, 2048).save(os.path.join(dest_folder, res['link_medium']), 'WEBP', quality=90, method=WEBP_METHOD_PHOTO)
                 
                 # Small (WebP) - Optimized for thumbnails
-                rgb_im.thumbnail((1024, 1024))
                 res['link_small'] = 'small_' + base_name + '.webp'
-                rgb_im.save(os.path.join(dest_folder, res['link_small']), 'WEBP', quality=60)
+                resized_copy(rgb_im, 1024).save(os.path.join(dest_folder, res['link_small']), 'WEBP', quality=60, method=WEBP_METHOD_PHOTO)
             else: # logo
-                # Medium (WebP) - Process larger first to maintain quality
-                img.thumbnail((1024, 1024))
+                # Medium (WebP)
                 res['link_medium'] = 'medium_' + base_name + '.webp'
-                img.save(os.path.join(dest_folder, res['link_medium']), 'WEBP', quality=95)
+                resized_copy(img, 1024).save(os.path.join(dest_folder, res['link_medium']), 'WEBP', quality=95, method=WEBP_METHOD_LOGO)
                 
                 # Small (WebP)
-                img.thumbnail((512, 512))
                 res['link_small'] = 'small_' + base_name + '.webp'
-                img.save(os.path.join(dest_folder, res['link_small']), 'WEBP', quality=95)
-        os.rename(src_path, dst_original)
+                resized_copy(img, 512).save(os.path.join(dest_folder, res['link_small']), 'WEBP', quality=95, method=WEBP_METHOD_LOGO)
+        move_file(src_path, dst_original)
         return res
     except Exception as e:
         print(f"Error processing {filename}: {e}")
         return None
 
-def prepare_images_for_r2(src_path, base_filename):
+def prepare_images_for_r2(src, base_filename, in_memory=False, api_thumb_path=None):
     """
-    Generates medium and small versions of the image at src_path.
-    Returns a dict with paths to all 3 versions (original, medium, small) and metadata.
+    Runs prepare_images_worker in the image process pool so the decode and resize
+    (which hold the GIL) don't stall the other request threads of this worker.
     """
-    directory = os.path.dirname(src_path)
-    ext = os.path.splitext(src_path)[1].lower()
-    base_name_no_ext = os.path.splitext(base_filename)[0]
-    
-    paths = {
-        'original': src_path,
-        'medium': None,
-        'small': None,
-        'filename_original': base_filename,
-        'filename_medium': None,
-        'filename_small': None,
-        'resolution': '',
-        'quality': 'SD'
-    }
-
-    if ext == '.svg':
-        paths['filename_medium'] = base_filename
-        paths['filename_small'] = base_filename
-        paths['medium'] = src_path
-        paths['small'] = src_path
-        paths['resolution'] = 'Vector'
-        paths['quality'] = 'SVG'
-        return paths
-
-    def compress_and_save(image, path, target_kb):
-        """Compresses image to target size in KB."""
-        quality = 90
-        step = 5
-        min_quality = 5
-        
-        image.save(path, 'WEBP', quality=quality)
-        while os.path.getsize(path) > target_kb * 1024 and quality > min_quality:
-            quality -= step
-            image.save(path, 'WEBP', quality=quality)
-
+    global image_pool
     try:
-        rgb_im = None
-        with Image.open(src_path) as img:
-            paths['resolution'] = f"{img.size[0]}x{img.size[1]}"
-            long_side = max(img.size)
-            if long_side >= 3840: paths['quality'] = '4K'
-            elif long_side >= 2560: paths['quality'] = '2K'
-            elif long_side >= 1920: paths['quality'] = 'FHD'
-            elif long_side >= 1280: paths['quality'] = 'HD'
-            
-            # MEMORY OPTIMIZATION: Resize BEFORE converting to RGB to save RAM.
-            # We only generate Medium (2048px) and smaller. We do NOT need full resolution in RAM.
-            if long_side > 2048:
-                # Use draft for JPEGs (Fast & Low RAM)
-                if img.format == 'JPEG':
-                    try: img.draft('RGB', (2048, 2048))
-                    except: pass
-                # Force resize the object IN PLACE
-                img.thumbnail((2048, 2048), Image.Resampling.LANCZOS)
-
-            rgb_im = img.convert('RGB')
-            
-        # Medium
-        medium_name = f"medium_{base_name_no_ext}.webp"
-        medium_path = os.path.join(directory, medium_name)
-        rgb_im.thumbnail((2048, 2048))
-        compress_and_save(rgb_im, medium_path, 100)
-        paths['medium'] = medium_path
-        paths['filename_medium'] = medium_name
-        
-        # Small
-        small_name = f"small_{base_name_no_ext}.webp"
-        small_path = os.path.join(directory, small_name)
-        rgb_im.thumbnail((1024, 1024))
-        compress_and_save(rgb_im, small_path, 40)
-        paths['small'] = small_path
-        paths['filename_small'] = small_name
-
-        # Tiny (Mobile Optimized)
-        tiny_name = f"tiny_{base_name_no_ext}.webp"
-        tiny_path = os.path.join(directory, tiny_name)
-        rgb_im.thumbnail((400, 400))
-        compress_and_save(rgb_im, tiny_path, 20)
-        paths['tiny'] = tiny_path
-        paths['filename_tiny'] = tiny_name
-        
-        # Cleanup RAM immediately
-        del rgb_im
-        gc.collect()
-            
-    except Exception as e:
-        print(f"Error preparing images: {e}")
+        return get_image_pool().submit(prepare_images_worker, src, base_filename, in_memory, api_thumb_path).result()
+    except BrokenProcessPool as e:
+        # A child died (usually OOM-killed): fail this image rather than retry it inside this
+        # worker, and drop the pool so the next call starts a fresh one
+        print(f"Image pool broken: {e}")
+        with image_pool_lock:
+            image_pool = None
         return None
-    return paths
 
 # ===================================================================================
 #                                 UPLOADS SECTION
@@ -1796,32 +2230,19 @@ def upload_file():
                 'tiny': f"tiny_{base_name_no_ext}.webp"
             }
 
-            # Helper to save and upload
-            def save_and_upload(file_obj, r2_name):
-                if not file_obj: return None
-                temp_path = os.path.join(TEMP_FOLDER, r2_name)
-                file_obj.save(temp_path)
-                if s3_client:
-                    upload_to_r2(temp_path, r2_name)
-                return temp_path
-
-            # Process uploads
-            path_original = save_and_upload(f_original, names['original'])
-            path_medium = save_and_upload(f_medium, names['medium'])
-            path_small = save_and_upload(f_small, names['small'])
-            path_tiny = save_and_upload(f_tiny, names['tiny'])
+            # Stream each provided version straight from the request to R2 (no TEMP_FOLDER copy), in parallel
+            if s3_client:
+                uploads = [(upload_fileobj_to_r2, file_obj.stream, names[key])
+                           for file_obj, key in [(f_original, 'original'), (f_medium, 'medium'), (f_small, 'small'), (f_tiny, 'tiny')]
+                           if file_obj]
+                if not upload_all_to_r2(uploads):
+                    return jsonify({'success': False, 'message': 'R2_UPLOAD_FAILED'}), 500
 
             # Create API Thumbnail (Copy small version for analysis)
             # This ensures /api/analyze has a file to work with without re-processing
-            if path_small and os.path.exists(path_small):
-                import shutil
-                shutil.copy(path_small, os.path.join(TEMP_FOLDER, f"api_thumb_{base_filename}"))
-
-            # Cleanup R2 temp files (keep api_thumb)
-            for p in [path_original, path_medium, path_small, path_tiny]:
-                if p and os.path.exists(p):
-                    try: os.remove(p)
-                    except: pass
+            if f_small:
+                f_small.stream.seek(0)
+                f_small.save(os.path.join(TEMP_FOLDER, f"api_thumb_{base_filename}"))
 
             # Construct response data matching prepare_images_for_r2 format
             prep_res = {
@@ -1835,9 +2256,9 @@ def upload_file():
             
             # Save to Pending DB
             try:
-                with sqlite3.connect(PENDING_DB) as conn:
+                with db_pool(PENDING_DB).acquire() as conn:
                     conn.execute("INSERT OR REPLACE INTO pending (filename, original_name, r2_data, created_at) VALUES (?, ?, ?, ?)", 
-                                 (base_filename, f_original.filename, json.dumps(prep_res), time.time()))
+                                 (base_filename, f_original.filename, orjson.dumps(prep_res).decode(), time.time()))
             except Exception as e:
                 print(f"Pending DB Error: {e}")
 
@@ -1848,9 +2269,6 @@ def upload_file():
             return jsonify({'success': False, 'message': 'FILE_SAVE_FAILED'}), 500
 
     # --- EXISTING LOGIC (Legacy/Small Files) ---
-    # Optimization: Only run cleanup 10% of the time to reduce I/O overhead
-    if random.random() < 0.1:
-        cleanup_temp_files()
 
     if 'file' not in request.files:
         return jsonify({'success': False, 'message': 'UPLOAD_NO_FILE_PART'}), 400
@@ -1861,84 +2279,74 @@ def upload_file():
         return jsonify({'success': False, 'message': 'UPLOAD_NO_SELECTED_FILE'}), 400
 
     if file and allowed_file(file.filename):
-        extension = file.filename.rsplit('.', 1)[1].lower()
+        stem, _, extension = file.filename.rpartition('.')
+        extension = extension.lower()
         # Create a clean, timestamped filename for R2
-        safe_name = secure_filename(file.filename.rsplit('.', 1)[0])
+        safe_name = secure_filename(stem)
         filename = f"{safe_name}-{int(time.time())}.{extension}"
         file_path = os.path.join(TEMP_FOLDER, filename)
 
         try:
-            # Save to temporary folder first
+            # The upload goes to disk, never fully into RAM: the image process reads it by path
+            # and R2 streams it from there, so concurrent uploads don't each hold the whole file
             file.save(file_path)
 
             # --- CRITICAL MEMORY FIX: SERIALIZE PROCESSING ---
             # We use a semaphore to ensure only 1 heavy image processing task runs at a time.
             # This prevents OOM errors on 512MB instances when multiple uploads happen.
             if not processing_sem.acquire(blocking=True, timeout=30):
+                remove_file(file_path)
                 return jsonify({'success': False, 'message': 'SERVER_BUSY'}), 503
             
             try:
                 # AI Validation: Ensure file is valid and recognized by Gemini
-                # We skip SVG as it is a vector format not typically handled by Vision models in this context
-                if extension != 'svg':
-                    # Create a compressed version for the API to reduce token usage and latency
-                    api_thumb_path = os.path.join(TEMP_FOLDER, f"api_thumb_{filename}")
-                    
-                    try:
-                        with Image.open(file_path) as img:
-                            # MEMORY FIX: Resize BEFORE converting to RGB
-                            img.thumbnail((1024, 1024))
-                            if img.mode in ('RGBA', 'P'):
-                                img = img.convert('RGB')
-                            img.save(api_thumb_path, 'JPEG', quality=60)
-                    except Exception as e:
-                        print(f"Error creating API thumbnail: {e}")
+                # The API thumbnail is produced by the same decode as the R2 variants
+                # (SVG is skipped: vector formats are not handled by the Vision models here)
+                api_thumb_path = os.path.join(TEMP_FOLDER, f"api_thumb_{filename}")
 
                 # Note: We no longer analyze immediately here. 
                 # We just confirm the upload. Analysis happens in /api/analyze via queue.
                 
                 # --- NEW LOGIC: DIRECT R2 UPLOAD ---
-                # Process images (Resize)
-                prep_res = prepare_images_for_r2(file_path, filename)
+                # Process images (Resize); the encoded versions (a few hundred KB at most) come back in memory
+                prep_res = prepare_images_for_r2(file_path, filename, in_memory=True, api_thumb_path=api_thumb_path)
             finally:
                 processing_sem.release()
                 gc.collect()
 
             if not prep_res:
+                remove_file(file_path)
                 return jsonify({'success': False, 'message': 'IMAGE_PROCESSING_FAILED'}), 500
 
-            # Upload all versions to R2
-            if s3_client:
-                upload_to_r2(prep_res['original'], prep_res['filename_original'])
-                if prep_res['medium'] and prep_res['medium'] != prep_res['original']:
-                    upload_to_r2(prep_res['medium'], prep_res['filename_medium'])
-                if prep_res['small'] and prep_res['small'] != prep_res['original']:
-                    upload_to_r2(prep_res['small'], prep_res['filename_small'])
-                if prep_res.get('tiny'):
-                    upload_to_r2(prep_res['tiny'], prep_res['filename_tiny'])
-            
-            # Cleanup local temp files immediately
-            if os.path.exists(file_path): os.remove(file_path)
-            if prep_res['medium'] and os.path.exists(prep_res['medium']): os.remove(prep_res['medium'])
-            if prep_res['small'] and os.path.exists(prep_res['small']): os.remove(prep_res['small'])
-            if prep_res.get('tiny') and os.path.exists(prep_res['tiny']): os.remove(prep_res['tiny'])
+            # Upload all versions to R2 (concurrently)
+            buffers = prep_res.pop('buffers')
+            uploads = [(upload_to_r2, file_path, prep_res['filename_original'])]
+            uploads += [(upload_fileobj_to_r2, io.BytesIO(data), prep_res[f'filename_{key}']) for key, data in buffers.items()]
+            del buffers
+            uploaded = upload_all_to_r2(uploads) if s3_client else True
+            del uploads
+
+            # Cleanup local temp file immediately
+            remove_file(file_path)
 
             # Force garbage collection to free up RAM immediately
             gc.collect()
 
+            if not uploaded:
+                return jsonify({'success': False, 'message': 'R2_UPLOAD_FAILED'}), 500
+
             # Save to Pending DB for persistence
             try:
-                with sqlite3.connect(PENDING_DB) as conn:
+                with db_pool(PENDING_DB).acquire() as conn:
                     conn.execute("INSERT OR REPLACE INTO pending (filename, original_name, r2_data, created_at) VALUES (?, ?, ?, ?)", 
-                                 (filename, file.filename, json.dumps(prep_res), time.time()))
+                                 (filename, file.filename, orjson.dumps(prep_res).decode(), time.time()))
             except Exception as e:
                 print(f"Pending DB Error: {e}")
 
             # Return R2 keys and metadata
             return jsonify({'success': True, 'message': 'File uploaded to R2.', 'filename': filename, 'r2_data': prep_res}), 200
         except Exception as e:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            remove_file(file_path)
             return jsonify({'success': False, 'message': 'FILE_SAVE_FAILED'}), 500
     
     return jsonify({'success': False, 'message': 'UPLOAD_FILE_TYPE_NOT_ALLOWED'}), 400
@@ -1972,21 +2380,18 @@ def publish_file():
     if category not in DB_MAPPING:
         return jsonify({'success': False, 'message': 'INVALID_CATEGORY'}), 400
 
-    # Reload cache to ensure we have the latest analysis data from the worker
-    load_analysis_cache()
-
     # =================================================================================
     # HANDLE STANDARD / BULK PUBLISHING
     # =================================================================================
     if not filenames:
         return jsonify({'success': False, 'message': 'PUBLISH_NO_FILES'}), 400
 
-    conn = sqlite3.connect(DB_MAPPING[category])
-    cursor = conn.cursor()
-    
     success_count = 0
     errors = []
     published_items = []
+    published_fnames = []
+    insert_rows = [] # INSERT parameters, one per file, written with a single executemany after the loop
+    insert_meta = [] # (fname, final_name) for each row in insert_rows
 
     # Handle single file publish with r2_data passed from frontend
     if not r2_data_list and data.get('r2_data'):
@@ -1996,6 +2401,10 @@ def publish_file():
     # But since we updated /upload, filenames usually won't exist in temp anymore.
     
     loop_source = r2_data_list if r2_data_list else filenames
+    loop_fnames = [it if isinstance(it, str) else it.get('filename_original') for it in loop_source]
+
+    # Refresh the cache rows for these files to get the latest analysis data from other workers
+    refresh_analysis_cache(loop_fnames)
 
     for item in loop_source:
         # FIX: Normalize string items (filenames) to dicts so they can be processed
@@ -2018,12 +2427,7 @@ def publish_file():
                         try:
                             with Image.open(temp_path) as img:
                                 item['resolution'] = f"{img.width}x{img.height}"
-                                long_side = max(img.width, img.height)
-                                if long_side >= 3840: item['quality'] = '4K'
-                                elif long_side >= 2560: item['quality'] = '2K'
-                                elif long_side >= 1920: item['quality'] = 'FHD'
-                                elif long_side >= 1280: item['quality'] = 'HD'
-                                else: item['quality'] = 'SD'
+                                item['quality'] = classify_quality(max(img.width, img.height))
                         except Exception:
                             item['resolution'] = '1024x1024'
                             item['quality'] = 'HD'
@@ -2031,7 +2435,7 @@ def publish_file():
                     # 2. Generate Variants & Upload to R2 (if not already done)
                     # If filename_medium is missing or same as original, we assume it needs processing
                     if (not item.get('filename_medium') or item.get('filename_medium') == fname) and s3_client:
-                        print(f"DEBUG: Processing generated image for R2: {fname}")
+                        if app.debug: app.logger.debug(f"Processing generated image for R2: {fname}")
                         prep_res = prepare_images_for_r2(temp_path, fname)
                         if prep_res:
                             upload_to_r2(prep_res['original'], prep_res['filename_original'])
@@ -2062,7 +2466,7 @@ def publish_file():
                     if isinstance(req_ai_data, dict):
                         cached_data = req_ai_data
                     elif isinstance(req_ai_data, str):
-                        try: cached_data = json.loads(req_ai_data)
+                        try: cached_data = orjson.loads(req_ai_data)
                         except: pass
                 
                 # Determine final metadata: Request > Cache > Default
@@ -2070,7 +2474,7 @@ def publish_file():
                 raw_desc = req_description if req_description else (cached_data.get('description') or cached_data.get('Description', ''))
                 # Clean up multi-line descriptions from AI
                 final_desc = str(raw_desc).split('\n')[0].strip()
-                print(f"DEBUG: Publishing {fname} with clean description: {final_desc}")
+                if app.debug: app.logger.debug(f"Publishing {fname} with clean description: {final_desc}")
                 final_color = req_color if req_color else cached_data.get('color', '')
 
                 # Fix: Prevent generic names if API returns them
@@ -2089,37 +2493,12 @@ def publish_file():
                 if not final_category:
                     final_category = category
 
-                # Insert into DB (Files are already in R2)
+                # Queue the DB row (Files are already in R2); inserted in one batch after the loop
                 if category == 'image':
-                    cursor.execute('INSERT INTO uploads (user_id, name, description, color_code, key_word, resolution, quality, category, link_small, link_medium, link_original, link_tiny, upload_date, ai_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', 
-                                (session['user_id'], final_name, final_desc, final_color, final_keywords, item['resolution'], item['quality'], final_category, item['filename_small'], item['filename_medium'], item['filename_original'], item.get('filename_tiny'), time.time(), json.dumps(cached_data)))
+                    insert_rows.append((session['user_id'], final_name, slugify(final_name), final_desc, final_color, final_keywords, item['resolution'], item['quality'], final_category, item['filename_small'], item['filename_medium'], item['filename_original'], item.get('filename_tiny'), time.time(), orjson.dumps(cached_data).decode()))
                 elif category == 'logo':
-                    cursor.execute('INSERT INTO uploads (user_id, name, description, color_code, key_word, category, link_small, link_medium, link_original, upload_date, ai_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', 
-                                (session['user_id'], final_name, final_desc, final_color, final_keywords, final_category, item['filename_small'], item['filename_medium'], item['filename_original'], time.time(), json.dumps(cached_data)))
-                
-                # Capture ID for auto-indexing
-                new_id = cursor.lastrowid
-                published_items.append({
-                    'id': new_id,
-                    'name': final_name,
-                    'category': category
-                })
-
-                success_count += 1
-                
-                # Invalidate search cache
-                search_index_cache['last_updated'] = 0
-                index_path = os.path.join(DB_FOLDER, 'search_index_v2.json')
-                if os.path.exists(index_path):
-                    try: os.remove(index_path)
-                    except: pass
-
-                # Cleanup Pending DB
-                try:
-                    with sqlite3.connect(PENDING_DB) as p_conn:
-                        p_conn.execute("DELETE FROM pending WHERE filename = ?", (fname,))
-                        p_conn.commit()
-                except: pass
+                    insert_rows.append((session['user_id'], final_name, slugify(final_name), final_desc, final_color, final_keywords, final_category, item['filename_small'], item['filename_medium'], item['filename_original'], time.time(), orjson.dumps(cached_data).decode()))
+                insert_meta.append((fname, final_name))
 
             except Exception as e:
                 errors.append(f"Error processing {fname}: {str(e)}")
@@ -2132,24 +2511,42 @@ def publish_file():
                     except Exception:
                         pass
 
-                # Cleanup: Remove the copy in temp_queue_storage
-                try:
-                    queue_folder = queue_manager.temp_storage_path
-                    if os.path.exists(queue_folder):
-                        for q_file in os.listdir(queue_folder):
-                            if q_file.endswith(f"_{fname}"):
-                                try:
-                                    os.remove(os.path.join(queue_folder, q_file))
-                                except Exception:
-                                    pass
-                except Exception:
-                    pass
+                analysis_cache.pop(fname, None)
 
-                if fname in analysis_cache:
-                    del analysis_cache[fname]
+    # Cleanup: Remove the copies in temp_queue_storage (recorded by /api/analyze, one lookup for all files)
+    remove_queue_copies(loop_fnames)
     
-    conn.commit()
-    conn.close()
+    # Insert every row with one prepared statement in one transaction
+    if insert_rows:
+        try:
+            with POOLS[category].acquire() as conn, transaction(conn):
+                conn.executemany(SQL_INSERT_IMAGE if category == 'image' else SQL_INSERT_LOGO, insert_rows)
+                last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            # BEGIN IMMEDIATE holds the write lock, so the batch's AUTOINCREMENT ids are consecutive
+            first_id = last_id - len(insert_rows) + 1
+            for offset, (fname, final_name) in enumerate(insert_meta):
+                # Capture ID for auto-indexing
+                published_items.append({
+                    'id': first_id + offset,
+                    'name': final_name,
+                    'category': category
+                })
+                # Cleanup Pending DB (batched below)
+                published_fnames.append(fname)
+            success_count = len(insert_rows)
+
+            # Patch the new rows into the search index (in memory and on disk) instead of forcing a rebuild
+            queue_search_index_updates([(category, item['id']) for item in published_items])
+        except sqlite3.Error as e:
+            errors.append(f"Error publishing files: {str(e)}")
+
+    # Cleanup Pending DB: one transaction for every published file instead of one per file
+    if published_fnames:
+        try:
+            with db_pool(PENDING_DB).acquire() as p_conn, transaction(p_conn):
+                p_conn.executemany("DELETE FROM pending WHERE filename = ?", [(f,) for f in published_fnames])
+        except Exception as e:
+            print(f"Pending DB cleanup error: {e}")
 
     if success_count > 0:
         # Trigger Auto-Indexing in Background
@@ -2160,7 +2557,7 @@ def publish_file():
         except Exception as e:
             print(f"Error triggering auto-indexing: {e}")
 
-        save_analysis_cache()
+        delete_analysis_cache(loop_fnames)
         return jsonify({'success': True, 'message': f'Successfully published {success_count} files.'}), 200
     else:
         return jsonify({'success': False, 'message': 'PUBLISH_FAILED', 'errors': errors}), 500
@@ -2187,10 +2584,23 @@ def uploaded_file(filename):
     # 0. Proxy Mode (For Editor/Canvas CORS)
     if request.args.get('proxy') == '1' and s3_client and R2_BUCKET_NAME:
         try:
-            file_obj = s3_client.get_object(Bucket=R2_BUCKET_NAME, Key=filename)
+            # Let R2 answer revalidations: a matching ETag comes back as a 304 with no body
+            if_none_match = request.headers.get('If-None-Match')
+            extra = {'IfNoneMatch': if_none_match} if if_none_match else {}
+            try:
+                file_obj = s3_client.get_object(Bucket=R2_BUCKET_NAME, Key=filename, **extra)
+            except ClientError as e:
+                if e.response.get('ResponseMetadata', {}).get('HTTPStatusCode') == 304:
+                    return Response(status=304, headers={'ETag': if_none_match})
+                raise
+            # Stream the body in chunks so large files are never held in memory
+            headers = {'Content-Length': str(file_obj['ContentLength'])}
+            if file_obj.get('ETag'):
+                headers['ETag'] = file_obj['ETag']
             return Response(
-                file_obj['Body'].read(),
-                mimetype=file_obj.get('ContentType', 'image/jpeg')
+                file_obj['Body'].iter_chunks(chunk_size=64 * 1024),
+                mimetype=file_obj.get('ContentType', 'image/jpeg'),
+                headers=headers
             )
         except Exception as e:
             print(f"Proxy error for {filename}: {e}")
@@ -2201,11 +2611,7 @@ def uploaded_file(filename):
     # This ensures access even if the bucket is private or R2.dev is disabled.
     if s3_client and R2_BUCKET_NAME:
         try:
-            url = s3_client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': R2_BUCKET_NAME, 'Key': filename},
-                ExpiresIn=3600
-            )
+            url = presigned_r2_url(filename)
             return redirect(url)
         except Exception as e:
             print(f"Error generating presigned URL: {e}")
@@ -2222,7 +2628,7 @@ def uploaded_file(filename):
         response.headers['Access-Control-Allow-Origin'] = '*'
         return response
 
-    print(f"DEBUG: 404 Error for {filename}. R2_DOMAIN={bool(R2_DOMAIN)}, s3_client={bool(s3_client)}, Local={os.path.exists(local_path)}")
+    if app.debug: app.logger.debug(f"404 Error for {filename}. R2_DOMAIN={bool(R2_DOMAIN)}, s3_client={bool(s3_client)}, Local={os.path.exists(local_path)}")
     return "File not found", 404
 
 @app.route('/temp_preview/<path:filename>')
@@ -2242,33 +2648,67 @@ def serve_temp_preview(filename):
     response.headers['Access-Control-Allow-Origin'] = '*'
     return response
 
+# Download counters are approximate analytics: buffer them in memory and flush in batches
+DOWNLOAD_FLUSH_SECONDS = 5
+download_counts = Counter() # {(category, asset_id): pending increments}
+download_counts_lock = threading.Lock()
+
+def flush_download_counts():
+    """
+    Writes buffered download increments, one executemany transaction per category DB.
+    A category whose write fails keeps its increments buffered for the next flush.
+    """
+    global download_counts
+    with download_counts_lock:
+        if not download_counts:
+            return
+        counts, download_counts = download_counts, Counter()
+
+    rows_by_cat = defaultdict(list)
+    for (cat, asset_id), n in counts.items():
+        rows_by_cat[cat].append((n, asset_id))
+
+    for cat, rows in rows_by_cat.items():
+        try:
+            with POOLS[cat].acquire() as conn, transaction(conn):
+                conn.executemany("UPDATE uploads SET downloads = downloads + ? WHERE id = ?", rows)
+        except Exception as e:
+            print(f"Error flushing download counts for {cat}: {e}")
+            with download_counts_lock:
+                for n, asset_id in rows:
+                    download_counts[(cat, asset_id)] += n
+
+def download_count_flush_loop():
+    """Background loop: persists buffered download counts every DOWNLOAD_FLUSH_SECONDS."""
+    while True:
+        time.sleep(DOWNLOAD_FLUSH_SECONDS)
+        flush_download_counts()
+
+# Last flush when the worker exits (restart, max-requests recycle)
+atexit.register(flush_download_counts)
+
 @app.route('/download/<category>/<int:asset_id>')
 def download_asset(category, asset_id):
     """
     Handles downloading the best quality version of an asset.
-    Increments download count and serves the file as an attachment.
+    Counts the download (flushed in the background) and serves the file as an attachment.
     """
     if category not in DB_MAPPING:
         return "Invalid category", 400
 
     try:
-        conn = sqlite3.connect(DB_MAPPING[category])
-        cursor = conn.cursor()
-        
-        # Fetch file info - link_original is the best quality
-        cursor.execute("SELECT link_original, name, user_id FROM uploads WHERE id = ?", (asset_id,))
-        row = cursor.fetchone()
+        with POOLS[category].acquire() as conn:
+            # Fetch file info - link_original is the best quality
+            row = conn.execute("SELECT link_original, name, user_id FROM uploads WHERE id = ?", (asset_id,)).fetchone()
         
         if not row:
-            conn.close()
             return "Asset not found", 404
             
         filename, asset_name, owner_id = row
         
-        # Increment Download Count
-        cursor.execute("UPDATE uploads SET downloads = downloads + 1 WHERE id = ?", (asset_id,))
-        conn.commit()
-        conn.close()
+        # Increment Download Count (buffered, see flush_download_counts)
+        with download_counts_lock:
+            download_counts[(category, asset_id)] += 1
         
         # Notification Logic
         current_user_id = session.get('user_id')
@@ -2285,15 +2725,7 @@ def download_asset(category, asset_id):
         # 1. Priority: Generate Presigned URL with Attachment Header (Forces Download)
         if s3_client and R2_BUCKET_NAME:
             try:
-                url = s3_client.generate_presigned_url(
-                    'get_object',
-                    Params={
-                        'Bucket': R2_BUCKET_NAME, 
-                        'Key': filename,
-                        'ResponseContentDisposition': f'attachment; filename="{download_name}"'
-                    },
-                    ExpiresIn=3600
-                )
+                url = presigned_r2_url(filename, f'attachment; filename="{download_name}"')
                 return redirect(url)
             except Exception as e:
                 print(f"Error generating presigned URL: {e}")
@@ -2327,22 +2759,14 @@ def get_assets(category):
         client_ip = request.remote_addr
     current_time = time.time()
     
-    if client_ip not in rate_limit_store:
-        rate_limit_store[client_ip] = {'blocked_until': 0, 'history': []}
-    
-    client_data = rate_limit_store[client_ip]
+    client_data = rate_limit_store.get(client_ip or '', current_time)
     
     # 1. Check if currently blocked
     if current_time < client_data['blocked_until']:
         remaining = int(client_data['blocked_until'] - current_time)
         return jsonify({'success': False, 'message': f'Security Alert: Too many requests. Blocked for {remaining}s.'}), 429
     
-    # 2. Prune history (keep only last 0.5 seconds)
-    # The limit is strict: > 50 assets in 0.5s triggers a block.
-    window_size = 2.0
-    client_data['history'] = [entry for entry in client_data['history'] if entry[0] > current_time - window_size]
-    
-    # 3. Get requested limit & page
+    # 2. Get requested limit & page
     try:
         limit = int(request.args.get('limit', 5)) # Default limit 5 as requested
         if limit > 100: limit = 100 # Cap limit to prevent abuse
@@ -2357,15 +2781,23 @@ def get_assets(category):
         limit = 5
         offset = 0
         
-    # 4. Check Threshold
-    current_load = sum(entry[1] for entry in client_data['history'])
-    # Increased threshold to 1000 to prevent false positives on heavy loads
-    if current_load + limit > 1000:
-        client_data['blocked_until'] = current_time + 60 # Block for 1 minute
-        return jsonify({'success': False, 'message': 'Security Alert: Rate limit exceeded. Blocked for 1 minute.'}), 429
-        
-    # 5. Log request
-    client_data['history'].append((current_time, limit))
+    with rate_limit_store.lock:
+        # 3. Prune history (keep only last 2 seconds)
+        # Entries are time-ordered, so only expired ones at the front are touched.
+        window_size = 2.0
+        history = client_data['history']
+        while history and history[0][0] <= current_time - window_size:
+            client_data['load'] -= history.popleft()[1]
+
+        # 4. Check Threshold
+        # Increased threshold to 1000 to prevent false positives on heavy loads
+        if client_data['load'] + limit > 1000:
+            client_data['blocked_until'] = current_time + 60 # Block for 1 minute
+            return jsonify({'success': False, 'message': 'Security Alert: Rate limit exceeded. Blocked for 1 minute.'}), 429
+            
+        # 5. Log request
+        history.append((current_time, limit))
+        client_data['load'] += limit
     # -----------------------------------------
 
     # Determine Sort Order
@@ -2382,30 +2814,26 @@ def get_assets(category):
     current_lang = g.get('lang', 'en')
 
     try:
-        conn = sqlite3.connect(DB_MAPPING[category])
-        conn.row_factory = sqlite3.Row # Allows accessing columns by name
-        cursor = conn.cursor()
-        
         # Use logged-in user ID or Guest ID (if available)
         user_id = session.get('user_id')
         if not user_id:
             user_id = session.get('guest_id', 0)
         
-        # Attach users database to join and get user details
-        conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
-        
-        sql = f'''
+        sql = '''
             SELECT t.id, t.user_id, 
             t.name, t.description, t.color_code, t.key_word, t.link_tiny,
             t.resolution, t.quality, t.category, t.link_small, t.link_medium, t.link_original, t.upload_date, t.likes, t.views, t.downloads, t.ai_data,
-            '{category}' as category_type, users.username, users.avatar,
-            EXISTS(SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_liked,
-            EXISTS(SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_saved
+            ? as category_type, users.username, users.avatar,
+            ul.user_id IS NOT NULL as is_liked,
+            us.user_id IS NOT NULL as is_saved
             FROM uploads t
             LEFT JOIN users_db.users users ON t.user_id = users.id 
+            LEFT JOIN users_db.user_likes ul ON ul.user_id = ? AND ul.asset_id = t.id AND ul.category = ?
+            LEFT JOIN users_db.user_saves us ON us.user_id = ? AND us.asset_id = t.id AND us.category = ?
         '''
         
-        params = [user_id, category, user_id, category]
+        # Likes/saves are probed through their (user_id, asset_id, category) primary keys
+        params = [category, user_id, category, user_id, category]
 
         if target_user_id:
             sql += " WHERE t.user_id = ?"
@@ -2414,10 +2842,13 @@ def get_assets(category):
         sql += f" {order_clause} LIMIT ? OFFSET ?"
         params.extend([limit, offset])
 
-        cursor.execute(sql, params)
-        assets = [dict(row) for row in cursor.fetchall()]
+        # Pooled connection with users_db already attached (see SqlitePool)
+        with db_pool(DB_MAPPING[category], users_db=USERS_DB).acquire() as conn:
+            cursor = conn.execute(sql, params)
+            # Plain tuples zipped with the column names read once (no sqlite3.Row per row)
+            cols = [d[0] for d in cursor.description]
+            assets = [dict(zip(cols, row)) for row in cursor.fetchall()]
         
-        conn.close()
         return jsonify({'success': True, 'assets': clean_asset_list(assets)})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -2432,54 +2863,55 @@ def get_similar_assets(category, asset_id):
     if limit > 50: limit = 50 # Cap limit
 
     try:
-        conn = sqlite3.connect(DB_MAPPING[category])
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
         # Get current user for like/save status
         user_id = session.get('user_id', 0)
-        
-        # Attach users DB
-        conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
 
-        # First, get the category of the original asset
-        cursor.execute("SELECT category FROM uploads WHERE id = ?", (asset_id,))
-        row = cursor.fetchone()
-        if not row:
-            conn.close()
-            return jsonify({'success': False, 'message': 'Asset not found'}), 404
+        # Pooled connection with users_db already attached
+        with db_pool(DB_MAPPING[category], users_db=USERS_DB).acquire() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
 
-        asset_category = row['category']
+            # First, get the category of the original asset
+            cursor.execute("SELECT category FROM uploads WHERE id = ?", (asset_id,))
+            row = cursor.fetchone()
+            if not row:
+                return jsonify({'success': False, 'message': 'Asset not found'}), 404
 
-        # Now, get random assets from the same category, including user info
-        sql = f"""
-            SELECT t.id, t.name, t.link_small, t.link_tiny, t.category, t.resolution, t.user_id,
-                   '{category}' as category_type, u.username, u.avatar,
-                   EXISTS(SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_liked,
-                   EXISTS(SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_saved
-            FROM uploads t
-            LEFT JOIN users_db.users u ON t.user_id = u.id
-            WHERE t.category = ? AND t.id != ?
-            ORDER BY RANDOM()
-            LIMIT ?
-        """
-        
-        params = [user_id, category, user_id, category, asset_category, asset_id, limit]
-        cursor.execute(sql, params)
+            asset_category = row['category']
 
-        assets = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+            # Now, get random assets from the same category, including user info
+            sql = """
+                SELECT t.id, t.name, t.link_small, t.link_tiny, t.category, t.resolution, t.user_id,
+                       ? as category_type, u.username, u.avatar,
+                       EXISTS(SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_liked,
+                       EXISTS(SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_saved
+                FROM uploads t
+                LEFT JOIN users_db.users u ON t.user_id = u.id
+                WHERE t.category = ? AND t.id != ?
+                ORDER BY RANDOM()
+                LIMIT ?
+            """
+            
+            params = [category, user_id, category, user_id, category, asset_category, asset_id, limit]
+            cursor.execute(sql, params)
+
+            assets = [dict(row) for row in cursor.fetchall()]
         
         return jsonify({'success': True, 'assets': clean_asset_list(assets)})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@lru_cache(maxsize=4096)
 def get_orientation(resolution_str):
-    """Calculates orientation from a resolution string (e.g., '1920x1080')."""
+    """
+    Calculates orientation from a resolution string (e.g., '1920x1080').
+    Memoized: an index has only a handful of distinct resolutions across thousands of rows.
+    """
     if not resolution_str or 'x' not in str(resolution_str):
         return None
     try:
-        width, height = map(int, resolution_str.lower().split('x'))
+        width, _, height = resolution_str.partition('x')
+        width, height = int(width), int(height)
         if width > height: return 'Horizontal'
         elif height > width: return 'Vertical'
         else: return 'Square'
@@ -2495,118 +2927,280 @@ def check_orientation(resolution_str, target_orientation):
 search_index_cache = {
     'data': [],
     'words': set(),
-    'last_updated': 0
+    'trigrams': {}, # {trigram: set(words)} over 'words', narrows fuzzy matching to likely candidates
+    'last_updated': 0,
+    'pending_updates': [], # [(category, asset_id)] written since the index was built
+    'dirty_since': 0 # Time of the latest queued write; flushed once writes go quiet
 }
+search_index_lock = threading.Lock()
+SEARCH_INDEX_FILE = os.path.join(DB_FOLDER, 'search_index_v2.json')
+# Writes are buffered and flushed once no new ones arrived for this long (max staleness of searches)
+SEARCH_INDEX_FLUSH_SECONDS = int(os.environ.get('SEARCH_INDEX_FLUSH_SECONDS', 30))
+
+def build_search_item(cat, row):
+    """Builds one rich search index entry from an uploads row (joined with username)."""
+    # Fallback: Check ai_data for description if column is empty
+    description = row['description']
+    if not description and row['ai_data']:
+        try:
+            ai_data = orjson.loads(row['ai_data'])
+            description = ai_data.get('description', '')
+        except:
+            pass
+
+    # Calculate Orientation for Index
+    res = dict(row).get('resolution', "")
+    orientation = get_orientation(res) if res else ""
+
+    return {
+        "id": row['id'],
+        "type": cat,
+        "name": row['name'] or "",
+        "description": description or "",
+        "keywords": row['key_word'] or "",
+        "category": row['category'] or "",
+        "color": row['color_code'] or "",
+        "resolution": res,
+        "orientation": orientation
+    }
+
+# Vocabulary words: runs of anything but whitespace and commas
+VOCAB_TOKEN_RE = re.compile(r"[^\s,]+")
+
+def add_item_vocab(vocab, item, username=None):
+    """Adds an index entry's words to the fuzzy-matching vocabulary."""
+    for field in ('name', 'description', 'keywords'):
+        if item.get(field): vocab.update(VOCAB_TOKEN_RE.findall(item[field].lower()))
+    if item.get('category'): vocab.add(item['category'].lower())
+    if item.get('color'): vocab.add(item['color'].lower())
+    if username: vocab.add(username.lower())
+
+def build_vocab(entries):
+    """
+    Same words as add_item_vocab for a whole index, from (item, username) pairs: the free-text
+    fields are joined and tokenized in one regex pass instead of several split() calls per row.
+    """
+    text = []
+    vocab = set()
+    for item, username in entries:
+        text += [item.get('name') or '', item.get('description') or '', item.get('keywords') or '']
+        if item.get('category'): vocab.add(item['category'].lower())
+        if item.get('color'): vocab.add(item['color'].lower())
+        if username: vocab.add(username.lower())
+    vocab.update(VOCAB_TOKEN_RE.findall('\n'.join(text).lower()))
+    return vocab
+
+def add_vocab_trigrams(trigrams, words):
+    """
+    Indexes words by each of their 3-character substrings. Sets already in `trigrams` are
+    replaced, never modified, so a search still reading one never sees it change size.
+    """
+    by_trigram = defaultdict(set)
+    for w in words:
+        for i in range(len(w) - 2):
+            by_trigram[w[i:i + 3]].add(w)
+    for trigram, trigram_words in by_trigram.items():
+        trigrams[trigram] = trigrams[trigram] | trigram_words if trigram in trigrams else trigram_words
+
+def set_search_vocab(vocab):
+    """Installs a freshly loaded/built vocabulary together with its trigram index."""
+    trigrams = {}
+    add_vocab_trigrams(trigrams, vocab)
+    search_index_cache['words'] = vocab
+    search_index_cache['trigrams'] = trigrams
+    fuzzy_match.cache_clear()
+
+@lru_cache(maxsize=4096)
+def fuzzy_match(word, cutoff=0.85):
+    """
+    Closest vocabulary word to `word` (difflib ratio >= cutoff), or None.
+    Only words sharing a trigram with `word` are scored, instead of the whole vocabulary.
+    """
+    trigrams = search_index_cache['trigrams']
+    candidates = set()
+    for i in range(len(word) - 2):
+        candidates.update(trigrams.get(word[i:i + 3], ()))
+    matches = difflib.get_close_matches(word, candidates, n=1, cutoff=cutoff)
+    return matches[0] if matches else None
+
+def fetch_search_rows(cat, ids=None):
+    """Reads uploads rows (optionally only `ids`) with the columns the search index needs."""
+    with db_pool(DB_MAPPING[cat], users_db=USERS_DB).acquire() as conn:
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+    
+        # Select resolution only if it exists (Images have it, Logos might not)
+        cols = "t.id, t.name, t.description, t.key_word, t.category, t.color_code, t.ai_data, u.username"
+        if cat == 'image': cols += ", t.resolution"
+    
+        query = f"SELECT {cols} FROM uploads t LEFT JOIN users_db.users u ON t.user_id = u.id"
+        rows = []
+        if ids is None:
+            cursor.execute(query)
+            rows = cursor.fetchall()
+        else:
+            ids = list(ids)
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                cursor.execute(f"{query} WHERE t.id IN ({','.join('?' * len(chunk))})", chunk)
+                rows.extend(cursor.fetchall())
+    return rows
+
+def save_search_index_file(data, vocab):
+    """Save as Rich JSON for Fast Reading next time (compact, with the vocabulary so loads skip rebuilding it)."""
+    tmp_file = f"{SEARCH_INDEX_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            # Save data with embedded translations
+            f.write(orjson.dumps({'data': data, 'vocab': sorted(vocab)}))
+        # Atomic swap: other workers never read a half-written index
+        os.replace(tmp_file, SEARCH_INDEX_FILE)
+    except Exception as e:
+        print(f"Error saving search vocabulary: {e}")
+
+def remove_search_index_file():
+    """
+    Deletes the shared index file after a write. Each worker only patches its own in-memory
+    index, so the next worker that loads the index rebuilds the file from the databases.
+    """
+    remove_file(SEARCH_INDEX_FILE)
+
+def queue_search_index_updates(changes):
+    """Records changed (category, asset_id) pairs; the flush loop patches them into the index in one go."""
+    with search_index_lock:
+        search_index_cache['pending_updates'].extend(changes)
+        search_index_cache['dirty_since'] = time.time()
+    remove_search_index_file()
+
+def search_index_flush_loop():
+    """Background loop: applies buffered index writes once they have been quiet for SEARCH_INDEX_FLUSH_SECONDS."""
+    while True:
+        time.sleep(SEARCH_INDEX_FLUSH_SECONDS)
+        try:
+            if search_index_cache['pending_updates'] and time.time() - search_index_cache['dirty_since'] >= SEARCH_INDEX_FLUSH_SECONDS:
+                apply_pending_updates()
+        except Exception as e:
+            print(f"Error flushing search index updates: {e}")
+
+def apply_pending_updates():
+    """Patches changed/new/deleted assets into this worker's in-memory index instead of rebuilding it."""
+    with search_index_lock:
+        pending = search_index_cache['pending_updates']
+        if not pending or not search_index_cache['data']:
+            return
+        search_index_cache['pending_updates'] = []
+    
+    ids_by_cat = defaultdict(set)
+    for cat, asset_id in pending:
+        ids_by_cat[cat].add(asset_id)
+    
+    # Database reads run without the lock; searches keep using the current index meanwhile
+    changed = {}
+    removed = set()
+    new_words = set()
+    for cat, ids in ids_by_cat.items():
+        try:
+            rows = fetch_search_rows(cat, ids)
+        except Exception as e:
+            print(f"Error applying search index updates for {cat}: {e}")
+            continue
+        
+        found = set()
+        for row in rows:
+            item = build_search_item(cat, row)
+            found.add(item['id'])
+            changed[(cat, item['id'])] = item
+            add_item_vocab(new_words, item, row['username'])
+        
+        # Rows that no longer exist were deleted
+        removed.update((cat, asset_id) for asset_id in ids - found)
+    
+    with search_index_lock:
+        # A new list is swapped in: request threads may still be iterating the current one
+        data = []
+        for item in search_index_cache['data']:
+            key = (item['type'], item['id'])
+            if key not in removed:
+                data.append(changed.pop(key, item))
+        data.extend(changed.values())
+        search_index_cache['data'] = data
+        
+        new_words -= search_index_cache['words']
+        if new_words:
+            search_index_cache['words'] = search_index_cache['words'] | new_words
+            # Extend a copy and swap it in: fuzzy_match reads the index without the lock
+            trigrams = dict(search_index_cache['trigrams'])
+            add_vocab_trigrams(trigrams, new_words)
+            search_index_cache['trigrams'] = trigrams
+            fuzzy_match.cache_clear()
 
 def get_search_index():
-    """Fetches and caches full asset data for search and vocabulary."""
+    """Fetches and caches full asset data for search and vocabulary (a shared set; do not modify it)."""
     now = time.time()
-    index_file = os.path.join(DB_FOLDER, 'search_index_v2.json')
+    index_file = SEARCH_INDEX_FILE
 
-    # 1. Check Memory Cache
+    # 1. Check Memory Cache (recent writes land within SEARCH_INDEX_FLUSH_SECONDS via the flush loop)
     if now - search_index_cache['last_updated'] < 86400 and search_index_cache['data']:
-        return search_index_cache['data'], list(search_index_cache['words'])
+        return search_index_cache['data'], search_index_cache['words']
     
     # 2. Check File Cache (Fast Reading from Text)
     if os.path.exists(index_file) and os.path.getsize(index_file) > 0:
         try:
             if now - os.path.getmtime(index_file) < 86400:
-                with open(index_file, 'r', encoding='utf-8') as f:
+                with open(index_file, 'rb') as f:
                     # Support new dict format or legacy list format
-                    content = json.load(f)
+                    content = orjson.loads(f.read())
                     
                     if isinstance(content, list):
                         data = content
                     else:
                         data = content.get('data', [])
                     
-                    # Rebuild vocab from data (including translations)
-                    vocab = set()
-                    for item in data:
-                        if item.get('name'): vocab.update(item['name'].lower().split())
-                        if item.get('keywords'): vocab.update(item['keywords'].lower().replace(',', ' ').split())
-                        if item.get('category'): vocab.add(item['category'].lower())
-                        if item.get('color'): vocab.add(item['color'].lower())
+                    if isinstance(content, dict) and 'vocab' in content:
+                        vocab = set(content['vocab'])
+                    else:
+                        # Legacy file without a stored vocabulary: rebuild it from data
+                        vocab = build_vocab((item, None) for item in data)
                     
                     search_index_cache['data'] = data
-                    search_index_cache['words'] = vocab
+                    set_search_vocab(vocab)
                     search_index_cache['last_updated'] = now
-                    return data, list(vocab)
+                    apply_pending_updates()
+                    return data, search_index_cache['words']
         except Exception:
             pass # Fallback to DB if file is corrupt or old
 
     # 3. Build from Database (Slower)
     data = []
-    vocab = set()
+    vocab_entries = []
     
-    for cat, db_name in DB_MAPPING.items():
+    with search_index_lock:
+        # A full rebuild already reflects every pending write
+        search_index_cache['pending_updates'] = []
+    
+    for cat in DB_MAPPING:
         try:
-            conn = sqlite3.connect(db_name)
-            conn.row_factory = sqlite3.Row
-            conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
-            cursor = conn.cursor()
-            
-            # Select resolution only if it exists (Images have it, Logos might not)
-            cols = "t.id, t.name, t.description, t.key_word, t.category, t.color_code, t.ai_data, u.username"
-            if cat == 'image': cols += ", t.resolution"
-            
-            cursor.execute(f"SELECT {cols} FROM uploads t LEFT JOIN users_db.users u ON t.user_id = u.id")
-            rows = cursor.fetchall()
-            conn.close()
-            
-            for row in rows:
-                # Fallback: Check ai_data for description if column is empty
-                description = row['description']
-                if not description and row['ai_data']:
-                    try:
-                        ai_data = json.loads(row['ai_data'])
-                        description = ai_data.get('description', '')
-                    except:
-                        pass
-
-                # Calculate Orientation for Index
-                res = dict(row).get('resolution', "")
-                orientation = get_orientation(res) if res else ""
-
+            for row in fetch_search_rows(cat):
                 # Build rich object for the index file
-                item = {
-                    "id": row['id'],
-                    "type": cat,
-                    "name": row['name'] or "",
-                    "description": description or "",
-                    "keywords": row['key_word'] or "",
-                    "category": row['category'] or "",
-                    "color": row['color_code'] or "",
-                    "resolution": res,
-                    "orientation": orientation
-                }
+                item = build_search_item(cat, row)
                 data.append(item)
-                
-                # Build vocab for fuzzy matching
-                if item['name']: vocab.update(item['name'].lower().split())
-                if item['description']: vocab.update(item['description'].lower().split())
-                if item['keywords']: vocab.update(item['keywords'].lower().replace(',', ' ').split())
-                if item['category']: vocab.add(item['category'].lower())
-                if item['color']: vocab.add(item['color'].lower())
-                if row['username']: vocab.add(row['username'].lower())
+                vocab_entries.append((item, row['username']))
         except Exception:
             pass
+    
+    # Build vocab for fuzzy matching
+    vocab = build_vocab(vocab_entries)
             
     # 4. Save as Rich JSON for Fast Reading next time
-    try:
-        with open(index_file, 'w', encoding='utf-8') as f:
-            # Save data with embedded translations
-            json.dump({'data': data}, f, indent=2)
-    except Exception as e:
-        print(f"Error saving search vocabulary: {e}")
+    save_search_index_file(data, vocab)
 
     search_index_cache['data'] = data
-    search_index_cache['words'] = vocab
+    set_search_vocab(vocab)
     search_index_cache['last_updated'] = now
-    return data, list(vocab)
+    return data, vocab
 
 # Refined word lists for intent analysis
-NOISE_WORDS = {
+NOISE_WORDS = frozenset({
     # Articles & Prepositions
     'a', 'an', 'the', 'and', 'or', 'of', 'in', 'on', 'at', 'to', 'with', 'by', 
     'for', 'from', 'up', 'down', 'over', 'under', 'about', 'into', 'through', 
@@ -2631,9 +3225,9 @@ NOISE_WORDS = {
     'thing', 'things', 'stuff',
     # Contraction parts
     'm', 's', 't', 're', 've', 'll', 'd', 'don', 'won'
-}
+})
 
-BROAD_TERMS = {
+BROAD_TERMS = frozenset({
     # Generic Nouns
     'image', 'images', 'picture', 'pictures', 'photo', 'photos', 'pic', 'pics',
     'wallpaper', 'wallpapers', 'background', 'backgrounds', 'screensaver', 'screensavers',
@@ -2646,13 +3240,13 @@ BROAD_TERMS = {
     'beautiful', 'pretty', 'amazing', 'stunning', 'epic', 'perfect', 'super',
     'free', 'download', 'online', 'full', 'hd', 'uhd', '4k', '8k', '2k', '1080p',
     'hq', 'high-res', 'hi-res', 'resolution', 'def', 'definition'
-}
+})
 
-COMMON_COLORS = {
+COMMON_COLORS = frozenset({
     'red', 'orange', 'yellow', 'green', 'blue', 'purple', 'pink', 'brown', 'black', 'white', 
     'gray', 'grey', 'gold', 'silver', 'bronze', 'teal', 'cyan', 'magenta', 'maroon', 'navy', 
     'olive', 'beige', 'cream', 'ivory', 'vibrant', 'dark', 'light', 'neon', 'pastel', 'matte', 'glossy'
-}
+})
 
 SIZE_MAPPING = {
     'Horizontal': {
@@ -2721,7 +3315,25 @@ SPELLING_CORRECTIONS = {
     'fav': 'favorite', 'favs': 'favorites'
 }
 
-def analyze_search_query(query, vocab_list=None, vocab_set=None):
+# All size phrases in one alternation, longest first (so "lock screen" wins over "screen")
+SIZE_KEYWORD_TO_KEY = {kw: size_key for size_key, keywords in SIZE_MAPPING.items() for kw in keywords}
+SIZE_KEYWORD_RE = re.compile(
+    r'(?<!\w)(' + '|'.join(re.escape(kw) for kw in sorted(SIZE_KEYWORD_TO_KEY, key=len, reverse=True)) + r')(?!\w)'
+)
+PUNCTUATION_RE = re.compile(r'[.,\-!?:;\'"]')
+
+QUALITY_TOKENS = {
+    '4k': '4K', '8k': '4K', 'uhd': '4K',
+    '2k': '2K', 'qhd': '2K', '1440p': '2K',
+    'hd': 'HD', 'fhd': 'HD', '1080p': 'HD'
+}
+
+# Classifies a search word with one lookup (quality wins over noise); unlisted words are search terms
+TOKEN_CLASSES = {w: 'noise' for w in NOISE_WORDS | BROAD_TERMS}
+TOKEN_CLASSES.update((w, 'color') for w in COMMON_COLORS)
+TOKEN_CLASSES.update((w, 'quality') for w in QUALITY_TOKENS)
+
+def analyze_search_query(query, vocab_set=None):
     """
     Analyzes the raw search query to extract intent, filters, and core keywords.
     Distinguishes between specific searches ("dark volcano") and broad browsing ("wallpaper").
@@ -2732,73 +3344,40 @@ def analyze_search_query(query, vocab_list=None, vocab_set=None):
     q_lower = query.lower()
     
     # 1. Clean Punctuation
-    for char in '.,-!?:;\'"':
-        q_lower = q_lower.replace(char, ' ')
+    q_lower = PUNCTUATION_RE.sub(' ', q_lower)
 
     detected_size = None
     
-    # Check Size/Orientation (Phrase Matching)
-    # Flatten and sort keywords by length (longest first) to handle phrases like "lock screen" before "screen"
-    all_size_keywords = []
-    for size_key, keywords in SIZE_MAPPING.items():
-        for kw in keywords:
-            all_size_keywords.append((kw, size_key))
-    all_size_keywords.sort(key=lambda x: len(x[0]), reverse=True)
-    
-    for kw, size_key in all_size_keywords:
-        # Regex to match whole words/phrases
-        pattern = r'(?<!\w)' + re.escape(kw) + r'(?!\w)'
-        if re.search(pattern, q_lower):
-            detected_size = size_key
-            q_lower = re.sub(pattern, ' ', q_lower)
-            break
-
-    raw_words = q_lower.split()
+    # Check Size/Orientation (whole words/phrases, one regex pass)
+    match = SIZE_KEYWORD_RE.search(q_lower)
+    if match:
+        detected_size = SIZE_KEYWORD_TO_KEY[match.group(1)]
+        q_lower = SIZE_KEYWORD_RE.sub(' ', q_lower, count=1)
+
+    detected_quality = None
+    detected_colors = []
+    final_terms = []
     
-    # Enhanced Spelling Correction
-    corrected_words = []
-    for w in raw_words:
+    # One pass per word: spelling correction, then quality / color / noise classification
+    for w in q_lower.split():
         # 1. Hardcoded Corrections
         if w in SPELLING_CORRECTIONS:
-            corrected_words.append(SPELLING_CORRECTIONS[w])
-            continue
+            w = SPELLING_CORRECTIONS[w]
             
         # 2. Dynamic Correction (if vocab provided)
-        if vocab_list and vocab_set and w not in vocab_set and w not in NOISE_WORDS:
+        elif vocab_set and w not in vocab_set and w not in NOISE_WORDS:
             # Try to find a close match in existing content
-            matches = difflib.get_close_matches(w, vocab_list, n=1, cutoff=0.85)
-            if matches:
-                corrected_words.append(matches[0])
-                continue
-        
-        corrected_words.append(w)
-    raw_words = corrected_words
-
-    # 2. Extract Quality (Token-based)
-    detected_quality = None
-    quality_map = {
-        '4k': '4K', '8k': '4K', 'uhd': '4K',
-        '2k': '2K', 'qhd': '2K', '1440p': '2K',
-        'hd': 'HD', 'fhd': 'HD', '1080p': 'HD'
-    }
-    
-    clean_words = []
-    for w in raw_words:
-        if w in quality_map:
-            if not detected_quality: detected_quality = quality_map[w]
-            continue
-        clean_words.append(w)
+            w = fuzzy_match(w) or w
 
-    # 3. Extract Colors & Filter Noise
-    detected_colors = []
-    final_terms = []
-    
-    for w in clean_words:
-        if w in COMMON_COLORS:
+        token_class = TOKEN_CLASSES.get(w)
+        if token_class is None:
+            final_terms.append(w)
+        elif token_class == 'color':
+            # Colors are filters and search terms
             detected_colors.append(w)
-        
-        if w not in NOISE_WORDS and w not in BROAD_TERMS:
             final_terms.append(w)
+        elif token_class == 'quality':
+            if not detected_quality: detected_quality = QUALITY_TOKENS[w]
 
     return {'terms': final_terms, 'colors': detected_colors, 'quality': detected_quality, 'size': detected_size, 'is_broad_only': (len(final_terms) == 0)}
 
@@ -2809,7 +3388,7 @@ def perform_search_logic(query, category_filter, quality_filter, size_filter, so
     # --- USER SEARCH LOGIC (10% priority means they appear first) ---
     if query:
         try:
-            with sqlite3.connect(USERS_DB) as conn:
+            with db_pool(USERS_DB).acquire() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 user_search_term = f"%{query}%"
@@ -2823,7 +3402,7 @@ def perform_search_logic(query, category_filter, quality_filter, size_filter, so
                     
                     recent_images = []
                     # Fetch from image DB first as it's primary
-                    with sqlite3.connect(DB_MAPPING['image']) as conn_img:
+                    with POOLS['image'].acquire() as conn_img:
                         cursor_img = conn_img.cursor()
                         cursor_img.execute("SELECT link_small FROM uploads WHERE user_id = ? ORDER BY upload_date DESC LIMIT 3", (user_id_found,))
                         recent_images.extend([row[0] for row in cursor_img.fetchall()])
@@ -2857,9 +3436,8 @@ def perform_search_logic(query, category_filter, quality_filter, size_filter, so
         targets = ['image'] 
 
     # Fetch vocab for smart analysis
-    _, vocab_list = get_search_index()
-    vocab_set = set(vocab_list)
-    analysis = analyze_search_query(query, vocab_list, vocab_set)
+    _, vocab_set = get_search_index()
+    analysis = analyze_search_query(query, vocab_set)
     
     if not quality_filter and analysis['quality'] and category_filter != '4K Image':
         quality_filter = analysis['quality']
@@ -2870,63 +3448,94 @@ def perform_search_logic(query, category_filter, quality_filter, size_filter, so
     search_terms = analysis['terms']
     detected_colors = analysis['colors']
 
-    for cat in targets:
-        db_path = DB_MAPPING.get(cat)
-        if not db_path: continue
-        
-        try:
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row
-            conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
-            cursor = conn.cursor()
-            
-            # Define columns based on category schema (Logos don't have resolution/quality columns)
-            if cat == 'image':
-                extra_cols = "t.resolution, t.quality,"
-            else:
-                extra_cols = "NULL as resolution, NULL as quality,"
+    # Sort asset results based on relevance and user preference
+    sort_key_map = {'newest': 'upload_date', 'popular': 'views', 'downloads': 'downloads'}
+    primary_sort_key = sort_key_map.get(sort_order, 'upload_date')
 
-            sql = f"""
-                SELECT t.id, t.user_id, 
-                t.name, t.description, t.color_code, t.key_word, t.link_tiny,
-                {extra_cols} t.category, t.link_small, t.link_medium, t.link_original, t.upload_date, t.likes, t.views, t.downloads, t.ai_data,
-                '{cat}' as category_type, u.username, u.avatar,
-                EXISTS(SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = t.id AND category = '{cat}') as is_liked,
-                EXISTS(SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = t.id AND category = '{cat}') as is_saved
-                FROM uploads t
-                LEFT JOIN users_db.users u ON t.user_id = u.id
-                WHERE 1=1
-            """
-            params = [user_id, user_id]
-            
-            if search_terms:
-                _, vocab = get_search_index()
-                for term in search_terms:
-                    matches = difflib.get_close_matches(term.lower(), vocab, n=3, cutoff=0.6)
-                    search_variations = set([term] + matches)
-                    term_group_sql = []
-                    for var in search_variations:
-                        wildcard = f"%{var}%"
-                        term_group_sql.append(f"(t.name LIKE ? OR t.description LIKE ? OR t.key_word LIKE ? OR t.category LIKE ? OR t.color_code LIKE ? OR u.username LIKE ?)")
-                        params.extend([wildcard, wildcard, wildcard, wildcard, wildcard, wildcard])
-                    if term_group_sql:
-                        sql += " AND (" + " OR ".join(term_group_sql) + ")"
-                    wildcard = f"%{term}%"
-                    # Each term must be present, so we add an AND clause for each term.
-                    sql += " AND (t.name LIKE ? OR t.description LIKE ? OR t.key_word LIKE ? OR t.category LIKE ? OR t.color_code LIKE ? OR u.username LIKE ?)"
-                    params.extend([wildcard, wildcard, wildcard, wildcard, wildcard, wildcard])
-            
-            if cat == 'image' and quality_filter:
-                sql += " AND t.quality = ?"
-                params.append(quality_filter)
+    # Relevance score, computed by SQLite for each returned row. Per search term: +10 if it appears
+    # in any text field, +20 name, +15 keywords, +5 description, +25 username. Per detected color:
+    # +50 if in color_code, otherwise +10 if in any text field.
+    text_cols = ['t.name', 't.description', 't.key_word', 't.category', 'u.username']
+    in_any_text = "(" + " OR ".join(f"instr(lower({col}), ?) > 0" for col in text_cols) + ")"
+    score_parts = []
+    score_params = []
+    for term in search_terms:
+        score_parts.append(f"CASE WHEN {in_any_text} THEN 10 ELSE 0 END")
+        score_params.extend([term] * len(text_cols))
+        for col, weight in (('t.name', 20), ('t.key_word', 15), ('t.description', 5), ('u.username', 25)):
+            score_parts.append(f"CASE WHEN instr(lower({col}), ?) > 0 THEN {weight} ELSE 0 END")
+            score_params.append(term)
+    for color in detected_colors:
+        score_parts.append(f"CASE WHEN instr(lower(t.color_code), ?) > 0 THEN 50 WHEN {in_any_text} THEN 10 ELSE 0 END")
+        score_params.extend([color] * (1 + len(text_cols)))
+    score_sql = " + ".join(score_parts) or "0"
+
+    # One query for every target category: the other category DBs are ATTACHed to the first one's
+    # pooled connections, so SQLite merges, scores and orders the results itself
+    targets = [cat for cat in targets if cat in DB_MAPPING]
+    if targets:
+        pool, schemas = category_pool(targets)
+    parts = []
+    params = []
+    for cat in targets:
+        schema = schemas[cat]
+        # Define columns based on category schema (Logos don't have resolution/quality columns)
+        if cat == 'image':
+            extra_cols = "t.resolution, t.quality,"
+        else:
+            extra_cols = "NULL as resolution, NULL as quality,"
 
-            if category_filter not in ['All', 'Logo', '4K Image']:
-                sql += " AND LOWER(t.category) = LOWER(?)"
-                params.append(category_filter)
-                
-            cursor.execute(sql, params)
-            rows = cursor.fetchall()
-            
+        sql = f"""
+            SELECT t.id, t.user_id, 
+            t.name, t.description, t.color_code, t.key_word, t.link_tiny,
+            {extra_cols} t.category, t.link_small, t.link_medium, t.link_original, t.upload_date, t.likes, t.views, t.downloads, t.ai_data,
+            ? as category_type, u.username, u.avatar,
+            EXISTS(SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_liked,
+            EXISTS(SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_saved,
+            {score_sql} as relevance_score
+            FROM {schema}.uploads t
+            LEFT JOIN users_db.users u ON t.user_id = u.id
+            WHERE 1=1
+        """
+        params.extend([cat, user_id, cat, user_id, cat])
+        params.extend(score_params)
+    
+        # Each term must be present (as a substring of a text column or the username), so we add
+        # an AND clause for each term. Fuzzy variations are not needed here: every variation set
+        # contained the term itself, which this clause already requires.
+        for term in search_terms:
+            wildcard = f"%{term}%"
+            if cat in FTS_CATEGORIES and len(term) >= 3:
+                # Trigram index lookup (shorter terms have no trigram, so they use LIKE below)
+                phrase = '"' + term.replace('"', '""') + '"'
+                sql += f""" AND t.id IN (
+                    SELECT rowid FROM {schema}.uploads_fts WHERE uploads_fts MATCH ?
+                    UNION ALL
+                    SELECT id FROM {schema}.uploads WHERE user_id IN (SELECT id FROM users_db.users WHERE username LIKE ?))"""
+                params.extend([phrase, wildcard])
+            else:
+                sql += " AND (t.name LIKE ? OR t.description LIKE ? OR t.key_word LIKE ? OR t.category LIKE ? OR t.color_code LIKE ? OR u.username LIKE ?)"
+                params.extend([wildcard, wildcard, wildcard, wildcard, wildcard, wildcard])
+    
+        if cat == 'image' and quality_filter:
+            sql += " AND t.quality = ?"
+            params.append(quality_filter)
+
+        if category_filter not in ['All', 'Logo', '4K Image']:
+            sql += " AND LOWER(t.category) = LOWER(?)"
+            params.append(category_filter)
+        parts.append(sql)
+
+    if parts:
+        sql = " UNION ALL ".join(parts)
+        order = "views DESC, likes DESC" if sort_order == 'popular' else f"{primary_sort_key} DESC"
+        # With a query, relevance comes first
+        sql += f" ORDER BY relevance_score DESC, {order}" if query else f" ORDER BY {order}"
+        try:
+            with pool.acquire() as conn:
+                conn.row_factory = sqlite3.Row
+                rows = conn.execute(sql, params).fetchall()
+        
             for row in rows:
                 asset = dict(row)
                 if size_filter:
@@ -2934,7 +3543,7 @@ def perform_search_logic(query, category_filter, quality_filter, size_filter, so
                     if res_str:
                         if not check_orientation(res_str, size_filter):
                             continue
-                    elif cat == 'image':
+                    elif asset['category_type'] == 'image':
                         # Fallback: Check metadata if resolution is missing
                         meta_text = (asset.get('key_word') or '') + ' ' + (asset.get('name') or '')
                         meta_lower = meta_text.lower()
@@ -2945,48 +3554,9 @@ def perform_search_logic(query, category_filter, quality_filter, size_filter, so
                         elif size_filter == 'Square' and not any(x in meta_lower for x in ['square', 'instagram']):
                              continue
                 asset_results.append(asset)
-            conn.close()
         except Exception as e:
-            print(f"Search error in {cat}: {e}")
-            
-    for asset in asset_results:
-        score = 0
-        name = str(asset.get('name') or '').lower()
-        keywords = str(asset.get('key_word') or '').lower()
-        category = str(asset.get('category') or '').lower()
-        color_code = str(asset.get('color_code') or '').lower()
-        description = str(asset.get('description') or '').lower()
-        username = str(asset.get('username') or '').lower()
-        full_text = f"{name} {description} {keywords} {category} {username}"
-        
-        for term in search_terms: # This loop is for assets, not users
-            if term in full_text: score += 10
-            if term in name: score += 20
-            if term in keywords: score += 15
-            if term in description: score += 5
-            if term in username: score += 25
+            print(f"Search error in {', '.join(targets)}: {e}")
             
-        for color in detected_colors:
-            if color in color_code: score += 50
-            elif color in full_text: score += 10
-        
-        asset['relevance_score'] = score
-
-    # Sort asset results based on relevance and user preference
-    sort_key_map = {'newest': 'upload_date', 'popular': 'views', 'downloads': 'downloads'}
-    primary_sort_key = sort_key_map.get(sort_order, 'upload_date')
-
-    if query:
-        if sort_order == 'popular':
-            asset_results.sort(key=lambda x: (x['relevance_score'], x.get('views', 0), x.get('likes', 0)), reverse=True)
-        else:
-            asset_results.sort(key=lambda x: (x['relevance_score'], x.get(primary_sort_key, 0)), reverse=True)
-    else:
-        if sort_order == 'popular':
-            asset_results.sort(key=lambda x: (x.get('views', 0), x.get('likes', 0)), reverse=True)
-        else:
-            asset_results.sort(key=lambda x: x.get(primary_sort_key, 0), reverse=True)
-
     results = user_results + asset_results
 
     # Random Fallback if results are scarce
@@ -3002,6 +3572,10 @@ def perform_search_logic(query, category_filter, quality_filter, size_filter, so
             fallback_cats = ['image', 'logo']
             
         random_results = []
+        # Assets already in the results are excluded in SQL, so every fetched row is usable
+        found_ids = defaultdict(list)
+        for asset in asset_results:
+            found_ids[asset['category_type']].append(asset['id'])
         
         for cat in fallback_cats:
             if len(random_results) >= needed: break
@@ -3009,31 +3583,29 @@ def perform_search_logic(query, category_filter, quality_filter, size_filter, so
             if not db_path: continue
             
             try:
-                conn = sqlite3.connect(db_path)
-                conn.row_factory = sqlite3.Row
-                conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
-                cursor = conn.cursor()
+                with db_pool(db_path, users_db=USERS_DB).acquire() as conn:
+                    conn.row_factory = sqlite3.Row
+                    cursor = conn.cursor()
                 
-                sql = f"""
-                    SELECT t.id, t.user_id, t.link_tiny,
-                    t.name, t.description, t.color_code, t.key_word,
-                    t.resolution, t.quality, t.category, t.link_small, t.link_medium, t.link_original, t.upload_date, t.likes, t.views, t.downloads, t.ai_data,
-                    EXISTS(SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = t.id AND category = '{cat}') as is_saved
-                    FROM uploads t
-                    LEFT JOIN users_db.users u ON t.user_id = u.id
-                    ORDER BY RANDOM() LIMIT ?
-                """
-                cursor.execute(sql, (user_id, needed * 3))
-                rows = cursor.fetchall()
-                conn.close()
+                    exclude_ids = found_ids[cat]
+                    sql = f"""
+                        SELECT t.id, t.user_id, t.link_tiny,
+                        t.name, t.description, t.color_code, t.key_word,
+                        t.resolution, t.quality, t.category, t.link_small, t.link_medium, t.link_original, t.upload_date, t.likes, t.views, t.downloads, t.ai_data,
+                        ? as category_type,
+                        EXISTS(SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_saved
+                        FROM uploads t
+                        LEFT JOIN users_db.users u ON t.user_id = u.id
+                        WHERE t.id NOT IN ({','.join('?' * len(exclude_ids))})
+                        ORDER BY RANDOM() LIMIT ?
+                    """
+                    cursor.execute(sql, (cat, user_id, cat, *exclude_ids, needed - len(random_results)))
+                    rows = cursor.fetchall()
                 
                 for row in rows:
-                    if len(random_results) >= needed: break
                     asset = dict(row)
-                    # Avoid duplicates
-                    if not any(r['id'] == asset['id'] and r['category_type'] == asset['category_type'] for r in results + random_results):
-                        asset['is_random'] = True
-                        random_results.append(asset)
+                    asset['is_random'] = True
+                    random_results.append(asset)
             except Exception as e:
                 print(f"Random fetch error: {e}")
         
@@ -3065,7 +3637,7 @@ def search_assets():
         limit = int(request.args.get('limit', 20))
         users = []
         try:
-            with sqlite3.connect(USERS_DB) as conn:
+            with open_db(USERS_DB, autocommit=False) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -3093,7 +3665,7 @@ def search_assets():
                     # Get recent images for card background
                     recent = []
                     try:
-                        with sqlite3.connect(DB_MAPPING['image']) as c_img:
+                        with open_db(DB_MAPPING['image'], autocommit=False) as c_img:
                             cur_img = c_img.cursor()
                             cur_img.execute("SELECT link_small FROM uploads WHERE user_id = ? ORDER BY upload_date DESC LIMIT 3", (uid,))
                             recent = [r[0] for r in cur_img.fetchall()]
@@ -3235,12 +3807,12 @@ def search_page():
         try:
             conn = sqlite3.connect(NOTIF_DB)
             cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM notifications WHERE user_id = ? AND is_read = 0 LIMIT 1", (user_id,))
-            if cursor.fetchone(): has_unread = True
+            cursor.execute("SELECT EXISTS(SELECT 1 FROM notifications WHERE user_id = ? AND is_read = 0)", (user_id,))
+            has_unread = bool(cursor.fetchone()[0])
             conn.close()
 
             if 'theme_color' in session: theme_color = session['theme_color']
-            conn = sqlite3.connect(USERS_DB)
+            conn = open_db(USERS_DB, autocommit=False)
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute("SELECT theme_color, theme_mode FROM user_preferences WHERE user_id = ?", (user_id,))
@@ -3276,8 +3848,8 @@ def generator_page():
         try:
             conn = sqlite3.connect(NOTIF_DB)
             cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM notifications WHERE user_id = ? AND is_read = 0 LIMIT 1", (user_id,))
-            if cursor.fetchone(): has_unread = True
+            cursor.execute("SELECT EXISTS(SELECT 1 FROM notifications WHERE user_id = ? AND is_read = 0)", (user_id,))
+            has_unread = bool(cursor.fetchone()[0])
             conn.close()
 
             if 'theme_color' in session: theme_color = session['theme_color']
@@ -3304,23 +3876,21 @@ def view_asset(category, asset_id, slug=None):
 
     asset = None
     try:
-        conn = sqlite3.connect(DB_MAPPING[category])
-        conn.row_factory = sqlite3.Row
-        conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
-        cursor = conn.cursor()
+        with db_pool(DB_MAPPING[category], users_db=USERS_DB).acquire() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
         
-        # Fetch full asset details including user info
-        sql = f"""
-            SELECT t.*, '{category}' as category_type, u.username, u.avatar
-            FROM uploads t
-            LEFT JOIN users_db.users u ON t.user_id = u.id
-            WHERE t.id = ?
-        """
-        cursor.execute(sql, (asset_id,))
-        row = cursor.fetchone()
-        if row:
-            asset = dict(row)
-        conn.close()
+            # Fetch full asset details including user info
+            sql = """
+                SELECT t.*, ? as category_type, u.username, u.avatar
+                FROM uploads t
+                LEFT JOIN users_db.users u ON t.user_id = u.id
+                WHERE t.id = ?
+            """
+            cursor.execute(sql, (category, asset_id))
+            row = cursor.fetchone()
+            if row:
+                asset = dict(row)
     except Exception as e:
         print(f"Error fetching asset for view: {e}")
 
@@ -3374,10 +3944,10 @@ def view_user_profile(user_id):
         try:
             with sqlite3.connect(NOTIF_DB) as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT 1 FROM notifications WHERE user_id = ? AND is_read = 0 LIMIT 1", (session['user_id'],))
-                if cursor.fetchone(): has_unread = True
+                cursor.execute("SELECT EXISTS(SELECT 1 FROM notifications WHERE user_id = ? AND is_read = 0)", (session['user_id'],))
+                has_unread = bool(cursor.fetchone()[0])
 
-            with sqlite3.connect(USERS_DB) as conn:
+            with open_db(USERS_DB, autocommit=False) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute("SELECT theme_color, theme_mode FROM user_preferences WHERE user_id = ?", (session['user_id'],))
@@ -3411,7 +3981,7 @@ def generate_sitemap_xml():
     # 2. Add Assets
     for cat, db_path in DB_MAPPING.items():
         try:
-            conn = sqlite3.connect(db_path)
+            conn = open_db(db_path, autocommit=False)
             cursor = conn.cursor()
             # Get latest 1000 items per category, fetching medium and original links for SEO.
             cursor.execute("SELECT id, name, link_medium, link_original, upload_date FROM uploads ORDER BY upload_date DESC LIMIT 1000")
@@ -3480,7 +4050,7 @@ def home_sections():
     # Fetch 4K assets
     assets_4k = []
     try:
-        conn = sqlite3.connect(DB_MAPPING['image'])
+        conn = open_db(DB_MAPPING['image'], autocommit=False)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute('SELECT link_medium FROM uploads WHERE quality = "4K" ORDER BY upload_date DESC LIMIT 6')
@@ -3518,7 +4088,7 @@ def profile_template():
     # Dynamic Security: Refresh role from DB to ensure UI is up to date
     if user_id:
         try:
-            with sqlite3.connect(USERS_DB) as conn:
+            with open_db(USERS_DB, autocommit=False) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT role, email FROM users WHERE id = ?", (user_id,))
                 row = cursor.fetchone()
@@ -3540,19 +4110,22 @@ def profile_template():
     following_count = 0
     
     if user_id:
-        for category, db_name in DB_MAPPING.items():
-            try:
-                conn = sqlite3.connect(db_name)
-                cursor = conn.cursor()
-                cursor.execute("SELECT SUM(likes), SUM(views), SUM(downloads) FROM uploads WHERE user_id = ?", (user_id,))
-                row = cursor.fetchone()
-                if row:
-                    total_likes += row[0] if row[0] else 0
-                    total_views += row[1] if row[1] else 0
-                    total_downloads += row[2] if row[2] else 0
-                conn.close()
-            except Exception as e:
-                print(f"Error calculating stats for {category}: {e}")
+        # Totals over every category database in one statement (the others are ATTACHed to the
+        # first one's pooled connections, like in search)
+        categories = list(DB_MAPPING)
+        pool, schemas = category_pool(categories)
+        uploads_sql = " UNION ALL ".join(
+            f"SELECT likes, views, downloads FROM {schemas[cat]}.uploads WHERE user_id = ?" for cat in categories
+        )
+        try:
+            with pool.acquire() as conn:
+                row = conn.execute(
+                    f"SELECT COALESCE(SUM(likes), 0), COALESCE(SUM(views), 0), COALESCE(SUM(downloads), 0) FROM ({uploads_sql})",
+                    [user_id] * len(categories)
+                ).fetchone()
+                total_likes, total_views, total_downloads = row
+        except Exception as e:
+            print(f"Error calculating stats for user {user_id}: {e}")
         
         # Fetch latest notification
         try:
@@ -3590,38 +4163,55 @@ def get_public_user_assets(user_id):
     """API to fetch paginated assets for a specific user."""
     limit = int(request.args.get('limit', 20))
     offset = int(request.args.get('offset', 0))
+    current_user = session.get('user_id', 0)
     
-    all_assets = []
+    # One query over every database (the others are ATTACHed to the first one's pooled
+    # connections): SQLite merges them by date and pages with LIMIT/OFFSET, each part
+    # reading the user's rows newest first through idx_uploads_user
+    categories = list(DB_MAPPING)
+    pool, schemas = category_pool(categories)
+    parts = []
+    params = []
+    for category in categories:
+        # Logos don't have resolution/quality columns
+        if category == 'image':
+            extra_cols = "t.resolution, t.quality,"
+        else:
+            extra_cols = "NULL as resolution, NULL as quality,"
+        parts.append(f'''
+            SELECT t.id, t.user_id, t.name, t.description, t.color_code, t.key_word, t.link_tiny,
+            {extra_cols} t.category, t.link_small, t.link_medium, t.link_original, t.slug,
+            t.upload_date, t.likes, t.views, t.downloads, t.ai_data, ? as category_type,
+            (SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_liked,
+            (SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = t.id AND category = ?) as is_saved
+            FROM {schemas[category]}.uploads t
+            WHERE t.user_id = ?
+        ''')
+        params.extend([category, current_user, category, current_user, category, user_id])
     
-    # Fetch from all databases
-    for category, db_name in DB_MAPPING.items():
-        try:
-            conn = sqlite3.connect(db_name)
-            conn.row_factory = sqlite3.Row
-            # Attach users DB to check likes/saves if logged in
-            conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
-            cursor = conn.cursor()
-            
-            current_user = session.get('user_id', 0)
-            
-            cursor.execute(f'''
-                SELECT uploads.*, '{category}' as category_type,
-                (SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = uploads.id AND category = ?) as is_liked,
-                (SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = uploads.id AND category = ?) as is_saved
-                FROM uploads 
-                WHERE user_id = ?
-            ''', (current_user, category, current_user, category, user_id))
-            
-            all_assets.extend([dict(row) for row in cursor.fetchall()])
-            conn.close()
-        except Exception as e:
-            print(f"Error fetching {category} for user {user_id}: {e}")
-
-    # Sort by date (newest first) and paginate in Python
-    all_assets.sort(key=lambda x: x['upload_date'], reverse=True)
-    paginated_assets = all_assets[offset : offset + limit]
+    # One extra row tells whether more pages exist
+    page_sql = " UNION ALL ".join(parts) + " ORDER BY upload_date DESC LIMIT ? OFFSET ?"
+    params.extend([limit + 1, offset])
+    
+    # SQLite builds the page as one JSON array of asset objects, sent as is (no dict per row).
+    # The extra row only counts towards has_more, so the array keeps the first `limit` rows.
+    columns = ['id', 'user_id', 'name', 'description', 'color_code', 'key_word', 'link_tiny',
+               'resolution', 'quality', 'category', 'link_small', 'link_medium', 'link_original', 'slug',
+               'upload_date', 'likes', 'views', 'downloads', 'ai_data', 'category_type', 'is_liked', 'is_saved']
+    asset_json = "json_object(" + ", ".join(f"'{col}', {col}" for col in columns) + ")"
+    sql = f"""
+        SELECT json_group_array({asset_json}) FILTER (WHERE page_row <= ?), COUNT(*) > ?
+        FROM (SELECT *, row_number() OVER (ORDER BY upload_date DESC) AS page_row FROM ({page_sql}))
+    """
+    
+    assets_json, has_more = None, False
+    try:
+        with pool.acquire() as conn:
+            assets_json, has_more = conn.execute(sql, [limit, limit] + params).fetchone()
+    except Exception as e:
+        print(f"Error fetching assets for user {user_id}: {e}")
     
-    return jsonify({'success': True, 'assets': paginated_assets, 'has_more': len(all_assets) > offset + limit})
+    return sql_json_response('assets', assets_json, has_more=bool(has_more))
 
 # ===================================================================================
 #                                 USER AUTHENTICATION
@@ -3684,7 +4274,7 @@ def google_callback():
     name = id_info.get('name')
     avatar_url = id_info.get('picture')
 
-    conn = sqlite3.connect(USERS_DB)
+    conn = open_db(USERS_DB, autocommit=False)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -3697,6 +4287,7 @@ def google_callback():
         session['user_id'] = user['id']
         session['username'] = user['username']
         session['role'] = user['role']
+        session['email'] = user['email']
         session['avatar'] = user['avatar']
     else:
         # New user, create account
@@ -3723,6 +4314,7 @@ def google_callback():
         session['user_id'] = new_user_id
         session['username'] = username
         session['role'] = 'user'
+        session['email'] = email
         session['avatar'] = avatar_filename
 
     conn.close()
@@ -3743,28 +4335,14 @@ def register():
     result = user_manager.create_user(username, password, email, avatar=avatar)
     if result['success']:
         # Add Welcome Notification
-        try:
-            conn = sqlite3.connect(USERS_DB)
-            cursor = conn.cursor()
-            cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
-            row = cursor.fetchone()
-            conn.close()
-            
-            if row:
-                user_id = row[0]
-                conn_notif = sqlite3.connect(NOTIF_DB)
-                conn_notif.execute("INSERT INTO notifications (user_id, message, type, created_at) VALUES (?, ?, ?, ?)", 
-                                     (user_id, "Welcome to the community! We are glad to have you here.", "system", time.time()))
-                conn_notif.commit()
-                conn_notif.close()
-        except Exception as e:
-            print(f"Error creating welcome notification: {e}")
+        create_notification(result['user_id'], "Welcome to the community! We are glad to have you here.", "system")
             
         # Auto-login the user
         session.permanent = True
         session['user_id'] = result['user_id']
         session['username'] = username
         session['role'] = 'user'
+        session['email'] = email
         session['avatar'] = avatar
         
         # Return user info for frontend storage
@@ -3788,6 +4366,7 @@ def login():
         session['user_id'] = result['user_id']
         session['username'] = result.get('username', username)
         session['role'] = result['role']
+        session['email'] = username # Login identifier is the email address
         session['avatar'] = result.get('avatar')
         return jsonify(result), 200
     result['message'] = 'INVALID_CREDENTIALS'
@@ -3838,7 +4417,7 @@ def update_profile():
         return jsonify({'success': False, 'message': 'Username cannot be empty'}), 400
         
     try:
-        conn = sqlite3.connect(USERS_DB)
+        conn = open_db(USERS_DB, autocommit=False)
         cursor = conn.cursor()
         
         # Check if username is taken by another user
@@ -3865,25 +4444,13 @@ def update_profile():
                 cursor.execute("UPDATE users SET avatar = ? WHERE id = ?", (db_avatar, session['user_id']))
                 session['avatar'] = db_avatar
 
-        # Update Bio
+        # Update Bio (profile columns are added at startup by UserManager.init_db)
         if new_bio is not None:
-            try:
-                cursor.execute("UPDATE users SET bio = ? WHERE id = ?", (new_bio, session['user_id']))
-            except sqlite3.OperationalError:
-                cursor.execute("ALTER TABLE users ADD COLUMN bio TEXT")
-                cursor.execute("UPDATE users SET bio = ? WHERE id = ?", (new_bio, session['user_id']))
+            cursor.execute("UPDATE users SET bio = ? WHERE id = ?", (new_bio, session['user_id']))
         
-        # Update Socials (Ensure columns exist first)
-        try:
-            cursor.execute("UPDATE users SET website=?, instagram=?, twitter=?, contact_email=? WHERE id=?", 
-                          (website, instagram, twitter, contact_email, session['user_id']))
-        except sqlite3.OperationalError:
-            cursor.execute("ALTER TABLE users ADD COLUMN website TEXT")
-            cursor.execute("ALTER TABLE users ADD COLUMN instagram TEXT")
-            cursor.execute("ALTER TABLE users ADD COLUMN twitter TEXT")
-            cursor.execute("ALTER TABLE users ADD COLUMN contact_email TEXT")
-            cursor.execute("UPDATE users SET website=?, instagram=?, twitter=?, contact_email=? WHERE id=?", 
-                          (website, instagram, twitter, contact_email, session['user_id']))
+        # Update Socials
+        cursor.execute("UPDATE users SET website=?, instagram=?, twitter=?, contact_email=? WHERE id=?", 
+                      (website, instagram, twitter, contact_email, session['user_id']))
         
         # Update Password if provided
         if new_password:
@@ -3915,15 +4482,11 @@ def serve_avatar(filename):
 def get_public_user_details(user_id):
     """Fetches public details for a user profile."""
     try:
-        conn = sqlite3.connect(USERS_DB)
+        conn = open_db(USERS_DB, autocommit=False)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        # Try selecting with new columns, fallback if they don't exist yet
-        try:
-            cursor.execute("SELECT id, username, avatar, bio, website, instagram, twitter, contact_email FROM users WHERE id = ?", (user_id,))
-        except sqlite3.OperationalError:
-            cursor.execute("SELECT id, username, avatar, bio FROM users WHERE id = ?", (user_id,))
+        cursor.execute("SELECT id, username, avatar, bio, website, instagram, twitter, contact_email FROM users WHERE id = ?", (user_id,))
             
         row = cursor.fetchone()
         
@@ -3984,7 +4547,7 @@ def track_view():
         
     try:
         # Increment View
-        conn = sqlite3.connect(DB_MAPPING[category])
+        conn = open_db(DB_MAPPING[category], autocommit=False)
         cursor = conn.cursor()
         cursor.execute("UPDATE uploads SET views = views + 1 WHERE id = ?", (asset_id,))
         
@@ -4011,7 +4574,7 @@ def track_view():
             # Check Milestones
             total_views = 0
             for cat, db in DB_MAPPING.items():
-                c = sqlite3.connect(db)
+                c = open_db(db, autocommit=False)
                 cur = c.cursor()
                 cur.execute("SELECT SUM(views) FROM uploads WHERE user_id = ?", (owner_id,))
                 r = cur.fetchone()
@@ -4077,7 +4640,7 @@ def toggle_like():
     if not asset_id or category not in DB_MAPPING:
         return jsonify({'success': False, 'message': 'Invalid data'}), 400
 
-    conn_users = sqlite3.connect(USERS_DB)
+    conn_users = open_db(USERS_DB, autocommit=False)
     cursor_users = conn_users.cursor()
     
     # Check if liked
@@ -4096,7 +4659,7 @@ def toggle_like():
     
     # Update Asset Counter
     try:
-        conn_assets = sqlite3.connect(DB_MAPPING[category])
+        conn_assets = open_db(DB_MAPPING[category], autocommit=False)
         cursor_assets = conn_assets.cursor()
         if liked:
             cursor_assets.execute('UPDATE uploads SET likes = likes + 1 WHERE id=?', (asset_id,))
@@ -4110,7 +4673,7 @@ def toggle_like():
     # Send Notification if liked
     if liked:
         try:
-            conn_asset = sqlite3.connect(DB_MAPPING[category])
+            conn_asset = open_db(DB_MAPPING[category], autocommit=False)
             cursor_asset = conn_asset.cursor()
             cursor_asset.execute("SELECT user_id, name FROM uploads WHERE id = ?", (asset_id,))
             row = cursor_asset.fetchone()
@@ -4152,7 +4715,7 @@ def toggle_save():
         except Exception as e:
             return jsonify({'success': False, 'message': str(e)}), 500
 
-    conn = sqlite3.connect(USERS_DB)
+    conn = open_db(USERS_DB, autocommit=False)
     cursor = conn.cursor()
     cursor.execute('SELECT 1 FROM user_saves WHERE user_id=? AND asset_id=? AND category=?', (user_id, asset_id, category))
     if cursor.fetchone():
@@ -4177,27 +4740,25 @@ def get_user_saved_assets():
     saved_assets = []
     for category, db_name in DB_MAPPING.items():
         try:
-            conn = sqlite3.connect(db_name)
-            conn.row_factory = sqlite3.Row
-            conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
-            cursor = conn.cursor()
+            with db_pool(db_name, users_db=USERS_DB).acquire() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
             
-            cursor.execute(f'''
-                SELECT uploads.id, uploads.name, uploads.description, uploads.link_small, uploads.link_tiny, uploads.upload_date,
-                uploads.likes, uploads.views, uploads.downloads,
-                '{category}' as category_type, users.username, users.avatar,
-                1 as is_saved,
-                (SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = uploads.id AND category = ?) as is_liked
-                FROM uploads
-                JOIN users_db.user_saves s ON uploads.id = s.asset_id AND s.category = ? AND s.user_id = ?
-                LEFT JOIN users_db.users users ON uploads.user_id = users.id
-                ORDER BY upload_date DESC
-            ''', (user_id, category, category, user_id))
+                cursor.execute('''
+                    SELECT uploads.id, uploads.name, uploads.description, uploads.link_small, uploads.link_tiny, uploads.upload_date,
+                    uploads.likes, uploads.views, uploads.downloads,
+                    ? as category_type, users.username, users.avatar,
+                    1 as is_saved,
+                    (SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = uploads.id AND category = ?) as is_liked
+                    FROM uploads
+                    JOIN users_db.user_saves s ON uploads.id = s.asset_id AND s.category = ? AND s.user_id = ?
+                    LEFT JOIN users_db.users users ON uploads.user_id = users.id
+                    ORDER BY upload_date DESC
+                ''', (category, user_id, category, category, user_id))
             
-            rows = cursor.fetchall()
-            for row in rows:
-                saved_assets.append(dict(row))
-            conn.close()
+                rows = cursor.fetchall()
+                for row in rows:
+                    saved_assets.append(dict(row))
         except Exception as e:
             print(f"Error fetching saved {category}: {e}")
             
@@ -4254,26 +4815,24 @@ def get_user_uploads():
     user_uploads = []
     for category, db_name in DB_MAPPING.items():
         try:
-            conn = sqlite3.connect(db_name)
-            conn.row_factory = sqlite3.Row
-            conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
-            cursor = conn.cursor()
+            with db_pool(db_name, users_db=USERS_DB).acquire() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
             
-            cursor.execute(f'''
-                SELECT uploads.id, uploads.name, uploads.description, uploads.link_small, uploads.link_tiny, uploads.upload_date,
-                uploads.likes, uploads.views, uploads.downloads,
-                '{category}' as category_type,
-                (SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = uploads.id AND category = ?) as is_liked,
-                (SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = uploads.id AND category = ?) as is_saved
-                FROM uploads
-                WHERE user_id = ?
-                ORDER BY upload_date DESC
-            ''', (user_id, category, user_id, category, user_id))
+                cursor.execute('''
+                    SELECT uploads.id, uploads.name, uploads.description, uploads.link_small, uploads.link_tiny, uploads.upload_date,
+                    uploads.likes, uploads.views, uploads.downloads,
+                    ? as category_type,
+                    (SELECT 1 FROM users_db.user_likes WHERE user_id = ? AND asset_id = uploads.id AND category = ?) as is_liked,
+                    (SELECT 1 FROM users_db.user_saves WHERE user_id = ? AND asset_id = uploads.id AND category = ?) as is_saved
+                    FROM uploads
+                    WHERE user_id = ?
+                    ORDER BY upload_date DESC
+                ''', (category, user_id, category, user_id, category, user_id))
             
-            rows = cursor.fetchall()
-            for row in rows:
-                user_uploads.append(dict(row))
-            conn.close()
+                rows = cursor.fetchall()
+                for row in rows:
+                    user_uploads.append(dict(row))
         except Exception as e:
             print(f"Error fetching user uploads for {category}: {e}")
             
@@ -4296,7 +4855,7 @@ def delete_asset():
 
     try:
         db_path = DB_MAPPING[category]
-        conn = sqlite3.connect(db_path)
+        conn = open_db(db_path, autocommit=False)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -4339,7 +4898,7 @@ def delete_asset():
 
         # Cleanup interactions (likes/saves) and reports to ensure full SQL deletion
         try:
-            conn_users = sqlite3.connect(USERS_DB)
+            conn_users = open_db(USERS_DB, autocommit=False)
             conn_users.execute("DELETE FROM user_likes WHERE asset_id = ? AND category = ?", (asset_id, category))
             conn_users.execute("DELETE FROM user_saves WHERE asset_id = ? AND category = ?", (asset_id, category))
             conn_users.commit()
@@ -4370,7 +4929,7 @@ def user_preferences():
         theme_mode = data.get('theme_mode')
             
         try:
-            conn = sqlite3.connect(USERS_DB)
+            conn = open_db(USERS_DB, autocommit=False)
             cursor = conn.cursor()
             
             # Check if exists
@@ -4412,19 +4971,19 @@ def submit_report():
         return jsonify({'success': False, 'message': 'Invalid asset'}), 400
         
     try:
-        conn = sqlite3.connect(REPORT_DB)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        cursor = conn.cursor()
-        cursor.execute(
+        db_writer.execute(
+            REPORT_DB,
             "INSERT INTO reports (user_id, asset_id, category, reasons, message, created_at) VALUES (?, ?, ?, ?, ?, ?)",
             (session['user_id'], asset_id, category, json.dumps(reasons), message, time.time())
         )
-        conn.commit()
-        conn.close()
-        print(f"Report saved successfully: User {session['user_id']} reported Asset {asset_id}")
+        logger.info("Report saved: user=%s asset=%s", session['user_id'], asset_id)
         return jsonify({'success': True, 'message': 'Report submitted successfully'})
+    except WriteQueuedError as e:
+        # Not a failure: the write is still queued and will be committed
+        logger.warning("%s", e)
+        return jsonify({'success': True, 'queued': True, 'message': 'WRITE_QUEUED'}), 202
     except Exception as e:
-        print(f"Error saving report: {e}")
+        logger.error("Error saving report: %s", e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @app.route('/api/feedback', methods=['POST'])
@@ -4439,46 +4998,54 @@ def submit_feedback():
         return jsonify({'success': False, 'message': 'Message cannot be empty'}), 400
         
     try:
-        conn = sqlite3.connect(REPORT_DB)
-        cursor = conn.cursor()
         # Insert feedback as a report with category 'feedback'
-        cursor.execute(
+        db_writer.execute(
+            REPORT_DB,
             "INSERT INTO reports (user_id, asset_id, category, reasons, message, created_at) VALUES (?, NULL, 'feedback', ?, ?, ?)",
             (session['user_id'], json.dumps(['General Feedback']), message, time.time())
         )
-        conn.commit()
-        conn.close()
         return jsonify({'success': True, 'message': 'Feedback submitted successfully'})
+    except WriteQueuedError as e:
+        # Not a failure: the write is still queued and will be committed
+        logger.warning("%s", e)
+        return jsonify({'success': True, 'queued': True, 'message': 'WRITE_QUEUED'}), 202
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @app.route('/api/admin/reports')
 def admin_reports():
     try:
-        conn = sqlite3.connect(REPORT_DB)
-        conn.row_factory = sqlite3.Row
+        conn = open_db_readonly(REPORT_DB)
         # Attach users db to get usernames
         conn.execute(f"ATTACH DATABASE '{USERS_DB}' AS users_db")
         cursor = conn.cursor()
         
+        # SQLite builds the whole JSON array itself (reasons are already stored as JSON),
+        # so no per-row dict/json.loads/jsonify round trip is needed here.
+        # Ordering lives in the subquery because json_group_array ignores an outer ORDER BY.
         cursor.execute('''
-            SELECT r.*, u.username, u.email 
-            FROM reports r 
-            LEFT JOIN users_db.users u ON r.user_id = u.id 
-            ORDER BY r.created_at DESC
+            SELECT json_group_array(json(report)) FROM (
+                SELECT json_object(
+                    'id', r.id,
+                    'user_id', r.user_id,
+                    'asset_id', r.asset_id,
+                    'category', r.category,
+                    'reasons', CASE WHEN json_valid(r.reasons) THEN json(r.reasons) ELSE json('[]') END,
+                    'message', r.message,
+                    'created_at', r.created_at,
+                    'status', r.status,
+                    'username', u.username,
+                    'email', u.email
+                ) AS report
+                FROM reports r 
+                LEFT JOIN users_db.users u ON r.user_id = u.id 
+                ORDER BY r.created_at DESC
+            )
         ''')
-        
-        reports = [dict(row) for row in cursor.fetchall()]
+        row = cursor.fetchone()
         conn.close()
         
-        # Parse reasons JSON for frontend
-        for r in reports:
-            try:
-                r['reasons'] = json.loads(r['reasons'])
-            except:
-                r['reasons'] = []
-                
-        return jsonify({'success': True, 'reports': reports})
+        return sql_json_response('reports', row[0])
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -4488,11 +5055,12 @@ def admin_delete_report():
     report_id = data.get('id')
     
     try:
-        conn = sqlite3.connect(REPORT_DB)
-        conn.execute("DELETE FROM reports WHERE id = ?", (report_id,))
-        conn.commit()
-        conn.close()
+        db_writer.execute(REPORT_DB, "DELETE FROM reports WHERE id = ?", (report_id,))
         return jsonify({'success': True})
+    except WriteQueuedError as e:
+        # Not a failure: the write is still queued and will be committed
+        logger.warning("%s", e)
+        return jsonify({'success': True, 'queued': True, 'message': 'WRITE_QUEUED'}), 202
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -4507,24 +5075,11 @@ def admin_required(f):
         if 'user_id' not in session:
             return redirect(url_for('index'))
         
-        # Simplified Admin Check: Trust Session Data First (Matches Frontend Visibility)
+        # Role and email are set at login (and refreshed on page loads) in the signed
+        # session cookie, so they are trusted as-is without a DB round trip per admin call.
         if session.get('role') == 'admin' or session.get('email') in ADMIN_EMAILS:
             return f(*args, **kwargs)
 
-        # Fallback: Verify role from DB if session is stale
-        try:
-            with sqlite3.connect(USERS_DB) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT role, email FROM users WHERE id = ?", (session['user_id'],))
-                row = cursor.fetchone()
-                if row:
-                    session['role'] = row[0]
-                    session['email'] = row[1]
-                    if row[0] == 'admin' or row[1] in ADMIN_EMAILS:
-                        return f(*args, **kwargs)
-        except Exception as e:
-            print(f"Admin auth error: {e}")
-
         return render_template('home.html', error="Access Denied: Admins Only")
     return decorated_function
 
@@ -4543,7 +5098,7 @@ def promote_admin(key):
     if 'user_id' not in session:
         return "Please log in first."
     try:
-        with sqlite3.connect(USERS_DB) as conn:
+        with open_db(USERS_DB, autocommit=False) as conn:
             conn.execute("UPDATE users SET role = 'admin' WHERE id = ?", (session['user_id'],))
         session['role'] = 'admin'
         return "Success! You are now an admin. <a href='/admin'>Go to Dashboard</a>"
@@ -4556,17 +5111,17 @@ def admin_stats():
     stats = {'users': 0, 'images': 0, 'logos': 0, 'downloads': 0, 'generations': 0}
     try:
         # Users
-        with sqlite3.connect(USERS_DB) as conn:
+        with open_db(USERS_DB, autocommit=False) as conn:
             stats['users'] = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
         
         # Images
-        with sqlite3.connect(DB_MAPPING['image']) as conn:
+        with open_db(DB_MAPPING['image'], autocommit=False) as conn:
             row = conn.execute("SELECT COUNT(*), SUM(downloads) FROM uploads").fetchone()
             stats['images'] = row[0]
             stats['downloads'] += (row[1] or 0)
             
         # Logos
-        with sqlite3.connect(DB_MAPPING['logo']) as conn:
+        with open_db(DB_MAPPING['logo'], autocommit=False) as conn:
             row = conn.execute("SELECT COUNT(*), SUM(downloads) FROM uploads").fetchone()
             stats['logos'] = row[0]
             stats['downloads'] += (row[1] or 0)
@@ -4576,7 +5131,7 @@ def admin_stats():
             stats['generations'] = conn.execute("SELECT COUNT(*) FROM generation_requests").fetchone()[0]
             
     except Exception as e:
-        print(f"Stats Error: {e}")
+        logger.error("Stats Error: %s", e)
         
     return jsonify({'success': True, 'stats': stats})
 
@@ -4584,13 +5139,18 @@ def admin_stats():
 @admin_required
 def admin_users():
     try:
-        conn = sqlite3.connect(USERS_DB)
-        conn.row_factory = sqlite3.Row
+        conn = open_db_readonly(USERS_DB)
         cursor = conn.cursor()
-        cursor.execute("SELECT id, username, email, role, avatar, created_at FROM users ORDER BY id DESC LIMIT 100")
-        users = [dict(row) for row in cursor.fetchall()]
+        # Serialized by SQLite in one pass instead of dict(row) per user + jsonify
+        cursor.execute('''
+            SELECT json_group_array(json_object(
+                'id', id, 'username', username, 'email', email,
+                'role', role, 'avatar', avatar, 'created_at', created_at
+            )) FROM (SELECT * FROM users ORDER BY id DESC LIMIT 100)
+        ''')
+        row = cursor.fetchone()
         conn.close()
-        return jsonify({'success': True, 'users': users})
+        return sql_json_response('users', row[0])
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -4606,14 +5166,36 @@ def admin_delete_user():
         return jsonify({'success': False, 'message': 'Cannot delete yourself'}), 400
         
     try:
-        conn = sqlite3.connect(USERS_DB)
-        conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
-        conn.commit()
-        conn.close()
+        db_writer.execute(USERS_DB, "DELETE FROM users WHERE id = ?", (user_id,))
         return jsonify({'success': True})
+    except WriteQueuedError as e:
+        # Not a failure: the write is still queued and will be committed
+        logger.warning("%s", e)
+        return jsonify({'success': True, 'queued': True, 'message': 'WRITE_QUEUED'}), 202
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+# Key-range shards for listing the bucket concurrently. ListObjectsV2 returns keys in
+# lexicographic order, so each shard lists from StartAfter=lower and stops at the next
+# boundary. A plain prefix fan-out ('tiny_', 'small_', ..., '') would list keys twice.
+R2_SCAN_SHARD_BOUNDARIES = ('a', 'g', 'medium_', 'n', 'small_', 'tiny_', 'u')
+R2_SCAN_WORKERS = 8
+# Variant prefixes stripped to find an orphan's base name: (prefix, len(prefix))
+R2_VARIANT_PREFIXES = (('tiny_', 5), ('small_', 6), ('medium_', 7))
+
+def iter_r2_pages(start_after=None, stop_before=None):
+    """Yields pages of R2 objects whose key sorts after `start_after` and before `stop_before`."""
+    paginator = s3_client.get_paginator('list_objects_v2')
+    kwargs = {'Bucket': R2_BUCKET_NAME}
+    if start_after:
+        kwargs['StartAfter'] = start_after
+    for page in paginator.paginate(**kwargs):
+        objs = page.get('Contents', [])
+        if stop_before and objs and objs[-1]['Key'] >= stop_before:
+            yield [obj for obj in objs if obj['Key'] < stop_before]
+            return
+        yield objs
+
 @app.route('/api/admin/scan_r2')
 @admin_required
 def admin_scan_r2():
@@ -4622,89 +5204,97 @@ def admin_scan_r2():
         return jsonify({'success': False, 'message': 'R2 not configured'}), 500
 
     try:
-        # 1. Get all files from SQL
-        registered_files = set()
+        # 1. Get all files from SQL into a scratch table, so the set-diff runs inside SQLite
+        #    instead of holding every link as a Python string. An empty filename gives a private
+        #    on-disk temp database, keeping memory bounded however large the bucket is.
+        scan_db = sqlite3.connect('', isolation_level=None, check_same_thread=False)
+        scan_db.execute("CREATE TABLE registered (link TEXT PRIMARY KEY) WITHOUT ROWID")
+        scan_db.execute("CREATE TABLE page_keys (key TEXT)")
+        scan_db.execute("CREATE TABLE orphans (base TEXT, key TEXT, size INTEGER, last_modified TEXT)")
+        
         for db_name in DB_MAPPING.values():
-            with sqlite3.connect(db_name) as conn:
-                cursor = conn.cursor()
-                try:
-                    # Try fetching all 4 versions to be robust against schema changes
-                    cursor.execute("SELECT link_original, link_medium, link_small, link_tiny FROM uploads")
-                except sqlite3.OperationalError:
-                    # Fallback for older DBs without link_tiny column
-                    cursor.execute("SELECT link_original, link_medium, link_small FROM uploads")
-
-                for row in cursor.fetchall():
-                    for link in row:
-                        if link: registered_files.add(link)
+            scan_db.execute("ATTACH DATABASE ? AS src", (db_name,))
+            try:
+                scan_db.execute('''
+                    INSERT OR IGNORE INTO registered
+                    SELECT link FROM (
+                        SELECT link_original AS link FROM src.uploads
+                        UNION ALL SELECT link_medium FROM src.uploads
+                        UNION ALL SELECT link_small FROM src.uploads
+                        UNION ALL SELECT link_tiny FROM src.uploads
+                    ) WHERE link IS NOT NULL AND link != ''
+                ''')
+            finally:
+                scan_db.execute("DETACH DATABASE src")
 
         # 1.5 Get generated files from Generated DB
         try:
-            with sqlite3.connect(GENERATED_DB) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT r2_key FROM user_generations")
-                for row in cursor.fetchall():
-                    if row[0]: registered_files.add(row[0])
+            scan_db.execute("ATTACH DATABASE ? AS gen", (GENERATED_DB,))
+            scan_db.execute("INSERT OR IGNORE INTO registered SELECT r2_key FROM gen.user_generations WHERE r2_key IS NOT NULL AND r2_key != ''")
+            scan_db.execute("DETACH DATABASE gen")
         except Exception as e:
-            print(f"Error scanning generated DB for R2 scan: {e}")
+            logger.error("Error scanning generated DB for R2 scan: %s", e)
 
-        # 2. List files in R2 (Pagination for full scan)
-        paginator = s3_client.get_paginator('list_objects_v2')
-        page_iterator = paginator.paginate(Bucket=R2_BUCKET_NAME)
-        
-        orphaned_groups = {}
+        # 2. List files in R2 (Pagination for full scan, one worker per key range)
+        scan_lock = threading.Lock()
         
-        for page in page_iterator:
-            if 'Contents' in page:
-                for obj in page['Contents']:
-                    key = obj['Key']
+        def scan_shard(bounds):
+            for objs in iter_r2_pages(*bounds):
+                # Filter out non-image files to avoid listing backups, logs, etc.
+                page = {}
+                for obj in objs:
+                    key_no_ext, extension = os.path.splitext(obj['Key'])
+                    if extension[1:].lower() in ALLOWED_EXTENSIONS:
+                        page[obj['Key']] = (key_no_ext, obj)
+                if not page:
+                    continue
+                
+                # The scan DB is shared by all shards
+                with scan_lock:
+                    scan_db.execute("DELETE FROM page_keys")
+                    scan_db.executemany("INSERT INTO page_keys VALUES (?)", ((key,) for key in page))
+                    orphan_keys = [row[0] for row in scan_db.execute("SELECT key FROM page_keys WHERE key NOT IN registered")]
                     
-                    # Filter out non-image files to avoid listing backups, logs, etc.
-                    extension = key.rsplit('.', 1)[-1].lower() if '.' in key else ''
-                    if extension not in ALLOWED_EXTENSIONS:
-                        continue
-
-                    if key not in registered_files:
+                    orphan_rows = []
+                    for key in orphan_keys:
+                        key_no_ext, obj = page[key]
                         # Smart grouping: Determine base name by stripping prefixes/suffixes
-                        key_no_ext = key.rsplit('.', 1)[0]
-                        base_name = key_no_ext
-                        
-                        if key_no_ext.startswith('tiny_'):
-                            base_name = key_no_ext[5:]
-                        elif key_no_ext.startswith('small_'):
-                            base_name = key_no_ext[6:]
-                        elif key_no_ext.startswith('medium_'):
-                            base_name = key_no_ext[7:]
-                        elif key_no_ext.endswith('_original'):
-                            base_name = key_no_ext[:-9]
-                        
-                        if base_name not in orphaned_groups:
-                            orphaned_groups[base_name] = {
-                                'files': [],
-                                'total_size': 0,
-                                'last_modified': obj['LastModified'].isoformat(),
-                                'display_key': key # Default to first found
-                            }
-                        
-                        group = orphaned_groups[base_name]
-                        group['files'].append(key)
-                        group['total_size'] += obj['Size']
-                        
-                        # Prefer 'small_' for display if available
-                        if key.startswith('small_'):
-                            group['display_key'] = key
-
-        # Convert groups to list
-        orphans_list = []
-        for base, data in orphaned_groups.items():
-            orphans_list.append({
-                'display_key': data['display_key'],
-                'files': data['files'], # List of all files to delete
-                'size': data['total_size'],
-                'last_modified': data['last_modified']
-            })
+                        for prefix, prefix_len in R2_VARIANT_PREFIXES:
+                            if key_no_ext.startswith(prefix):
+                                base_name = key_no_ext[prefix_len:]
+                                break
+                        else:
+                            base_name = key_no_ext[:-9] if key_no_ext.endswith('_original') else key_no_ext
+                        orphan_rows.append((base_name, key, obj['Size'], obj['LastModified'].isoformat()))
+                    scan_db.executemany("INSERT INTO orphans VALUES (?, ?, ?, ?)", orphan_rows)
+        
+        shards = list(zip((None,) + R2_SCAN_SHARD_BOUNDARIES, R2_SCAN_SHARD_BOUNDARIES + (None,)))
+        try:
+            with ThreadPoolExecutor(max_workers=R2_SCAN_WORKERS) as executor:
+                # list() re-raises the first listing error, like the serial scan did
+                list(executor.map(scan_shard, shards))
+            
+            # 3. Group variants per base name (prefer 'small_' for display) and emit JSON in SQLite
+            row = scan_db.execute('''
+                SELECT json_group_array(json_object(
+                    'display_key', COALESCE(small_key, first_key),
+                    'files', json(files), -- List of all files to delete
+                    'size', size,
+                    'last_modified', last_modified
+                )) FROM (
+                    SELECT json_group_array(key) AS files,
+                           SUM(size) AS size,
+                           MAX(last_modified) AS last_modified,
+                           MAX(CASE WHEN substr(key, 1, 6) = 'small_' THEN key END) AS small_key,
+                           MIN(key) AS first_key
+                    FROM orphans
+                    GROUP BY base
+                )
+            ''').fetchone()
+        finally:
+            scan_db.close()
 
-        return jsonify({'success': True, 'orphans': orphans_list})
+        return sql_json_response('orphans', row[0])
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -4719,14 +5309,26 @@ def admin_delete_orphan():
         return jsonify({'success': False, 'message': 'No files specified'}), 400
         
     try:
+        errors = []
         if s3_client and R2_BUCKET_NAME:
-            # Delete in batches of 1000 (S3 Limit)
+            # Delete in batches of 1000 (S3 Limit), sent concurrently
             chunk_size = 1000
-            for i in range(0, len(files), chunk_size):
-                batch = files[i:i + chunk_size]
-                delete_objects = {'Objects': [{'Key': k} for k in batch]}
-                s3_client.delete_objects(Bucket=R2_BUCKET_NAME, Delete=delete_objects)
+            batches = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+            
+            def delete_batch(batch):
+                """Returns this batch's failures (per-key errors or the whole request failing)."""
+                try:
+                    response = s3_client.delete_objects(Bucket=R2_BUCKET_NAME, Delete={'Objects': [{'Key': k} for k in batch]})
+                    return [f"{err.get('Key')}: {err.get('Message', err.get('Code'))}" for err in response.get('Errors', [])]
+                except Exception as e:
+                    return [f"Batch starting at {batch[0]}: {e}"]
             
+            with ThreadPoolExecutor(max_workers=min(R2_SCAN_WORKERS, len(batches))) as executor:
+                for batch_errors in executor.map(delete_batch, batches):
+                    errors.extend(batch_errors)
+        
+        if errors:
+            return jsonify({'success': False, 'message': f"{len(errors)} deletion(s) failed", 'errors': errors}), 500
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -4742,7 +5344,7 @@ def get_pending_uploads():
             files = []
             for row in rows:
                 item = dict(row)
-                try: item['r2_data'] = json.loads(item['r2_data'])
+                try: item['r2_data'] = orjson.loads(item['r2_data'])
                 except: pass
                 files.append(item)
         return jsonify({'success': True, 'files': files})
@@ -4755,10 +5357,12 @@ def delete_pending_upload():
     data = request.get_json()
     filename = data.get('filename')
     try:
-        with sqlite3.connect(PENDING_DB) as conn:
-            conn.execute("DELETE FROM pending WHERE filename = ?", (filename,))
-            conn.commit()
+        db_writer.execute(PENDING_DB, "DELETE FROM pending WHERE filename = ?", (filename,))
         return jsonify({'success': True})
+    except WriteQueuedError as e:
+        # Not a failure: the write is still queued and will be committed
+        logger.warning("%s", e)
+        return jsonify({'success': True, 'queued': True, 'message': 'WRITE_QUEUED'}), 202
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -4766,12 +5370,6 @@ def delete_pending_upload():
 #                                 GOOGLE INDEXING API
 # ===================================================================================
 
-def save_indexing_history(history):
-    try:
-        with open(INDEXING_HISTORY_FILE, 'w') as f:
-            json.dump(history, f)
-    except: pass
-
 @app.route('/admin/indexing')
 @admin_required
 def admin_indexing_page():
@@ -4782,32 +5380,35 @@ def admin_indexing_page():
 @admin_required
 def admin_indexing_status():
     """Calculates stats for the UI."""
-    history = load_indexing_history()
     now = time.time()
     DAILY_LIMIT = 200
     
     # Calculate Quota (Last 24h)
-    submitted_last_24h = [ts for ts in history.values() if ts > now - 86400]
-    count_last_24h = len(submitted_last_24h)
+    count_last_24h = count_indexing_history(now - 86400)
     quota_left = max(0, DAILY_LIMIT - count_last_24h)
     
-    # 1. Get All URLs
-    urls = []
+    # 1. Build every asset URL in SQL (same shape as construct_asset_url, from the stored slug)
+    #    and let SQLite join it against the history table instead of a Python membership loop.
     host = request.url_root.rstrip('/')
+    total, indexed = 0, 0
     
-    for cat, db_path in DB_MAPPING.items():
-        try:
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT id, name FROM uploads")
-                rows = cursor.fetchall()
-                for row in rows:
-                    url = construct_asset_url(host, cat, row[0], row[1])
-                    urls.append(url)
-        except: pass
+    try:
+        conn = sqlite3.connect(INDEXING_DB)
+        selects, params = [], []
+        for cat, db_path in DB_MAPPING.items():
+            conn.execute("ATTACH DATABASE ? AS ?", (db_path, f"cat_{cat}"))
+            selects.append(f"SELECT ? || '/view/' || ? || '/' || id || '/' || slug AS url FROM cat_{cat}.uploads")
+            params.extend([host, cat])
+        
+        total, indexed = conn.execute(f'''
+            SELECT COUNT(*), COUNT(h.url)
+            FROM ({' UNION ALL '.join(selects)}) v
+            LEFT JOIN indexing_history h ON h.url = v.url
+        ''', params).fetchone()
+        conn.close()
+    except Exception as e:
+        logger.error("Error computing indexing status: %s", e)
         
-    total = len(urls)
-    indexed = len([u for u in urls if u in history])
     pending = total - indexed
     
     return jsonify({
@@ -4831,45 +5432,80 @@ def get_indexing_credentials():
         try:
             return service_account.Credentials.from_service_account_info(json.loads(creds_json), scopes=scopes)
         except Exception as e:
-            print(f"Error parsing JSON credentials: {e}")
+            logger.error("Error parsing JSON credentials: %s", e)
 
     # 2. Try File Path
     creds_file = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
     if creds_file and os.path.exists(creds_file):
         return service_account.Credentials.from_service_account_file(creds_file, scopes=scopes)
+
+# Credentials (RSA key parse) and the discovery service are built once per process.
+_indexing_lock = threading.Lock()
+_indexing_credentials = None
+_indexing_service = None
+
+def get_indexing_service():
+    """Returns the cached (credentials, service) pair for the Indexing API, or (None, None)."""
+    global _indexing_credentials, _indexing_service
+    if _indexing_service is None:
+        with _indexing_lock:
+            if _indexing_service is None:
+                credentials = get_indexing_credentials()
+                if not credentials:
+                    return None, None
+                _indexing_credentials = credentials
+                _indexing_service = build("indexing", "v3", credentials=credentials, cache_discovery=False)
+    return _indexing_credentials, _indexing_service
+
+# Indexing API calls are pure network I/O, so they are fanned out over a thread pool.
+INDEXING_PUBLISH_WORKERS = 16
+_indexing_local = threading.local()
+
+def get_indexing_http():
+    """Returns this thread's authorized HTTP client, since the shared service's httplib2 is not thread-safe."""
+    http = getattr(_indexing_local, 'http', None)
+    if http is None:
+        credentials, _ = get_indexing_service()
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+        _indexing_local.http = http
+    return http
+
+def publish_url_update(service, url):
+    """Publishes a URL_UPDATED notification for a single URL."""
+    return service.urlNotifications().publish(body={"url": url, "type": "URL_UPDATED"}).execute(http=get_indexing_http())
+
 def auto_submit_to_google(items, host):
     """Background task to submit new uploads to Google Indexing."""
     # Wait for R2 propagation and DB consistency (SEO Best Practice)
     time.sleep(10)
 
-    credentials = get_indexing_credentials()
+    credentials, service = get_indexing_service()
     if not credentials:
-        print("Auto-Indexing: No credentials found.")
+        logger.warning("Auto-Indexing: No credentials found.")
         return
 
-    # Sync with Admin System History
-    history = load_indexing_history()
-    updated = False
+    urls = [construct_asset_url(host, item['category'], item['id'], item['name']) for item in items]
+    if not urls:
+        return
 
     try:
-        service = build("indexing", "v3", credentials=credentials)
-        for item in items:
+        def publish(url):
             try:
-                url = construct_asset_url(host, item['category'], item['id'], item['name'])
-                content = {"url": url, "type": "URL_UPDATED"}
-                service.urlNotifications().publish(body=content).execute()
-                print(f"Auto-Indexed: {url}")
-                
-                # Record in history for Admin Dashboard
-                history[url] = time.time()
-                updated = True
+                publish_url_update(service, url)
+                logger.info("Auto-Indexed: %s", url)
+                return url
             except Exception as e:
-                print(f"Failed to auto-index {item.get('name')}: {e}")
+                logger.error("Failed to auto-index %s: %s", url, e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(INDEXING_PUBLISH_WORKERS, len(urls))) as executor:
+            # Record in history for Admin Dashboard
+            submitted = [url for url in executor.map(publish, urls) if url]
         
-        if updated:
-            save_indexing_history(history)
+        # Sync with Admin System History (one transaction for the whole batch)
+        save_indexing_history(submitted)
     except Exception as e:
-        print(f"Auto-Indexing Service Error: {e}")
+        logger.error("Auto-Indexing Service Error: %s", e)
 
 @app.route('/api/admin/indexing/submit', methods=['POST'])
 @admin_required
@@ -4878,14 +5514,11 @@ def admin_indexing_submit():
     data = request.get_json() or {}
     manual_url = data.get('url')
     
-    history = load_indexing_history()
-    host = request.url_root.rstrip('/')
     now = time.time()
     DAILY_LIMIT = 200
     
     # Check Quota
-    submitted_last_24h = [ts for ts in history.values() if ts > now - 86400]
-    quota_left = max(0, DAILY_LIMIT - len(submitted_last_24h))
+    quota_left = max(0, DAILY_LIMIT - count_indexing_history(now - 86400))
     
     if quota_left <= 0:
         return jsonify({'success': False, 'message': f'Daily quota of {DAILY_LIMIT} reached. Please wait 24h.'}), 429
@@ -4899,31 +5532,31 @@ def admin_indexing_submit():
     
     batch = [manual_url]
     
-    credentials = get_indexing_credentials()
+    credentials, service = get_indexing_service()
     if not credentials:
         return jsonify({'success': False, 'message': 'Credentials not found. Set GOOGLE_CREDENTIALS_JSON env var.'}), 500
 
     try:
-        service = build("indexing", "v3", credentials=credentials)
         batch_request = service.new_batch_http_request()
         
         # Track results from callback
         results = {'success': 0, 'errors': 0}
+        submitted = []
         
         def batch_callback(request_id, response, exception):
             if exception:
-                print(f"Indexing Error for {request_id}: {exception}")
+                logger.error("Indexing Error for %s: %s", request_id, exception)
                 results['errors'] += 1
             else:
-                history[request_id] = time.time()
+                submitted.append(request_id)
                 results['success'] += 1
         
         for url in batch:
             content = {"url": url, "type": "URL_UPDATED"}
             batch_request.add(service.urlNotifications().publish(body=content), callback=batch_callback, request_id=url)
             
-        batch_request.execute()
-        save_indexing_history(history)
+        batch_request.execute(http=get_indexing_http())
+        save_indexing_history(submitted)
         return jsonify({'success': True, 'message': f"Batch complete: {results['success']} sent, {results['errors']} failed.", 'count': results['success']})
         
     except HttpError as e:
@@ -4934,7 +5567,7 @@ def admin_indexing_submit():
         except:
             error_msg = str(e)
 
-        print(f"Google Indexing API Error: {error_msg}")
+        logger.error("Google Indexing API Error: %s", error_msg)
 
         if e.resp.status == 403:
             return jsonify({
@@ -4961,15 +5594,13 @@ def admin_indexing_check_status():
     if not url.startswith(('http://', 'https://')):
         url = f'https://{url}'
 
-    credentials = get_indexing_credentials()
+    credentials, service = get_indexing_service()
     if not credentials:
         return jsonify({'success': False, 'message': 'Credentials not found. Set GOOGLE_CREDENTIALS_JSON env var.'}), 500
 
     try:
-        service = build("indexing", "v3", credentials=credentials)
-        
         # Call getMetadata
-        response = service.urlNotifications().getMetadata(url=url).execute()
+        response = service.urlNotifications().getMetadata(url=url).execute(http=get_indexing_http())
         
         return jsonify({'success': True, 'data': response})
         
@@ -4998,83 +5629,210 @@ def admin_indexing_check_status():
 @app.route('/api/admin/scan_unanalyzed')
 @admin_required
 def admin_scan_unanalyzed():
-    """Scans all databases for entries with no AI metadata."""
-    unanalyzed = []
-    for cat, db_name in DB_MAPPING.items():
+    """Scans all databases for entries with no AI metadata (streamed as it is read)."""
+    def stream_unanalyzed():
+        # One read-only connection with the other category DBs attached, one UNION ALL query.
+        # Its own connection (not the pool): a slow client may hold it for the whole download.
+        main_cat, *other_cats = DB_MAPPING.keys()
+        conn = open_db_readonly(DB_MAPPING[main_cat])
         try:
-            with sqlite3.connect(db_name) as conn:
-                conn.row_factory = sqlite3.Row
+            conn.row_factory = sqlite3.Row
+            for cat in other_cats:
+                conn.execute("ATTACH DATABASE ? AS ?", (DB_MAPPING[cat], f"cat_{cat}"))
+            # Find entries with no real AI data (served by the covering idx_uploads_unanalyzed_cover)
+            selects = [f"SELECT id, link_small, ? AS category_type FROM {'main' if cat == main_cat else f'cat_{cat}'}.uploads WHERE {UNANALYZED_PREDICATE}"
+                       for cat in DB_MAPPING]
+            cursor = conn.execute(" UNION ALL ".join(selects), tuple(DB_MAPPING))
+            yield '{"success":true,"assets":['
+            
+            # Serialize a chunk of rows at a time; the list brackets are stripped to splice chunks
+            first = True
+            while True:
+                rows = cursor.fetchmany(500)
+                if not rows:
+                    break
+                chunk = orjson.dumps([dict(row) for row in rows]).decode()[1:-1]
+                yield chunk if first else ',' + chunk
+                first = False
+            yield ']}'
+        finally:
+            conn.close()
+
+    # Run up to the first chunk here so DB errors can still return a 500
+    body = stream_unanalyzed()
+    try:
+        head = next(body)
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error scanning databases: {str(e)}'}), 500
+
+    def resume():
+        yield head
+        yield from body # Also forwards close() on client disconnect, releasing the connection
+    return Response(stream_with_context(resume()), mimetype='application/json')
+
+def bulk_update_metadata(updates, by_filename=False):
+    """
+    Shared write path of the bulk metadata endpoints.
+    `updates` is {db_category: [(item, content_category, key)]}, where key is the asset id
+    (or the link_original basename when by_filename). Each category DB gets one executemany
+    in one transaction. Returns (updated_count, errors).
+    """
+    sql = SQL_UPDATE_META_BY_FILENAME if by_filename else SQL_UPDATE_META
+    updated_count = 0
+    errors = []
+
+    for cat, rows in updates.items():
+        params = [(it.get('name'), slugify(it.get('name')), it.get('description'), it.get('keywords'), it.get('color'), content_category, orjson.dumps(it).decode(), key)
+                  for it, content_category, key in rows]
+        try:
+            with POOLS[cat].acquire() as conn:
                 cursor = conn.cursor()
-                # Find entries with no real AI data. '{}' is an empty JSON object.
-                cursor.execute("SELECT id, link_small FROM uploads WHERE ai_data IS NULL OR ai_data = '{}' OR ai_data = ''")
-                rows = cursor.fetchall()
-                for row in rows:
-                    asset = dict(row)
-                    asset['category_type'] = cat
-                    unanalyzed.append(asset)
-        except Exception as e:
-            return jsonify({'success': False, 'message': f'Error scanning {db_name}: {str(e)}'}), 500
-    return jsonify({'success': True, 'assets': unanalyzed})
+                # One transaction (one WAL commit) for the whole category instead of one per row
+                with transaction(conn):
+                    cursor.executemany(sql, params)
+                updated_count += cursor.rowcount
+        except sqlite3.Error as e_db:
+            errors.append(f"DB error for category {cat}: {str(e_db)}")
+
+    # Patch the changed rows into the search index on the next flush (no full rebuild)
+    if updated_count > 0:
+        if by_filename:
+            # Rows keyed by filename can't be patched in by id: reload the index instead
+            search_index_cache['last_updated'] = 0
+            remove_search_index_file()
+        else:
+            queue_search_index_updates([(cat, key) for cat, rows in updates.items() for _, _, key in rows])
+
+    return updated_count, errors
 
 @app.route('/api/admin/bulk_update_metadata', methods=['POST'])
 @admin_required
 def admin_bulk_update_metadata():
     """Receives a list of assets with AI data and updates them in the DB."""
-    data = request.get_json()
+    data = get_bulk_json()
     if not isinstance(data, list):
         return jsonify({'success': False, 'message': 'Invalid data format, expected a list.'}), 400
 
-    updated_count = 0
-    errors = []
+    data, errors = split_bulk_items(data, required=('id',), db_category_key='category_type')
 
     # Group updates by category to minimize DB connections
-    updates_by_cat = {}
+    updates = defaultdict(list)
+    for item in data:
+        cat = item['category_type']
+        # The category from AI is the content category
+        updates[cat].append((item, item.get('category', cat), item['id']))
+
+    updated_count, db_errors = bulk_update_metadata(updates)
+    return jsonify({'success': True, 'updated': updated_count, 'errors': errors + db_errors})
+
+IMPORT_SCALAR_FIELDS = ('user_id', 'name', 'description', 'keywords', 'color', 'resolution', 'quality',
+                        'link_small', 'link_medium', 'link_original', 'link_tiny')
+
+def validate_import_item(item):
+    """Returns an error message if the item can't be bound into an INSERT, else None."""
+    for field in IMPORT_SCALAR_FIELDS:
+        value = item.get(field)
+        if value is not None and not isinstance(value, (str, int, float)):
+            return f"Error importing {item.get('name', 'unknown')}: '{field}' must be a string or number"
+    return None
+
+def build_import_row(item):
+    """Normalizes an import item into (category, INSERT params)."""
+    # Map 'logos' or others to valid DB keys
+    category = normalize_db_category(item.get('category', 'image'))
+
+    # Default to Admin User ID (1) if not provided
+    user_id = item.get('user_id', 1)
+    
+    # Handle "No Data" / Pending State
+    name = item.get('name') or f"Untitled {item.get('temp_id', '')}"
+    description = item.get('description') or "No description available."
+    keywords = item.get('keywords') or ""
+    color = item.get('color') or ""
+    
+    # Flag as no_data if name is missing
+    ai_data_val = (orjson.dumps(item) if item.get('name') else orjson.dumps({"status": "no_data", "temp_id": item.get('temp_id')})).decode()
+
+    if category == 'image':
+        params = (user_id, name, slugify(name), description, color, keywords, item.get('resolution'), item.get('quality'), category, item.get('link_small'), item.get('link_medium'), item.get('link_original'), item.get('link_tiny'), time.time(), ai_data_val)
+    else:
+        params = (user_id, name, slugify(name), description, color, keywords, category, item.get('link_small'), item.get('link_medium'), item.get('link_original'), time.time(), ai_data_val)
+    return category, params
+
+def import_assets(data):
+    """
+    Inserts a list of assets (metadata + R2 links) into the category DBs.
+    Runs on the import queue's worker thread, off the request path.
+    """
+    results = []
+    success_count = 0
+    errors = []
+
+    # Check and normalize items up front, grouped by category (one connection + transaction per DB)
+    items_by_cat = defaultdict(list)
     for item in data:
-        cat = item.get('category_type')
-        if cat not in updates_by_cat:
-            updates_by_cat[cat] = []
-        updates_by_cat[cat].append(item)
-
-    for cat, items in updates_by_cat.items():
-        db_path = DB_MAPPING.get(cat)
-        if not db_path:
-            errors.append(f"Invalid category: {cat}")
+        error = validate_import_item(item)
+        if error:
+            errors.append(error)
             continue
-        
-        try:
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                for item in items:
-                    try:
-                        # The category from AI is the content category
-                        content_category = item.get('category', cat)
-
-                        cursor.execute("""
-                            UPDATE uploads 
-                            SET name=?, description=?, key_word=?, color_code=?, category=?, ai_data=? 
-                            WHERE id=?
-                        """, (item.get('name'), item.get('description'), item.get('keywords'), item.get('color'), content_category, json.dumps(item), item.get('id')))
-                        if cursor.rowcount > 0:
-                            updated_count += 1
-                    except Exception as e_item:
-                        errors.append(f"Failed to update ID {item.get('id')}: {str(e_item)}")
-        except Exception as e_db:
-            errors.append(f"DB error for category {cat}: {str(e_db)}")
+        category, params = build_import_row(item)
+        items_by_cat[category].append((item, params))
 
-    # Invalidate search cache after updates
-    if updated_count > 0:
-        search_index_cache['last_updated'] = 0
-        index_path = os.path.join(DB_FOLDER, 'search_index_v2.json')
-        if os.path.exists(index_path):
-            try: os.remove(index_path)
-            except: pass
+    # Insert each category in a single transaction; RETURNING hands back each new id
+    for category, entries in items_by_cat.items():
+        if category == 'image':
+            sql = SQL_INSERT_IMAGE + " RETURNING id"
+        else:
+            sql = SQL_INSERT_LOGO + " RETURNING id"
 
-    return jsonify({'success': True, 'updated': updated_count, 'errors': errors})
+        try:
+            with POOLS[category].acquire() as conn:
+                cursor = conn.cursor()
+                cat_results = []
+                with transaction(conn):
+                    for item, params in entries:
+                        # Savepoint per item so one bad row doesn't abort the batch
+                        conn.execute("SAVEPOINT item")
+                        try:
+                            (new_id,), = cursor.execute(sql, params).fetchall()
+                            conn.execute("RELEASE item")
+                            cat_results.append({'temp_id': item.get('temp_id'), 'db_id': new_id, 'category': category})
+                        except sqlite3.Error as e:
+                            # Only constraint/DB failures are expected here; anything else is a bug and fails the batch
+                            conn.execute("ROLLBACK TO item")
+                            conn.execute("RELEASE item")
+                            errors.append(f"Error importing {item.get('name', 'unknown')}: {str(e)}")
+                results.extend(cat_results)
+                success_count += len(cat_results)
+        except sqlite3.Error as e:
+            errors.append(f"DB error for category {category}: {str(e)}")
+
+    return {'imported': success_count, 'results': results, 'errors': errors}
+
+# Import batch status rows are kept this long after their last change
+IMPORT_BATCH_MAX_AGE = 7 * 86400
+
+def run_import_batch(batch_id, items):
+    """Importer for import_queue: runs import_assets and records the batch's progress in PENDING_DB."""
+    db_writer.submit(PENDING_DB, "UPDATE import_batches SET status = 'processing', updated_at = ? WHERE id = ?", (time.time(), batch_id))
+    try:
+        result = import_assets(items)
+    except Exception:
+        db_writer.submit(PENDING_DB, "UPDATE import_batches SET status = 'failed', error = 'UNEXPECTED_IMPORT_ERROR', updated_at = ? WHERE id = ?",
+                         (time.time(), batch_id))
+        raise
+    db_writer.submit(PENDING_DB, "UPDATE import_batches SET status = 'completed', imported = ?, results = ?, errors = ?, updated_at = ? WHERE id = ?",
+                     (result['imported'], orjson.dumps(result['results']).decode(), orjson.dumps(result['errors']).decode(), time.time(), batch_id))
+    return result
+
+# Dedicated queue so imports never wait behind (or get rate limited like) AI analysis tasks
+import_queue = UploadQueueManager(None, temp_storage_path=QUEUE_STORAGE, rate_limit_seconds=0, importer=run_import_batch)
 
 @app.route('/api/admin/bulk_import', methods=['POST'])
 def admin_bulk_import():
     """
-    Receives a JSON list of assets (metadata + R2 links) and inserts them into the DB.
+    Receives a JSON list of assets (metadata + R2 links) and queues them for import.
+    Returns 202 with a batch_id to poll at /api/admin/import_status/<batch_id>.
     Secured by ADMIN_TOKEN in .env.
     """
     # 1. Security Check
@@ -5084,54 +5842,57 @@ def admin_bulk_import():
     if not env_token or token != env_token:
         return jsonify({'success': False, 'message': 'Unauthorized: Invalid Admin Token'}), 403
 
-    data = request.get_json()
+    data = get_bulk_json()
     if not data or not isinstance(data, list):
         return jsonify({'success': False, 'message': 'Invalid JSON format. Expected a list.'}), 400
 
-    results = []
-    success_count = 0
-    errors = []
-
-    # 2. Process each item
-    for item in data:
-        try:
-            category = item.get('category', 'image').lower()
-            # Map 'logos' or others to valid DB keys
-            if 'logo' in category: category = 'logo'
-            else: category = 'image'
+    # 2. Validate up front; nothing is queued for a payload with no usable items
+    data, errors = split_bulk_items(data, required=('link_original',))
+    if not data:
+        return jsonify({'success': False, 'message': 'No valid items to import.', 'errors': errors}), 400
 
-            db_path = DB_MAPPING.get(category)
-            if not db_path: continue
+    # 3. Record the batch (committed before the id is handed out), then queue it;
+    # the import worker writes it in one transaction per category
+    batch_id = uuid.uuid4().hex
+    now = time.time()
+    try:
+        db_writer.execute(PENDING_DB, "INSERT INTO import_batches (id, status, item_count, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                          (batch_id, len(data), now, now))
+    except WriteQueuedError:
+        pass # The row is still committed before the import worker's own updates (one writer, FIFO)
+    except Exception as e:
+        print(f"Error recording import batch: {e}")
+        return jsonify({'success': False, 'message': 'Failed to queue import'}), 500
+    if not import_queue.add_to_queue('import', 'admin', items=data, task_id=batch_id):
+        db_writer.submit(PENDING_DB, "DELETE FROM import_batches WHERE id = ?", (batch_id,))
+        return jsonify({'success': False, 'message': 'Failed to queue import'}), 500
 
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Default to Admin User ID (1) if not provided
-                user_id = item.get('user_id', 1)
-                
-                # Handle "No Data" / Pending State
-                name = item.get('name') or f"Untitled {item.get('temp_id', '')}"
-                description = item.get('description') or "No description available."
-                keywords = item.get('keywords') or ""
-                color = item.get('color') or ""
-                
-                # Flag as no_data if name is missing
-                ai_data_val = json.dumps(item) if item.get('name') else json.dumps({"status": "no_data", "temp_id": item.get('temp_id')})
+    return jsonify({
+        'success': True,
+        'batch_id': batch_id,
+        'queued': len(data),
+        'errors': errors,
+        'status_url': url_for('admin_import_status', batch_id=batch_id)
+    }), 202
+
+@app.route('/api/admin/import_status/<batch_id>', methods=['GET'])
+def admin_import_status(batch_id):
+    """Reports the progress/result of a queued bulk import. Secured by ADMIN_TOKEN."""
+    token = request.headers.get('X-Admin-Token')
+    env_token = os.environ.get('ADMIN_TOKEN')
+    if not env_token or token != env_token:
+        return jsonify({'success': False, 'message': 'Unauthorized: Invalid Admin Token'}), 403
 
-                if category == 'image':
-                    cursor.execute('INSERT INTO uploads (user_id, name, description, color_code, key_word, resolution, quality, category, link_small, link_medium, link_original, link_tiny, upload_date, ai_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', 
-                                (user_id, name, description, color, keywords, item.get('resolution'), item.get('quality'), category, item.get('link_small'), item.get('link_medium'), item.get('link_original'), item.get('link_tiny'), time.time(), ai_data_val))
-                elif category == 'logo':
-                    cursor.execute('INSERT INTO uploads (user_id, name, description, color_code, key_word, category, link_small, link_medium, link_original, upload_date, ai_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', 
-                                (user_id, name, description, color, keywords, category, item.get('link_small'), item.get('link_medium'), item.get('link_original'), time.time(), ai_data_val))
-                
-                new_id = cursor.lastrowid
-                results.append({'temp_id': item.get('temp_id'), 'db_id': new_id, 'category': category})
-                success_count += 1
-        except Exception as e:
-            errors.append(f"Error importing {item.get('name', 'unknown')}: {str(e)}")
+    with db_pool(PENDING_DB).acquire() as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT id, status, item_count, imported, results, errors, error FROM import_batches WHERE id = ?", (batch_id,)).fetchone()
+    if not row:
+        return jsonify({'success': False, 'message': 'Unknown batch'}), 404
 
-    return jsonify({'success': True, 'imported': success_count, 'results': results, 'errors': errors})
+    status = dict(row)
+    status['results'] = orjson.loads(status['results']) if status['results'] else []
+    status['errors'] = orjson.loads(status['errors']) if status['errors'] else []
+    return jsonify({'success': True, **status})
 
 @app.route('/api/admin/bulk_import_session', methods=['POST'])
 @admin_required
@@ -5140,40 +5901,31 @@ def admin_bulk_import_session():
     Same as bulk_import but uses Session Auth instead of Token.
     Used by the Web UI Dashboard.
     """
-    data = request.get_json()
+    data = get_bulk_json()
     if not data or not isinstance(data, list):
         return jsonify({'success': False, 'message': 'Invalid JSON'}), 400
 
-    success_count = 0
-    errors = []
+    data, errors = split_bulk_items(data, required=(('url', 'filename'),))
 
+    # Group by category so each DB gets a single executemany transaction
+    updates = defaultdict(list)
     for item in data:
-        try:
-            # Determine category
-            category = item.get('category', 'image').lower()
-            if 'logo' in category: category = 'logo'
-            else: category = 'image'
-            
-            db_path = DB_MAPPING.get(category)
-            if not db_path: continue
+        # Determine category
+        category = normalize_db_category(item.get('category', 'image'))
+
+        # If the item comes from the Web UI tool, 'url' might be the filename
+        # We need to map it to link_original/medium/small
+        # Matched exactly on the basename (indexed) rather than with a leading-wildcard LIKE
+        filename = (item.get('url') or item.get('filename') or '').rsplit('/', 1)[-1]
+        if not filename:
+            errors.append(f"Missing url/filename for item: {item.get('name')}")
+            continue
+        updates[category].append((item, category, filename))
 
-            # If the item comes from the Web UI tool, 'url' might be the filename
-            # We need to map it to link_original/medium/small
-            filename = item.get('url') or item.get('filename')
-            
-            # Basic insertion logic (Simplified for Web UI flow)
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                # We assume the file is already in uploads/ via the /upload endpoint
-                # and we are just registering the metadata now.
-                cursor.execute(f"UPDATE uploads SET name=?, description=?, key_word=?, color_code=?, category=?, ai_data=? WHERE link_original LIKE ?",
-                               (item.get('name'), item.get('description'), item.get('keywords'), item.get('color'), category, json.dumps(item), f"%{filename}%"))
-                if cursor.rowcount > 0:
-                    success_count += 1
-        except Exception as e:
-            errors.append(str(e))
-            
-    return jsonify({'success': True, 'imported': success_count, 'errors': errors})
+    # We assume the file is already in uploads/ via the /upload endpoint
+    # and we are just registering the metadata now.
+    success_count, db_errors = bulk_update_metadata(updates, by_filename=True)
+    return jsonify({'success': True, 'imported': success_count, 'errors': errors + db_errors})
 
 @app.route('/api/admin/bulk_update', methods=['POST'])
 def admin_bulk_update():
@@ -5184,24 +5936,20 @@ def admin_bulk_update():
     if not env_token or token != env_token:
         return jsonify({'success': False, 'message': 'Unauthorized'}), 403
 
-    data = request.get_json()
-    updated_count = 0
+    data = get_bulk_json()
+    if not isinstance(data, list):
+        return jsonify({'success': False, 'message': 'Invalid data format, expected a list.'}), 400
+
+    data, errors = split_bulk_items(data, required=('id',))
     
+    # Group by category so each DB gets a single executemany transaction
+    updates = defaultdict(list)
     for item in data:
-        asset_id = item.get('id')
-        category = item.get('category', 'image').lower()
-        if 'logo' in category: category = 'logo'
-        else: category = 'image'
-        
-        db_path = DB_MAPPING.get(category)
-        if db_path and asset_id:
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("UPDATE uploads SET name=?, description=?, key_word=?, color_code=?, category=?, ai_data=? WHERE id=?",
-                               (item.get('name'), item.get('description'), item.get('keywords'), item.get('color'), item.get('category'), json.dumps(item), asset_id))
-                updated_count += 1
+        category = normalize_db_category(item.get('category', 'image'))
+        updates[category].append((item, item.get('category'), item['id']))
 
-    return jsonify({'success': True, 'updated': updated_count})
+    updated_count, db_errors = bulk_update_metadata(updates)
+    return jsonify({'success': True, 'updated': updated_count, 'errors': errors + db_errors})
 
 if __name__ == '__main__':
     # Only enable debug if explicitly set in environment (Default: False for safety)
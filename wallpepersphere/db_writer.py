@@ -0,0 +1,154 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import logging
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger("SQLiteWriter")
+
+class WriteQueuedError(Exception):
+    """Raised by SQLiteWriter.execute when a write is still queued at the timeout: it has not failed and will still be committed."""
+
+class SQLiteWriter:
+    """
+    Funnels SQLite writes through one background thread.
+
+    Request threads never hold a write lock themselves, so concurrent admin/report
+    writes no longer race each other into SQLITE_BUSY. Readers keep using their own
+    connections (WAL lets them run alongside the writer).
+
+    Writes arriving close together are micro-batched into one transaction per
+    database, so a burst pays for one commit instead of one per statement.
+    """
+
+    def __init__(self, timeout=5.0, batch_size=64, batch_window=0.01):
+        """
+        :param timeout: Seconds a caller of execute() waits for its write to be committed.
+        :param batch_size: Maximum number of writes committed together.
+        :param batch_window: Seconds to wait for more writes after the first one arrives.
+        """
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.queue = queue.Queue()
+        self.worker_thread = None
+        self._connections = {} # {db_path: connection}, only touched by the worker thread
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def start_worker(self):
+        """Starts the writer thread if it is not running in this process."""
+        with self._lock:
+            # After a fork (Gunicorn) the thread and its connections belong to the parent
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self.queue = queue.Queue()
+                self._connections = {}
+                self.worker_thread = None
+
+            if self.worker_thread and self.worker_thread.is_alive():
+                return
+
+            self.worker_thread = threading.Thread(target=self._process_queue, daemon=True)
+            self.worker_thread.start()
+            logger.info("SQLite writer started.")
+
+    def is_alive(self):
+        """Checks if the writer thread is currently active."""
+        return self.worker_thread is not None and self.worker_thread.is_alive() and self._pid == os.getpid()
+
+    def submit(self, db_path, sql, params=()):
+        """
+        Queues a single write statement.
+
+        :return: Future resolving to the statement's rowcount once committed.
+        """
+        if not self.is_alive():
+            self.start_worker()
+        future = Future()
+        self.queue.put((db_path, sql, params, future))
+        return future
+
+    def execute(self, db_path, sql, params=()):
+        """
+        Queues a write and blocks until it is committed. Returns the rowcount.
+        Raises WriteQueuedError if the writer is too busy to commit it within `timeout`.
+        """
+        future = self.submit(db_path, sql, params)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise WriteQueuedError(
+                f"Write to {os.path.basename(db_path)} still queued after {self.timeout}s; it will be committed when the writer catches up"
+            ) from None
+
+    def _get_connection(self, db_path):
+        conn = self._connections.get(db_path)
+        if conn is None:
+            # Autocommit mode: transactions are opened explicitly per batch
+            conn = sqlite3.connect(db_path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            self._connections[db_path] = conn
+        return conn
+
+    def _next_batch(self):
+        """Blocks for the first write, then collects more for up to batch_window seconds."""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit_batch(self, db_path, writes):
+        """Applies writes in one transaction; a failing statement only fails its own future."""
+        results = []
+        try:
+            conn = self._get_connection(db_path)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params, future in writes:
+                    conn.execute("SAVEPOINT write")
+                    try:
+                        cursor = conn.execute(sql, params)
+                        conn.execute("RELEASE write")
+                        results.append((future, cursor.rowcount, None))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO write")
+                        conn.execute("RELEASE write")
+                        results.append((future, None, e))
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            logger.error(f"Batch commit failed on {db_path}: {e}")
+            results = [(future, None, e) for _, _, future in writes]
+
+        # Resolve only after COMMIT so callers never observe uncommitted writes
+        for future, rowcount, error in results:
+            if error is not None:
+                logger.error(f"Write failed on {db_path}: {error}")
+                future.set_exception(error)
+            else:
+                future.set_result(rowcount)
+
+    def _process_queue(self):
+        """Worker loop: commits queued writes in micro-batches, one transaction per database."""
+        while True:
+            batch = self._next_batch()
+            by_db = {}
+            for db_path, sql, params, future in batch:
+                by_db.setdefault(db_path, []).append((sql, params, future))
+            for db_path, writes in by_db.items():
+                self._commit_batch(db_path, writes)
+            for _ in batch:
+                self.queue.task_done()
@@ -0,0 +1,142 @@
+"""
+Pillow decode/resize/encode for uploads. Runs inside the image process pool, whose
+children only import this module (not the whole Flask app).
+"""
+import io
+import os
+import gc
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+# libwebp effort per encode: 4 for photos (fast, near-identical size), 6 for logos (smallest file, few pixels)
+WEBP_METHOD_PHOTO = 4
+WEBP_METHOD_LOGO = 6
+
+# Quality labels by long side: below 1280 is SD, 1280+ HD, 1920+ FHD, 2560+ 2K, 3840+ 4K
+QUALITY_THRESHOLDS = (1280, 1920, 2560, 3840)
+QUALITY_NAMES = ('SD', 'HD', 'FHD', '2K', '4K')
+
+def classify_quality(long_side):
+    """Maps an image's longest side in pixels to its quality label."""
+    return QUALITY_NAMES[bisect.bisect_right(QUALITY_THRESHOLDS, long_side)]
+
+def fit_within(size, max_side):
+    """Returns `size` scaled down (never up) so its longest side is at most max_side."""
+    w, h = size
+    scale = min(1.0, max_side / max(w, h))
+    return (max(1, round(w * scale)), max(1, round(h * scale)))
+
+def resized_copy(img, max_side):
+    """LANCZOS-resizes from the decoded source pixels; returns img itself when it already fits."""
+    target = fit_within(img.size, max_side)
+    return img if target == img.size else img.resize(target, Image.Resampling.LANCZOS)
+
+def prepare_images_worker(src, base_filename, in_memory=False, api_thumb_path=None):
+    """
+    Generates medium and small versions of an image.
+    `src` is the image's path. When in_memory is True the encoded versions are not written
+    next to it: they come back as bytes in paths['buffers'] ({key: bytes}) and their path
+    entries stay None. Only the path crosses the process boundary, never the source bytes.
+    If api_thumb_path is given, the Small WEBP is also written there for AI analysis (SVGs get none).
+    Returns a dict with paths to all 3 versions (original, medium, small) and metadata.
+    Runs inside the image process pool; use prepare_images_for_r2 from request code.
+    """
+    directory = None if in_memory else os.path.dirname(src)
+    ext = os.path.splitext(src)[1].lower()
+    base_name_no_ext = os.path.splitext(base_filename)[0]
+    
+    paths = {
+        'original': src,
+        'medium': None,
+        'small': None,
+        'filename_original': base_filename,
+        'filename_medium': None,
+        'filename_small': None,
+        'resolution': '',
+        'quality': 'SD'
+    }
+    if in_memory:
+        paths['buffers'] = {}
+
+    if ext == '.svg':
+        paths['filename_medium'] = base_filename
+        paths['filename_small'] = base_filename
+        paths['medium'] = paths['original']
+        paths['small'] = paths['original']
+        paths['resolution'] = 'Vector'
+        paths['quality'] = 'SVG'
+        return paths
+
+    def compress_to_webp(image, target_kb):
+        """Compresses image to target size in KB. Each attempt is encoded in memory; returns the bytes."""
+        quality = 90
+        step = 5
+        min_quality = 5
+        
+        buf = io.BytesIO()
+        image.save(buf, 'WEBP', quality=quality, method=WEBP_METHOD_PHOTO)
+        while buf.tell() > target_kb * 1024 and quality > min_quality:
+            quality -= step
+            buf.seek(0)
+            buf.truncate()
+            image.save(buf, 'WEBP', quality=quality, method=WEBP_METHOD_PHOTO)
+        return buf.getvalue()
+
+    try:
+        rgb_im = None
+        with Image.open(src) as img:
+            paths['resolution'] = f"{img.size[0]}x{img.size[1]}"
+            long_side = max(img.size)
+            paths['quality'] = classify_quality(long_side)
+            
+            # MEMORY OPTIMIZATION: Resize BEFORE converting to RGB to save RAM.
+            # We only generate Medium (2048px) and smaller. We do NOT need full resolution in RAM.
+            if long_side > 2048:
+                # Use draft for JPEGs (Fast & Low RAM)
+                if img.format == 'JPEG':
+                    try: img.draft('RGB', (2048, 2048))
+                    except: pass
+                # Force resize the object IN PLACE
+                img.thumbnail((2048, 2048), Image.Resampling.LANCZOS)
+
+            rgb_im = img.convert('RGB')
+            
+        # Every variant is resampled from the one decoded buffer (never a thumbnail of a thumbnail).
+        # (key, max side, target KB): Medium, Small, Tiny (Mobile Optimized)
+        variants = [('medium', 2048, 100), ('small', 1024, 40), ('tiny', 400, 20)]
+        jobs = [(key, resized_copy(rgb_im, max_side), target_kb) for key, max_side, target_kb in variants]
+
+        # libwebp releases the GIL while encoding, so the three size-targeting encode loops run in parallel
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [executor.submit(compress_to_webp, image, target_kb) for _, image, target_kb in jobs]
+            encoded = [future.result() for future in futures]
+
+        for (key, _, _), data in zip(jobs, encoded):
+            name = f"{key}_{base_name_no_ext}.webp"
+            paths[f'filename_{key}'] = name
+            if in_memory:
+                paths['buffers'][key] = data
+            else:
+                path = os.path.join(directory, name)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                paths[key] = path
+
+        if api_thumb_path:
+            # The API thumbnail is the encoded Small WEBP itself (as in the client-processed upload flow):
+            # small enough for token usage and latency, and no extra encode
+            try:
+                with open(api_thumb_path, 'wb') as f:
+                    f.write(encoded[1])
+            except Exception as e:
+                print(f"Error creating API thumbnail: {e}")
+        
+        # Cleanup RAM immediately
+        del rgb_im, jobs, encoded
+        gc.collect()
+            
+    except Exception as e:
+        print(f"Error preparing images: {e}")
+        return None
+    return paths
@@ -17,25 +17,30 @@ if not logger.handlers:
     logger.setLevel(logging.INFO)
 
 class UploadQueueManager:
-    def __init__(self, visual_recognizer, temp_storage_path, rate_limit_seconds=4.0, vertex_generator=None, gemini_generator=None):
+    def __init__(self, visual_recognizer, temp_storage_path, rate_limit_seconds=4.0, vertex_generator=None, gemini_generator=None, importer=None):
         """
         Initializes the Queue Manager.
         
         :param visual_recognizer: Instance of VisualRecognizer to perform analysis.
         :param vertex_generator: Instance of VertexGenerator to perform image generation.
         :param gemini_generator: Instance of GeminiGenerator to perform image generation.
+        :param importer: Callable(task_id, items) -> {'imported', 'results', 'errors'} that writes an import batch
+                         to the DB and persists its status (import tasks are dropped from self.tasks once done).
         :param temp_storage_path: Folder to store files while they wait in queue.
         :param rate_limit_seconds: Minimum delay between processing tasks to respect API limits.
         """
         self.visual_recognizer = visual_recognizer
         self.vertex_generator = vertex_generator
         self.gemini_generator = gemini_generator
+        self.importer = importer
         self.queue = queue.Queue()
         self.temp_storage_path = temp_storage_path
         self.rate_limit_seconds = rate_limit_seconds
         self.is_running = False
         self.worker_thread = None
         self.tasks = {} # Store task states: {id: task_dict}
+        self.pending = 0 # Queued + in-progress tasks; a plain int so readers need no lock
+        self._pending_lock = threading.Lock()
         
         # Create temp directory if it doesn't exist
         if not os.path.exists(self.temp_storage_path):
@@ -67,17 +72,19 @@ class UploadQueueManager:
         """
         Adds a task to the processing queue.
         
-        :param task_type: 'analyze', 'generate', or 'edit'.
+        :param task_type: 'analyze', 'generate', 'edit', or 'import'.
         :param user_id: The ID of the user uploading the file.
         :param kwargs: For 'analyze', pass 'source_file_path'.
                        For 'generate', pass 'prompt' and 'aspect_ratio'.
                        For 'edit', pass 'prompt', 'aspect_ratio', and 'reference_image_path'.
+                       For 'import', pass 'items' (list of asset dicts).
+                       Any type may pass 'task_id' to use instead of the generated id.
         :return: task_id (str) or None if failed
         """
         try:
             timestamp = int(time.time() * 1000)
             task = {
-                'id': f"{user_id}_{timestamp}",
+                'id': kwargs.get('task_id') or f"{user_id}_{timestamp}",
                 'user_id': user_id,
                 'type': task_type,
                 'status': 'queued',
@@ -131,12 +138,25 @@ class UploadQueueManager:
                     'model': 'flash'  # force Gemini for edit
                 })
 
+            elif task_type == 'import':
+                if not self.importer:
+                    raise ValueError("Importer not configured in QueueManager.")
+                items = kwargs.get('items')
+                if not isinstance(items, list):
+                    raise ValueError("A list of items is required for import task.")
+                task.update({
+                    'items': items,
+                    'item_count': len(items)
+                })
+
             else:
                 raise ValueError(f"Unknown task type: {task_type}")
 
             self.tasks[task['id']] = task
+            with self._pending_lock:
+                self.pending += 1
             self.queue.put(task)
-            logger.info(f"Task {task['id']} added to queue. Queue Size: {self.queue.qsize()}")
+            logger.info(f"Task {task['id']} added to queue. Queue Size: {self.pending}")
             return task['id']
             
         except Exception as e:
@@ -181,6 +201,9 @@ class UploadQueueManager:
                 task_type = task.get('type', 'analyze') # Default to analyze for old tasks
                 if task_type == 'generate':
                     self._handle_generation_processing(task)
+                elif task_type == 'import':
+                    self._handle_import_processing(task)
+                    continue # DB-only work: no API rate limit to respect
                 else:
                     self._handle_analysis_processing(task)
                 
@@ -208,6 +231,8 @@ class UploadQueueManager:
                 # This is crucial. It signals that the task is finished, allowing the queue to proceed.
                 # It must be called regardless of success or failure.
                 if task:
+                    with self._pending_lock:
+                        self.pending -= 1
                     self.queue.task_done()
 
     def _handle_analysis_processing(self, task):
@@ -307,4 +332,27 @@ class UploadQueueManager:
         except Exception as e:
             task['status'] = 'failed'
             task['error'] = 'UNEXPECTED_GENERATION_ERROR'
-            logger.exception(f"Critical error in _handle_generation_processing for task {task['id']}")
\ No newline at end of file
+            logger.exception(f"Critical error in _handle_generation_processing for task {task['id']}")
+
+    def _handle_import_processing(self, task):
+        """
+        Writes a bulk import batch to the DB through the configured importer.
+        """
+        try:
+            task['status'] = 'processing'
+            result = self.importer(task['id'], task['items'])
+            task.update({
+                'status': 'completed',
+                'imported': result.get('imported', 0),
+                'results': result.get('results', []),
+                'errors': result.get('errors', [])
+            })
+            logger.info(f"Import Task {task['id']} completed: {task['imported']}/{task['item_count']} items.")
+        except Exception as e:
+            task['status'] = 'failed'
+            task['error'] = 'UNEXPECTED_IMPORT_ERROR'
+            logger.exception(f"Critical error in _handle_import_processing for task {task['id']}")
+        finally:
+            # The importer persisted the outcome, so the task (and its payload) can go
+            task.pop('items', None)
+            self.tasks.pop(task['id'], None)